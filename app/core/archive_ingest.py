@@ -0,0 +1,246 @@
+"""Streams trainer executables out of downloaded archives."""
+
+import hashlib
+import logging
+import shutil
+import subprocess
+import threading
+import uuid
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, ContextManager, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.hashing import READ_BUFFER_SIZE
+from app.core.quarantine import QuarantineStore
+from app.core.trainer_manager import TrainerFileManager, publish_file
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIXES = (".zip", ".7z")
+SEVEN_ZIP_COMMANDS = ("7z", "7zz", "7za")
+
+# Members larger than this are abandoned mid-stream (decompression bombs).
+MAX_MEMBER_SIZE = 1024 * 1024 * 1024
+
+class ArchiveError(Exception):
+    """Raised when an archive cannot be listed or extracted."""
+
+# zipfile raises RuntimeError for encrypted members and zlib.error for
+# corrupt data.
+_READ_ERRORS = (ArchiveError, OSError, zipfile.BadZipFile, RuntimeError, zlib.error)
+
+Opener = Callable[[], ContextManager[BinaryIO]]
+
+@dataclass
+class IngestResult:
+    """Outcome of ingesting one archive member."""
+    source: Path
+    member: str
+    success: bool
+    message: str
+    dest: Optional[Path] = None
+    sha256: str = ""
+    duplicate_of: str = ""
+
+class ArchiveIngestor:
+    """Extracts executables from .zip and .7z archives without a temp folder.
+    
+    Each wanted member is streamed in ``READ_BUFFER_SIZE`` chunks into a
+    staging file next to its destination and hashed on the way, so nothing
+    is read twice and no member is ever held in memory. Members with other
+    extensions are skipped without being decompressed. Zip files are read
+    with ``zipfile``; 7z archives are piped through the ``7z`` command.
+    """
+    
+    def __init__(
+        self,
+        trainer_manager: TrainerFileManager,
+        quarantine: Optional[QuarantineStore] = None,
+        extensions: Iterable[str] = (".exe",),
+    ):
+        self.trainer_manager = trainer_manager
+        self.quarantine = quarantine
+        self.suffixes = tuple(ext.lower() for ext in extensions)
+        self._lock = threading.Lock()
+        self._reserved: set = set()
+        self._seven_zip = next(filter(None, map(shutil.which, SEVEN_ZIP_COMMANDS)), None)
+    
+    def ingest(self, archive: Path, destination: str = "quarantine") -> List[IngestResult]:
+        """Extract the executables of one archive into quarantine or the trainers folder."""
+        if destination == "quarantine" and self.quarantine is None:
+            raise ValueError("No quarantine store configured")
+        self._reconcile(destination)
+        results = self._ingest(archive, destination)
+        if destination == "trainers":
+            self.trainer_manager.library_index.save()
+        return results
+    
+    def _reconcile(self, destination: str):
+        """Bring the library index up to date before extracting into the trainers folder."""
+        if destination == "trainers":
+            self.trainer_manager.library_index.reconcile(self.trainer_manager.scan_library())
+    
+    def _ingest(self, archive: Path, destination: str) -> List[IngestResult]:
+        try:
+            with self._members(archive) as members:
+                results = [self._store(archive, name, opener, destination) for name, opener in members]
+        except _READ_ERRORS as e:
+            logger.error(f"Cannot read archive {archive.name}: {e}")
+            return [IngestResult(archive, "", False, str(e))]
+        if not results:
+            return [IngestResult(archive, "", False, "No executables in archive")]
+        logger.info(f"Ingested {sum(r.success for r in results)}/{len(results)} files from {archive.name}")
+        return results
+    
+    def ingest_many(
+        self,
+        archives: List[Path],
+        destination: str = "quarantine",
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, Path], None]] = None,
+    ) -> List[IngestResult]:
+        """Ingest several archives in parallel, keeping their order in the results.
+        
+        When extracting into the trainers folder the library index is
+        reconciled first, so members duplicating an existing trainer are
+        skipped; library files are only hashed when a member has their size.
+        """
+        if not archives:
+            return []
+        if destination == "quarantine" and self.quarantine is None:
+            raise ValueError("No quarantine store configured")
+        self._reconcile(destination)
+        
+        per_archive: List[List[IngestResult]] = [[] for _ in archives]
+        workers = max_workers or min(4, len(archives))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as executor:
+            futures = {executor.submit(self._ingest, archive, destination): i for i, archive in enumerate(archives)}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                per_archive[i] = future.result()
+                if progress_callback:
+                    progress_callback(done, len(archives), archives[i])
+        self.trainer_manager.library_index.save()
+        return [result for results in per_archive for result in results]
+    
+    def ingest_directory(self, directory: Path, destination: str = "quarantine", **kwargs) -> List[IngestResult]:
+        """Ingest every archive directly inside ``directory``."""
+        archives = sorted(
+            path for path in directory.iterdir()
+            if path.suffix.lower() in ARCHIVE_SUFFIXES and path.is_file()
+        )
+        return self.ingest_many(archives, destination, **kwargs)
+    
+    @contextmanager
+    def _members(self, archive: Path) -> Iterator[List[Tuple[str, Opener]]]:
+        """Yield (member name, opener) pairs for the wanted members of an archive."""
+        suffix = archive.suffix.lower()
+        if suffix == ".zip":
+            with zipfile.ZipFile(archive) as zf:
+                yield [
+                    (info.filename, lambda info=info: zf.open(info))
+                    for info in zf.infolist() if not info.is_dir() and self._wanted(info.filename)
+                ]
+        elif suffix == ".7z":
+            yield [(name, lambda name=name: self._seven_zip_open(archive, name)) for name in self._seven_zip_list(archive)]
+        else:
+            raise ArchiveError(f"Unsupported archive type: {archive.suffix}")
+    
+    def _wanted(self, name: str) -> bool:
+        return name.lower().endswith(self.suffixes)
+    
+    def _seven_zip_list(self, archive: Path) -> List[str]:
+        if self._seven_zip is None:
+            raise ArchiveError("7z archives need the 7z command (p7zip or 7-Zip) on PATH")
+        listing = subprocess.run(
+            [self._seven_zip, "l", "-slt", "-ba", "--", str(archive)],
+            capture_output=True, text=True,
+        )
+        if listing.returncode != 0:
+            raise ArchiveError(listing.stderr.strip() or f"7z exited with {listing.returncode}")
+        
+        names = []
+        for block in listing.stdout.split("\n\n"):
+            fields = dict(line.split(" = ", 1) for line in block.splitlines() if " = " in line)
+            name = fields.get("Path", "")
+            is_dir = fields.get("Folder") == "+" or fields.get("Attributes", "").startswith("D")
+            if name and not is_dir and self._wanted(name):
+                names.append(name)
+        return names
+    
+    @contextmanager
+    def _seven_zip_open(self, archive: Path, name: str) -> Iterator[BinaryIO]:
+        # -spd disables wildcard matching so the member name is literal.
+        proc = subprocess.Popen(
+            [self._seven_zip, "x", "-so", "-spd", "--", str(archive), name],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        try:
+            yield proc.stdout
+        finally:
+            proc.stdout.close()
+            if proc.wait() != 0:
+                raise ArchiveError(f"7z failed to extract {name}")
+    
+    def _stream_to(self, opener: Opener, tmp: Path) -> str:
+        """Copy a member into ``tmp`` chunk by chunk, returning its SHA256."""
+        digest = hashlib.sha256()
+        written = 0
+        with opener() as stream, open(tmp, "wb") as out:
+            while True:
+                chunk = stream.read(READ_BUFFER_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > MAX_MEMBER_SIZE:
+                    raise ArchiveError(f"Member exceeds {MAX_MEMBER_SIZE // (1024 * 1024)} MiB")
+                digest.update(chunk)
+                out.write(chunk)
+        return digest.hexdigest()
+    
+    def _store(self, archive: Path, member: str, opener: Opener, destination: str) -> IngestResult:
+        # Archive folders are flattened; only the file name is kept.
+        name = PurePosixPath(member.replace("\\", "/")).name
+        if destination == "quarantine":
+            tmp = self.quarantine.root / f".{uuid.uuid4().hex}.tmp"
+            try:
+                sha256 = self._stream_to(opener, tmp)
+                entry = self.quarantine.add(tmp, sha256, name=name)
+            except _READ_ERRORS as e:
+                tmp.unlink(missing_ok=True)
+                return IngestResult(archive, member, False, str(e))
+            return IngestResult(archive, member, True, f"Quarantined: {name}", entry.path, sha256)
+        
+        trainers_path = self.trainer_manager.trainers_path
+        dest = trainers_path / name
+        with self._lock:
+            if dest.exists() or name.casefold() in self._reserved:
+                return IngestResult(archive, member, False, f"Trainer already exists: {name}")
+            self._reserved.add(name.casefold())
+        tmp = trainers_path / f".{name}.{uuid.uuid4().hex}.tmp"
+        try:
+            sha256 = self._stream_to(opener, tmp)
+            index = self.trainer_manager.library_index
+            index.hash_sizes(trainers_path, [tmp.stat().st_size])
+            with self._lock:
+                existing = index.paths_for_hash(sha256)
+                if not existing:
+                    publish_file(tmp, dest)
+                    stat = dest.stat()
+                    index.update(name, stat.st_size, stat.st_mtime_ns, sha256, ino=stat.st_ino)
+            if existing:
+                tmp.unlink()
+                return IngestResult(
+                    archive, member, False, f"Duplicate of {existing[0]}", sha256=sha256, duplicate_of=existing[0]
+                )
+        except _READ_ERRORS as e:
+            tmp.unlink(missing_ok=True)
+            return IngestResult(archive, member, False, str(e))
+        finally:
+            with self._lock:
+                self._reserved.discard(name.casefold())
+        return IngestResult(archive, member, True, f"Trainer added: {name}", dest, sha256)
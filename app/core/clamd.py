@@ -0,0 +1,198 @@
+"""Client for a long-running ClamAV daemon (clamd) over its Unix socket."""
+
+import logging
+import socket
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = Path("/var/run/clamav/clamd.ctl")
+
+# clamd limits outstanding replies per session, so pipelined requests are
+# sent in batches of this size.
+PIPELINE_DEPTH = 8
+
+CHUNK_SIZE = 1024 * 1024
+
+class ClamdError(Exception):
+    """Raised when clamd is unreachable or replies unexpectedly."""
+
+class ClamdClient:
+    """Persistent clamd session using ``IDSESSION`` and ``INSTREAM``.
+    
+    One connection is kept open and reused across scans. ``scan_files``
+    pipelines several ``INSTREAM`` requests before reading replies, which
+    clamd tags with the request number so they can arrive in any order.
+    """
+    
+    def __init__(self, socket_path: Path = DEFAULT_SOCKET, timeout: float = 60):
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._buffer = b""
+        self._next_id = 1
+        self._lock = threading.Lock()
+    
+    def _open(self, session: bool) -> socket.socket:
+        """Open a socket to clamd, optionally starting an ID session."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise ClamdError("clamd sockets need AF_UNIX, which this platform lacks")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(str(self.socket_path))
+            if session:
+                sock.sendall(b"zIDSESSION\0")
+        except OSError as e:
+            sock.close()
+            raise ClamdError(f"Cannot connect to clamd at {self.socket_path}: {e}") from e
+        return sock
+    
+    def _session(self) -> socket.socket:
+        """Return the open session, connecting on first use."""
+        if self._sock is None:
+            self._sock = self._open(session=True)
+            self._buffer = b""
+            self._next_id = 1
+            logger.info(f"Opened clamd session on {self.socket_path}")
+        return self._sock
+    
+    def _drop_session(self):
+        """Close the session so the next call reconnects."""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._buffer = b""
+    
+    def _read_reply(self, sock: socket.socket) -> str:
+        """Read one NUL-terminated reply."""
+        while b"\0" not in self._buffer:
+            data = sock.recv(4096)
+            if not data:
+                raise ClamdError("clamd closed the connection")
+            self._buffer += data
+        reply, _, self._buffer = self._buffer.partition(b"\0")
+        return reply.decode("utf-8", "replace")
+    
+    def _command(self, command: str) -> str:
+        """Send a one-shot command on its own connection."""
+        sock = self._open(session=False)
+        try:
+            sock.sendall(f"z{command}\0".encode("ascii"))
+            reply = b""
+            while not reply.endswith(b"\0"):
+                data = sock.recv(4096)
+                if not data:
+                    break
+                reply += data
+            return reply.rstrip(b"\0").decode("utf-8", "replace")
+        except OSError as e:
+            raise ClamdError(str(e)) from e
+        finally:
+            sock.close()
+    
+    def ping(self) -> bool:
+        """Return whether clamd is reachable."""
+        try:
+            with self._lock:
+                return self._command("PING") == "PONG"
+        except ClamdError:
+            return False
+    
+    def version(self) -> str:
+        """Return the clamd version string including the signature version."""
+        with self._lock:
+            return self._command("VERSION")
+    
+    def _send_stream(self, sock: socket.socket, file_path: Path):
+        """Send one ``INSTREAM`` request with the file's contents."""
+        with open(file_path, "rb") as f:
+            sock.sendall(b"zINSTREAM\0")
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                sock.sendall(struct.pack("!L", len(chunk)) + chunk)
+        sock.sendall(struct.pack("!L", 0))
+    
+    def _scan_batch(self, paths: List[Path]) -> Dict[Path, str]:
+        """Pipeline one batch of requests on the session and collect replies."""
+        sock = self._session()
+        pending: Dict[int, Path] = {}
+        results: Dict[Path, str] = {}
+        for path in paths:
+            try:
+                self._send_stream(sock, path)
+            except OSError as e:
+                if isinstance(e, (FileNotFoundError, PermissionError, IsADirectoryError)):
+                    results[path] = f"{e} ERROR"
+                    continue
+                raise
+            pending[self._next_id] = path
+            self._next_id += 1
+        
+        while pending:
+            request_id, _, reply = self._read_reply(sock).partition(": ")
+            try:
+                path = pending.pop(int(request_id), None)
+            except ValueError:
+                path = None
+            if path is None:
+                raise ClamdError(f"Unexpected clamd reply: {request_id}: {reply}")
+            results[path] = reply
+        return results
+    
+    def scan_files(self, file_paths: Iterable[Path]) -> Dict[Path, str]:
+        """Scan files over the persistent session.
+        
+        Returns raw clamd replies such as ``"stream: OK"`` or
+        ``"stream: Eicar-Signature FOUND"``. A dropped session is reopened
+        once before giving up.
+        """
+        paths = list(file_paths)
+        results: Dict[Path, str] = {}
+        with self._lock:
+            for start in range(0, len(paths), PIPELINE_DEPTH):
+                batch = paths[start:start + PIPELINE_DEPTH]
+                try:
+                    results.update(self._scan_batch(batch))
+                except (OSError, ClamdError) as e:
+                    logger.warning(f"clamd session failed, reconnecting: {e}")
+                    self._drop_session()
+                    try:
+                        results.update(self._scan_batch(batch))
+                    except (OSError, ClamdError) as e:
+                        self._drop_session()
+                        raise ClamdError(str(e)) from e
+        return results
+    
+    def scan_file(self, file_path: Path) -> str:
+        """Scan a single file and return clamd's reply."""
+        return self.scan_files([file_path])[file_path]
+    
+    def close(self):
+        """End the session and close the connection."""
+        with self._lock:
+            if self._sock is not None:
+                try:
+                    self._sock.sendall(b"zEND\0")
+                except OSError:
+                    pass
+            self._drop_session()
+
+def parse_reply(reply: str) -> Tuple[str, str]:
+    """Split a clamd scan reply into a status ("OK", "FOUND", "ERROR") and detail."""
+    body = reply.rsplit(": ", 1)[-1]
+    if body == "OK":
+        return "OK", ""
+    if body.endswith(" FOUND"):
+        return "FOUND", body[: -len(" FOUND")]
+    if body.endswith(" ERROR"):
+        return "ERROR", body[: -len(" ERROR")]
+    return "ERROR", reply
@@ -18,6 +18,8 @@ class Config:
         "quarantine_path": "",
         "auto_scan_downloads": True,
         "scanner_type": "windows_defender",
+        "clamd_socket": "/var/run/clamav/clamd.ctl",
+        "metadata_backend": "memory",
     }
     
     def __init__(self, config_file: str = "config.json"):
@@ -88,6 +90,10 @@ class Config:
     def quarantine_path(self) -> Path:
         return Path(self.data.get("quarantine_path", ""))
     
+    @property
+    def metadata_backend(self) -> str:
+        return self.data.get("metadata_backend", "memory")
+    
     @property
     def log_file(self) -> Path:
         return Path("trainer_manager.log")
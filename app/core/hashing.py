@@ -0,0 +1,193 @@
+"""File hashing helpers and the persistent digest cache."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Files modified this recently may still change within the same mtime tick,
+# so their digests are not cached (the "racy git" problem).
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+# Large reads amortize syscall overhead; hashlib releases the GIL for
+# updates over 2 KiB so worker threads hash in parallel.
+READ_BUFFER_SIZE = 1024 * 1024
+
+class HashCancelled(Exception):
+    """Raised when a hashing job is cancelled mid-file."""
+
+# Friendly names accepted in addition to hashlib's own.
+ALGORITHM_ALIASES = {"blake2": "blake2b", "sha-1": "sha1", "sha-256": "sha256"}
+
+def hash_file_digests(
+    file_path: Path,
+    algorithms: Iterable[str] = ("sha256",),
+    cancel_event: Optional[threading.Event] = None,
+) -> Dict[str, str]:
+    """Compute several digests of a file in a single read pass.
+    
+    Each block is read once into a reused buffer with ``readinto`` and fed
+    to every digest object. Returns hex digests keyed by the requested
+    algorithm names.
+    """
+    names = list(dict.fromkeys(algorithms))
+    digests = [hashlib.new(ALGORITHM_ALIASES.get(name.lower(), name.lower())) for name in names]
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise HashCancelled(str(file_path))
+            size = f.readinto(buffer)
+            if not size:
+                break
+            block = view[:size]
+            for digest in digests:
+                digest.update(block)
+    return {name: digest.hexdigest() for name, digest in zip(names, digests)}
+
+def hash_file(
+    file_path: Path,
+    algorithm: str = "sha256",
+    cancel_event: Optional[threading.Event] = None,
+) -> str:
+    """Hash a file with a single algorithm."""
+    return hash_file_digests(file_path, (algorithm,), cancel_event)[algorithm]
+
+class JsonCache:
+    """Thread-safe dictionary persisted as JSON and written atomically."""
+    
+    label = "cache entries"
+    
+    def __init__(self, cache_path: Optional[Path] = None):
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Any] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        """Load cached entries from disk if a cache file exists."""
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            logger.info(f"Loaded {len(self._entries)} {self.label}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache {self.cache_path.name}: {e}")
+            self._entries = {}
+    
+    def save(self):
+        """Write the cache to disk if it changed.
+        
+        Saves are serialized so concurrent writers never share a temporary
+        file; if writing fails the cache stays dirty for the next save.
+        """
+        if self.cache_path is None:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = dict(self._entries)
+                self._dirty = False
+            tmp_path = self.cache_path.with_name(f".{self.cache_path.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.cache_path)
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                tmp_path.unlink(missing_ok=True)
+                logger.warning(f"Failed to save cache {self.cache_path.name}: {e}")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value cached under ``key``, counting a hit or miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+    
+    def put(self, key: str, value: Any):
+        """Cache a JSON-serializable value under ``key``."""
+        with self._lock:
+            self._entries[key] = value
+            self._dirty = True
+    
+    def remove(self, key: str) -> bool:
+        """Drop ``key``, returning whether it was present."""
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self._dirty = True
+            return True
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        """Return a snapshot of all cached (key, value) pairs."""
+        with self._lock:
+            return list(self._entries.items())
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of cached entries."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+class HashCache(JsonCache):
+    """Persistent digest cache keyed on path, size, mtime_ns and inode."""
+    
+    label = "cached digests"
+    
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return str(Path(file_path).resolve())
+    
+    @staticmethod
+    def _identity(stat: os.stat_result) -> list:
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+    
+    def lookup(self, file_path: Path, stat: os.stat_result) -> Optional[str]:
+        """Return the cached digest if the file's identity is unchanged."""
+        key = self._key(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:3] == self._identity(stat):
+                self.hits += 1
+                return entry[3]
+            if entry is not None:
+                del self._entries[key]
+                self._dirty = True
+            self.misses += 1
+            return None
+    
+    def store(self, file_path: Path, before: os.stat_result, after: os.stat_result, digest: str):
+        """Cache a digest if the file did not change while it was hashed."""
+        identity = self._identity(before)
+        if identity != self._identity(after):
+            return
+        if time.time_ns() - after.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._entries[self._key(file_path)] = identity + [digest]
+            self._dirty = True
+    
+    def invalidate(self, file_path: Path):
+        """Drop any cached digest for a path."""
+        with self._lock:
+            if self._entries.pop(self._key(file_path), None) is not None:
+                self._dirty = True
@@ -0,0 +1,328 @@
+"""Persisted index of the files in the trainers folder."""
+
+import logging
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.hashing import JsonCache, hash_file
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DuplicateGroup:
+    """Files in the library sharing identical content."""
+    sha256: str
+    size: int
+    relpaths: List[str] = field(default_factory=list)
+    
+    @property
+    def wasted_bytes(self) -> int:
+        return self.size * (len(self.relpaths) - 1)
+
+@dataclass
+class ReconcileResult:
+    """Changes found by ``LibraryIndex.reconcile``."""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.renamed or self.changed)
+
+class LibraryIndex(JsonCache):
+    """Per-file records of the trainers folder keyed by relative path.
+    
+    Each record holds the size, mtime_ns, inode and SHA256 of a file, plus
+    the matched ``trainer``/``game`` and the last scan ``verdict`` once
+    known. A reverse SHA256 -> paths map is kept in memory so content
+    duplicates are found with one dictionary lookup. Files whose size and
+    mtime are unchanged are never rehashed.
+    """
+    
+    label = "library index records"
+    
+    def __init__(self, index_path: Optional[Path] = None):
+        super().__init__(index_path)
+        # Reentrant so multi-step operations can hold the lock across the
+        # public methods they are built from.
+        self._lock = threading.RLock()
+        self._by_hash: Dict[str, Set[str]] = defaultdict(set)
+        for relpath, record in self._entries.items():
+            if record.get("sha256"):
+                self._by_hash[record["sha256"]].add(relpath)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def __contains__(self, relpath: str) -> bool:
+        with self._lock:
+            return relpath in self._entries
+    
+    def record(self, relpath: str) -> Optional[dict]:
+        """Return a copy of the stored record for a path."""
+        with self._lock:
+            record = self._entries.get(relpath)
+            return dict(record) if record is not None else None
+    
+    def is_current(self, relpath: str, size: int, mtime_ns: int) -> bool:
+        """Whether the stored record still describes the file on disk."""
+        with self._lock:
+            record = self._entries.get(relpath)
+            return (
+                record is not None
+                and bool(record.get("sha256"))
+                and record["size"] == size
+                and record["mtime_ns"] == mtime_ns
+            )
+    
+    def update(self, relpath: str, size: int, mtime_ns: int, sha256: str, **fields):
+        """Insert or replace the record for a path."""
+        with self._lock:
+            old = self._entries.get(relpath)
+            if old is not None and old.get("sha256"):
+                self._by_hash[old["sha256"]].discard(relpath)
+            record = dict(old or {})
+            if old is not None and (
+                (old["size"], old["mtime_ns"]) != (size, mtime_ns)
+                or (old.get("sha256") and sha256 and old["sha256"] != sha256)
+            ):
+                # A verdict describes content, not a path.
+                record.pop("verdict", None)
+            record.update(fields, size=size, mtime_ns=mtime_ns, sha256=sha256)
+            self._entries[relpath] = record
+            if sha256:
+                self._by_hash[sha256].add(relpath)
+            self._dirty = True
+    
+    def discard(self, relpath: str) -> bool:
+        """Forget a path, returning whether it was indexed."""
+        with self._lock:
+            record = self._entries.pop(relpath, None)
+            if record is None:
+                return False
+            if record.get("sha256"):
+                self._by_hash[record["sha256"]].discard(relpath)
+            self._dirty = True
+            return True
+    
+    def annotate(self, relpath: str, **fields) -> bool:
+        """Set extra fields such as ``trainer``, ``game`` or ``verdict`` on a record."""
+        with self._lock:
+            record = self._entries.get(relpath)
+            if record is None:
+                return False
+            record.update(fields)
+            self._dirty = True
+            return True
+    
+    def rename(self, old_relpath: str, new_relpath: str) -> bool:
+        """Move a record to a new path without rehashing."""
+        with self._lock:
+            record = self.record(old_relpath)
+            if record is None:
+                return False
+            self.discard(old_relpath)
+            self.update(new_relpath, **record)
+            return True
+    
+    def paths_for_hash(self, sha256: str) -> List[str]:
+        """Return the indexed paths holding the given content."""
+        with self._lock:
+            return sorted(self._by_hash.get(sha256.lower(), ()))
+    
+    def relpaths(self) -> List[str]:
+        """Return every indexed path, sorted."""
+        with self._lock:
+            return sorted(self._entries)
+    
+    def reconcile(self, entries: Iterable) -> ReconcileResult:
+        """Bring the records in line with ``scan_library`` entries without hashing.
+        
+        Unchanged files keep their hash, match and verdict. Changed files keep
+        their match but lose their hash until it is next needed. A file that
+        vanished while one with the same inode and size appeared was renamed.
+        """
+        with self._lock:
+            result = ReconcileResult()
+            seen = set()
+            appeared = []
+            for entry in entries:
+                seen.add(entry.relpath)
+                record = self._entries.get(entry.relpath)
+                if record is None:
+                    appeared.append(entry)
+                elif (record["size"], record["mtime_ns"]) != (entry.size, entry.mtime_ns) or (
+                    record.get("ino") and entry.ino and record["ino"] != entry.ino
+                ):
+                    self.update(entry.relpath, entry.size, entry.mtime_ns, "", ino=entry.ino)
+                    result.changed.append(entry.relpath)
+            
+            gone = {relpath: record for relpath, record in self.items() if relpath not in seen}
+            gone_by_ino = {record.get("ino"): relpath for relpath, record in gone.items() if record.get("ino")}
+            for entry in appeared:
+                old = gone_by_ino.pop(entry.ino, None) if entry.ino else None
+                if old is not None and gone[old]["size"] == entry.size:
+                    del gone[old]
+                    self.rename(old, entry.relpath)
+                    result.renamed.append((old, entry.relpath))
+                    if self._entries[entry.relpath]["mtime_ns"] != entry.mtime_ns:
+                        self.update(entry.relpath, entry.size, entry.mtime_ns, "", ino=entry.ino)
+                        result.changed.append(entry.relpath)
+                else:
+                    self.update(entry.relpath, entry.size, entry.mtime_ns, "", ino=entry.ino)
+                    result.added.append(entry.relpath)
+            for relpath in gone:
+                self.discard(relpath)
+                result.removed.append(relpath)
+            return result
+    
+    def apply_events(self, root: Path, events: Iterable):
+        """Apply ``TrainerWatcher`` events, stat-ing new files but never hashing."""
+        for event in events:
+            if event.kind == "removed":
+                self.discard(event.relpath)
+                continue
+            if event.kind == "renamed" and self.rename(event.old_relpath, event.relpath):
+                continue
+            try:
+                stat = (root / event.relpath).stat()
+            except OSError:
+                self.discard(event.relpath)
+                continue
+            with self._lock:
+                record = self._entries.get(event.relpath)
+                if record is None or (record["size"], record["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                    self.update(event.relpath, stat.st_size, stat.st_mtime_ns, "", ino=stat.st_ino)
+    
+    def link_metadata(self, trainers: Iterable) -> int:
+        """Attach ``Trainer`` records to files by ``local_path`` or ``checksum``.
+        
+        Returns the number of files whose match changed.
+        """
+        by_path = {}
+        by_checksum = {}
+        for trainer in trainers:
+            if trainer.local_path:
+                by_path[trainer.local_path.replace("\\", "/")] = trainer
+            if trainer.checksum:
+                by_checksum[trainer.checksum.lower()] = trainer
+        
+        linked = 0
+        with self._lock:
+            for relpath, record in self._entries.items():
+                trainer = by_path.get(relpath) or by_checksum.get(record.get("sha256") or "")
+                if trainer is not None and record.get("trainer") != trainer.name:
+                    record.update(trainer=trainer.name, game=trainer.game)
+                    self._dirty = True
+                    linked += 1
+        return linked
+    
+    def _hash_entry(self, root: Path, entry, hash_func: Callable[[Path], str]) -> str:
+        """Return the SHA256 of a scanned entry, hashing only if it changed."""
+        with self._lock:
+            if self.is_current(entry.relpath, entry.size, entry.mtime_ns):
+                return self._entries[entry.relpath]["sha256"]
+        sha256 = hash_func(root / entry.relpath)
+        self.update(entry.relpath, entry.size, entry.mtime_ns, sha256, ino=entry.ino)
+        return sha256
+    
+    def sync(self, root: Path, entries: Iterable, hash_func: Callable[[Path], str] = hash_file) -> Tuple[int, int]:
+        """Bring the index in line with ``scan_library`` entries.
+        
+        Returns the number of (hashed, removed) records.
+        """
+        seen = set()
+        hashed = 0
+        for entry in entries:
+            seen.add(entry.relpath)
+            if not self.is_current(entry.relpath, entry.size, entry.mtime_ns):
+                try:
+                    self._hash_entry(root, entry, hash_func)
+                    hashed += 1
+                except OSError as e:
+                    logger.warning(f"Cannot hash {entry.relpath}: {e}")
+        with self._lock:
+            removed = [relpath for relpath in self._entries if relpath not in seen]
+            for relpath in removed:
+                self.discard(relpath)
+        self.save()
+        return hashed, len(removed)
+    
+    def hash_sizes(
+        self,
+        root: Path,
+        sizes: Iterable[int],
+        hash_func: Callable[[Path], str] = hash_file,
+        max_workers: Optional[int] = None,
+    ) -> int:
+        """Hash the unhashed records whose size is in ``sizes``, in parallel.
+        
+        Content can only duplicate a file of the same size, so callers pass
+        the sizes of incoming files instead of hashing the whole library.
+        Returns the number of files hashed.
+        """
+        sizes = set(sizes)
+        with self._lock:
+            todo = [
+                (relpath, record["size"], record["mtime_ns"])
+                for relpath, record in self._entries.items()
+                if not record.get("sha256") and record["size"] in sizes
+            ]
+        if not todo:
+            return 0
+        
+        def hash_one(relpath: str) -> str:
+            try:
+                return hash_func(root / relpath)
+            except OSError as e:
+                logger.warning(f"Cannot hash {relpath}: {e}")
+                return ""
+        
+        workers = max_workers or min(8, (os.cpu_count() or 1) + 2, len(todo))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="index-hash") as executor:
+            digests = list(executor.map(hash_one, [relpath for relpath, _, _ in todo]))
+        hashed = 0
+        with self._lock:
+            for (relpath, size, mtime_ns), sha256 in zip(todo, digests):
+                record = self._entries.get(relpath)
+                if sha256 and record is not None and (record["size"], record["mtime_ns"]) == (size, mtime_ns):
+                    self.update(relpath, size, mtime_ns, sha256)
+                    hashed += 1
+        return hashed
+    
+    def find_duplicates(
+        self, root: Path, entries: Iterable, hash_func: Callable[[Path], str] = hash_file
+    ) -> List[DuplicateGroup]:
+        """Group files with identical content.
+        
+        Files are bucketed by size first; a file whose size is unique in the
+        library cannot have a duplicate and is never hashed.
+        """
+        by_size: Dict[int, list] = defaultdict(list)
+        for entry in entries:
+            by_size[entry.size].append(entry)
+        
+        groups: List[DuplicateGroup] = []
+        for size, same_size in by_size.items():
+            if len(same_size) < 2:
+                continue
+            by_hash: Dict[str, List[str]] = defaultdict(list)
+            for entry in same_size:
+                try:
+                    by_hash[self._hash_entry(root, entry, hash_func)].append(entry.relpath)
+                except OSError as e:
+                    logger.warning(f"Cannot hash {entry.relpath}: {e}")
+            groups.extend(
+                DuplicateGroup(sha256, size, sorted(paths))
+                for sha256, paths in by_hash.items() if len(paths) > 1
+            )
+        self.save()
+        groups.sort(key=lambda group: group.wasted_bytes, reverse=True)
+        return groups
@@ -0,0 +1,205 @@
+"""Matches freely named trainer files to trainer and game metadata."""
+
+import logging
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import PurePath
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from app.core.metadata import MetadataManager, Trainer
+from app.core.search import normalize_title
+
+logger = logging.getLogger(__name__)
+
+_VERSION = re.compile(r"(?<![0-9a-z])v?(\d+(?:\.\d+)+[a-z]?)(?![0-9a-z])", re.IGNORECASE)
+_OPTION_COUNT = re.compile(r"(?:\bplus[\s._-]*|\+)\d+", re.IGNORECASE)
+_AUTHOR_SUFFIX = re.compile(r"[-_ ]([A-Za-z0-9]+)$")
+
+# Words that describe the download rather than the game.
+NOISE_TOKENS = frozenset({
+    "trainer", "trainers", "cheat", "cheats", "plus", "options", "update", "build",
+    "x64", "x86", "win64", "win32", "steam", "gog", "epic", "setup", "fixed", "v",
+})
+
+# Weight of the trainer version and author when they agree with the file.
+VERSION_WEIGHT = 0.1
+AUTHOR_WEIGHT = 0.05
+
+def normalize_version(version: str) -> str:
+    """Normalize a version string so "v1.10" and "1.10" compare equal."""
+    return version.strip().lower().lstrip("v")
+
+@dataclass(frozen=True)
+class ParsedName:
+    """The parts of a trainer file name relevant to matching."""
+    tokens: Tuple[str, ...]
+    version: str = ""
+    author: str = ""
+
+@dataclass(frozen=True)
+class MatchCandidate:
+    """A ranked match of a file name against the metadata."""
+    game: str
+    trainer: str
+    score: float
+
+class FilenameMatcher:
+    """Ranks trainer records and games for freely named trainer files.
+    
+    Game names are tokenized once into an inverted token -> candidate index
+    with IDF weights, so rare words like "elden" count for more than "of".
+    A name like ``Elden.Ring.v1.10.Plus.25.Trainer-FLiNG.exe`` is stripped
+    of its version, option count, author and noise words; candidates
+    sharing a token are scored with a weighted Dice coefficient, plus a
+    bonus when the trainer's version or author agrees.
+    """
+    
+    def __init__(
+        self,
+        trainers: Iterable[Trainer],
+        games: Iterable[str] = (),
+        abbreviations: Optional[Mapping[str, str]] = None,
+    ):
+        # Candidate ids index these parallel lists; games with trainers get
+        # one candidate per trainer, other games one candidate of their own.
+        self._games: List[str] = []
+        self._trainers: List[Optional[Trainer]] = []
+        self._tokens: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._authors: Set[str] = set()
+        
+        covered = set()
+        for trainer in trainers:
+            title = trainer.game or trainer.name
+            self._add_candidate(title, trainer)
+            covered.add(normalize_title(title))
+            if trainer.author:
+                self._authors.add(normalize_title(trainer.author).replace(" ", ""))
+        for game in games:
+            if normalize_title(game) not in covered:
+                self._add_candidate(game, None)
+        
+        total = len(self._games)
+        self._idf = {
+            token: math.log((total + 1) / len(ids)) + 1.0
+            for token, ids in self._postings.items()
+        }
+        self._weights = [sum(self._idf[token] for token in tokens) for tokens in self._tokens]
+        self._abbreviations = {
+            normalize_title(abbr).replace(" ", ""): tuple(normalize_title(full).split())
+            for abbr, full in (abbreviations or {}).items()
+        }
+    
+    @classmethod
+    def from_metadata(cls, metadata_manager: MetadataManager) -> "FilenameMatcher":
+        """Build a matcher over the trainers, games and abbreviations tables."""
+        return cls(
+            metadata_manager.trainers.values(),
+            metadata_manager.games.keys(),
+            metadata_manager.abbreviations,
+        )
+    
+    def __len__(self) -> int:
+        return len(self._games)
+    
+    def _add_candidate(self, title: str, trainer: Optional[Trainer]):
+        tokens = set(normalize_title(title).split())
+        if not tokens:
+            return
+        candidate_id = len(self._games)
+        self._games.append(title)
+        self._trainers.append(trainer)
+        self._tokens.append(tokens)
+        for token in tokens:
+            self._postings.setdefault(token, []).append(candidate_id)
+    
+    def parse(self, filename: str) -> ParsedName:
+        """Split a file name into title tokens, version and author."""
+        stem = PurePath(filename).stem if PurePath(filename).suffix.lower() == ".exe" else filename
+        version_match = _VERSION.search(stem)
+        version = normalize_version(version_match.group(1)) if version_match else ""
+        stem = _VERSION.sub(" ", stem)
+        stem = _OPTION_COUNT.sub(" ", stem)
+        
+        author = ""
+        author_match = _AUTHOR_SUFFIX.search(stem.strip())
+        if author_match and normalize_title(author_match.group(1)) in self._authors:
+            author = normalize_title(author_match.group(1))
+        
+        tokens = []
+        for token in normalize_title(stem).split():
+            if token in NOISE_TOKENS or token == author:
+                continue
+            if token not in self._postings and token in self._abbreviations:
+                tokens.extend(self._abbreviations[token])
+            else:
+                tokens.append(token)
+        return ParsedName(tuple(dict.fromkeys(tokens)), version, author)
+    
+    def match(self, filename: str, limit: int = 3, min_score: float = 0.3) -> List[MatchCandidate]:
+        """Return up to ``limit`` candidates for one file name, best first."""
+        return self.match_many([filename], limit, min_score)[filename]
+    
+    def match_many(
+        self, filenames: Iterable[str], limit: int = 3, min_score: float = 0.3
+    ) -> Dict[str, List[MatchCandidate]]:
+        """Match a whole library in one pass.
+        
+        File names that parse to the same tokens, version and author (the
+        usual case for several releases of one trainer) are scored once.
+        """
+        start = time.perf_counter()
+        results: Dict[str, List[MatchCandidate]] = {}
+        scored: Dict[ParsedName, List[MatchCandidate]] = {}
+        for filename in filenames:
+            parsed = self.parse(filename)
+            if parsed not in scored:
+                scored[parsed] = self._rank(parsed, limit, min_score)
+            results[filename] = scored[parsed]
+        logger.debug(
+            f"Matched {len(results)} file names ({len(scored)} distinct) in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        return results
+    
+    def _rank(self, parsed: ParsedName, limit: int, min_score: float) -> List[MatchCandidate]:
+        idf = self._idf
+        # Tokens unknown to every game cannot be told apart from junk, so
+        # they do not count against a candidate.
+        query = [token for token in parsed.tokens if token in idf]
+        if not query:
+            return []
+        query_weight = sum(idf[token] for token in query)
+        
+        shared: Counter = Counter()
+        for token in query:
+            weight = idf[token]
+            for candidate_id in self._postings[token]:
+                shared[candidate_id] += weight
+        
+        ranked = []
+        for candidate_id, shared_weight in shared.items():
+            score = 2.0 * shared_weight / (query_weight + self._weights[candidate_id])
+            score *= 1.0 - VERSION_WEIGHT - AUTHOR_WEIGHT
+            trainer = self._trainers[candidate_id]
+            if trainer is not None:
+                if parsed.version and normalize_version(trainer.version) == parsed.version:
+                    score += VERSION_WEIGHT
+                # Authors are stored without spaces, as parsed from file names.
+                if parsed.author and normalize_title(trainer.author).replace(" ", "") == parsed.author:
+                    score += AUTHOR_WEIGHT
+            if score >= min_score:
+                ranked.append((round(score, 4), candidate_id))
+        
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return [
+            MatchCandidate(
+                game=self._games[candidate_id],
+                trainer=self._trainers[candidate_id].name if self._trainers[candidate_id] else "",
+                score=score,
+            )
+            for score, candidate_id in ranked[:limit]
+        ]
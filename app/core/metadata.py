@@ -1,14 +1,28 @@
 """Metadata management for trainers and games."""
 
 import csv
+import hashlib
 import logging
+import marshal
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from app.core.search import Completion, PrefixIndex, SearchHit, TrigramIndex, normalize_key
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Bump whenever the snapshot layout changes so stale caches are ignored.
+SNAPSHOT_FORMAT = 1
+
+TABLES = ("trainers", "games", "abbreviations")
+
+@dataclass(slots=True)
 class Trainer:
     """Represents a trainer file with metadata."""
     name: str
@@ -19,7 +33,7 @@ class Trainer:
     checksum: str = ""
     local_path: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     """Represents a game with trainers."""
     name: str
@@ -30,23 +44,153 @@ class Game:
         if self.trainers is None:
             self.trainers = []
 
+@dataclass
+class ChangeSet:
+    """Row keys inserted, updated and deleted in one table by a reload."""
+    table: str
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+def _trainer_row(trainer: Trainer) -> Tuple[str, ...]:
+    """Return the CSV-backed fields of a trainer for change detection."""
+    return (trainer.name, trainer.game, trainer.version, trainer.author, trainer.url, trainer.checksum)
+
+def _store_rows(table: str, rows: dict) -> Dict[str, Tuple[str, ...]]:
+    """Convert a parsed table into key -> data column tuples for the SQLite store."""
+    if table == "trainers":
+        return {name: _trainer_row(t)[1:] for name, t in rows.items()}
+    if table == "games":
+        return {name: (g.abbreviation,) for name, g in rows.items()}
+    return {abbr: (full_name,) for abbr, full_name in rows.items()}
+
 class MetadataManager:
     """Manages CSV metadata for trainers and games."""
     
-    def __init__(self, resources_path: Path):
+    BACKENDS = ("memory", "sqlite")
+    
+    def __init__(
+        self,
+        resources_path: Path,
+        use_snapshot: bool = True,
+        backend: str = "memory",
+        lazy: bool = False,
+    ):
         self.resources_path = resources_path
         self.resources_path.mkdir(parents=True, exist_ok=True)
         
         self.trainers_list_path = resources_path / "trainers_list.csv"
         self.games_list_path = resources_path / "game_names_merged.csv"
         self.abbreviations_path = resources_path / "abbreviation.csv"
+        self.snapshot_path = resources_path / ".cache" / "metadata.snapshot"
+        self.database_path = resources_path / ".cache" / "metadata.db"
+        
+        self.use_snapshot = use_snapshot
+        self.snapshot_hit = False
+        
+        self._trainers: Dict[str, Trainer] = {}
+        self._games: Dict[str, Game] = {}
+        self._abbreviations: Dict[str, str] = {}
+        self._trainers_by_game: Dict[str, List[Trainer]] = {}
+        self._games_by_key: Dict[str, Game] = {}
+        self._games_by_id: Dict[str, Game] = {}
+        self._abbreviations_by_key: Dict[str, str] = {}
+        self.prefix_index = PrefixIndex()
+        self.fuzzy_index = TrigramIndex()
+        self._fingerprints: Dict[str, Optional[Tuple[int, int, str]]] = {}
+        self._change_listeners: List[Callable[[ChangeSet], None]] = []
+        self.load_timings: Dict[str, float] = {}
+        self._ready = {table: threading.Event() for table in TABLES}
+        self._loader: Optional[threading.Thread] = None
+        self._load_lock = threading.RLock()
+        if not lazy:
+            for event in self._ready.values():
+                event.set()
         
-        self.trainers: Dict[str, Trainer] = {}
-        self.games: Dict[str, Game] = {}
-        self.abbreviations: Dict[str, str] = {}
+        if backend not in self.BACKENDS:
+            logger.warning(f"Unknown metadata backend: {backend}, using memory")
+            backend = "memory"
+        self.backend = backend
+        self.store = None
+        # The trigram index is built on the first search_games() call.
+        self._fuzzy_stale = True
+        if backend == "sqlite":
+            from app.core.metadata_store import SQLiteMetadataStore, SQLiteTableView
+            self.store = SQLiteMetadataStore(self.database_path)
+            self.trainers = SQLiteTableView(self.store, "trainers")
+            self.games = SQLiteTableView(self.store, "games")
+            self.abbreviations = SQLiteTableView(self.store, "abbreviations")
         
         self._ensure_default_csvs()
-        self.load_all()
+        if lazy:
+            self._loader = threading.Thread(
+                target=self._background_load, name="metadata-loader", daemon=True
+            )
+            self._loader.start()
+        else:
+            self.load_all()
+    
+    @property
+    def trainers(self) -> Dict[str, Trainer]:
+        self._wait_for("trainers")
+        return self._trainers
+    
+    @trainers.setter
+    def trainers(self, value: Dict[str, Trainer]):
+        self._trainers = value
+    
+    @property
+    def games(self) -> Dict[str, Game]:
+        self._wait_for("games")
+        return self._games
+    
+    @games.setter
+    def games(self, value: Dict[str, Game]):
+        self._games = value
+    
+    @property
+    def abbreviations(self) -> Dict[str, str]:
+        self._wait_for("abbreviations")
+        return self._abbreviations
+    
+    @abbreviations.setter
+    def abbreviations(self, value: Dict[str, str]):
+        self._abbreviations = value
+    
+    def _background_load(self):
+        """Run load_all() on the loader thread, releasing waiters when done."""
+        try:
+            self.load_all()
+        finally:
+            for event in self._ready.values():
+                event.set()
+    
+    def _wait_for(self, *tables: str):
+        """Block until the given tables have been loaded by a lazy loader."""
+        if threading.current_thread() is self._loader:
+            return
+        for table in tables:
+            event = self._ready[table]
+            if not event.is_set():
+                start = time.perf_counter()
+                event.wait()
+                logger.debug(f"Waited {time.perf_counter() - start:.3f}s for {table} metadata")
+    
+    def close(self):
+        """Wait for any lazy load and release the SQLite store, if one is open."""
+        self.wait_until_loaded()
+        if self.store is not None:
+            self.store.close()
+    
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a lazy load to finish, returning False on timeout."""
+        if self._loader is not None:
+            self._loader.join(timeout)
+            return not self._loader.is_alive()
+        return True
     
     def _ensure_default_csvs(self):
         """Create default CSV files if they don't exist."""
@@ -81,71 +225,602 @@ class MetadataManager:
             writer.writerow(["EG", "Example Game"])
     
     def load_all(self):
-        """Load all metadata from CSV files."""
+        """Load all metadata, preferring the snapshot cache when it is fresh.
+        
+        With the SQLite backend the CSVs are instead imported incrementally
+        into the database and nothing is held in memory. On a snapshot hit
+        ``load_timings`` records the whole snapshot load under "snapshot"
+        plus the time spent building each table from it.
+        """
+        with self._load_lock:
+            self._load_all()
+    
+    def _load_all(self):
+        """Body of load_all(), run with the load lock held."""
         try:
-            self.load_trainers()
-            self.load_games()
-            self.load_abbreviations()
+            self.snapshot_hit = False
+            if self.store is not None:
+                self.reload()
+                logger.info("Metadata store is up to date")
+                return
+            
+            if self.use_snapshot:
+                start = time.perf_counter()
+                sources = self._fingerprint_sources()
+                if self._load_snapshot(sources):
+                    self._fingerprints = sources
+                    self.snapshot_hit = True
+                    self.load_timings["snapshot"] = time.perf_counter() - start
+                    for event in self._ready.values():
+                        event.set()
+                    logger.info("Metadata loaded from snapshot (cache hit)")
+                    return
+                logger.info("Metadata snapshot miss, parsing CSV files")
+            
+            failed = False
+            for table, rows, seconds in self._read_parallel(TABLES):
+                start = time.perf_counter()
+                if rows is None:
+                    failed = True
+                    rows = {}
+                self._install_table(table, rows)
+                self.load_timings[table] = seconds + time.perf_counter() - start
+                self._ready[table].set()
+                logger.info(f"Loaded {len(rows)} {table} in {self.load_timings[table] * 1000:.1f} ms")
+            
+            if self.use_snapshot and not failed:
+                self._fingerprints = sources
+                self._save_snapshot(sources)
             logger.info("Metadata loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load metadata: {e}")
     
+    def _source_paths(self) -> Dict[str, Path]:
+        """Map snapshot source keys to their CSV files."""
+        return {
+            "trainers": self.trainers_list_path,
+            "games": self.games_list_path,
+            "abbreviations": self.abbreviations_path,
+        }
+    
+    def _fingerprint_sources(self) -> Dict[str, Optional[Tuple[int, int, str]]]:
+        """Return (size, mtime_ns, sha256) for each source CSV, or None if unreadable."""
+        return {key: self._fingerprint(path) for key, path in self._source_paths().items()}
+    
+    def _fingerprint(self, path: Path) -> Optional[Tuple[int, int, str]]:
+        """Return (size, mtime_ns, sha256) for one CSV, or None if unreadable."""
+        try:
+            stat = path.stat()
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            return (stat.st_size, stat.st_mtime_ns, digest)
+        except OSError:
+            return None
+    
+    def _load_snapshot(self, sources: Dict[str, Optional[Tuple[int, int, str]]]) -> bool:
+        """Populate tables from the snapshot if it matches the current sources.
+        
+        The snapshot is written with ``marshal`` rather than ``pickle`` so a
+        tampered cache file cannot execute code on load.
+        """
+        if None in sources.values() or not self.snapshot_path.exists():
+            return False
+        
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = marshal.load(f)
+            
+            if data.get("format") != SNAPSHOT_FORMAT:
+                return False
+            if data.get("python") != tuple(sys.version_info[:2]):
+                return False
+            if data.get("sources") != {k: tuple(v) for k, v in sources.items()}:
+                return False
+            
+            builders = {
+                "trainers": lambda: {row[0]: Trainer(*row) for row in data["trainers"]},
+                "games": lambda: {row[0]: Game(name=row[0], abbreviation=row[1]) for row in data["games"]},
+                "abbreviations": lambda: dict(data["abbreviations"]),
+            }
+            tables = {}
+            for table, build in builders.items():
+                start = time.perf_counter()
+                tables[table] = build()
+                self.load_timings[table] = time.perf_counter() - start
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable metadata snapshot: {e}")
+            return False
+        
+        trainers = self._trainers = tables["trainers"]
+        games = self._games = tables["games"]
+        abbreviations = self._abbreviations = tables["abbreviations"]
+        for table, rebuild in (
+            ("trainers", self._rebuild_trainer_indexes),
+            ("games", self._rebuild_game_indexes),
+            ("abbreviations", self._rebuild_abbreviation_indexes),
+        ):
+            start = time.perf_counter()
+            rebuild()
+            self.load_timings[table] += time.perf_counter() - start
+        logger.info(
+            f"Loaded {len(trainers)} trainers, {len(games)} games, "
+            f"{len(abbreviations)} abbreviations from snapshot"
+        )
+        return True
+    
+    def _save_snapshot(self, sources: Dict[str, Optional[Tuple[int, int, str]]]):
+        """Persist the loaded tables keyed on the fingerprints taken before parsing."""
+        if None in sources.values():
+            return
+        
+        data = {
+            "format": SNAPSHOT_FORMAT,
+            "python": tuple(sys.version_info[:2]),
+            "sources": {k: tuple(v) for k, v in sources.items()},
+            "trainers": [_trainer_row(t) for t in self._trainers.values()],
+            "games": [(g.name, g.abbreviation) for g in self._games.values()],
+            "abbreviations": list(self._abbreviations.items()),
+        }
+        
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(tmp_path, self.snapshot_path)
+            logger.info(f"Saved metadata snapshot to {self.snapshot_path}")
+        except Exception as e:
+            logger.warning(f"Failed to save metadata snapshot: {e}")
+    
+    def _read_trainers(self) -> Dict[str, Trainer]:
+        """Parse trainers_list.csv into a name -> Trainer table.
+        
+        Game, version and author strings repeat across many rows and are
+        interned so each distinct value is stored once. Marshal preserves
+        the sharing when the tables are written to the snapshot.
+        """
+        trainers: Dict[str, Trainer] = {}
+        with open(self.trainers_list_path, "r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row and row.get("name"):
+                    trainer = Trainer(
+                        name=row.get("name", ""),
+                        game=sys.intern(row.get("game", "")),
+                        version=sys.intern(row.get("version", "")),
+                        author=sys.intern(row.get("author", "")),
+                        url=row.get("url", ""),
+                        checksum=row.get("checksum", "")
+                    )
+                    trainers[trainer.name] = trainer
+        return trainers
+    
+    def _read_games(self) -> Dict[str, Game]:
+        """Parse game_names_merged.csv into a name -> Game table."""
+        games: Dict[str, Game] = {}
+        with open(self.games_list_path, "r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row and row.get("game_name"):
+                    game = Game(
+                        name=sys.intern(row.get("game_name", "")),
+                        abbreviation=row.get("game_id", "")
+                    )
+                    games[game.name] = game
+        return games
+    
+    def _read_abbreviations(self) -> Dict[str, str]:
+        """Parse abbreviation.csv into an abbreviation -> full name table."""
+        abbreviations: Dict[str, str] = {}
+        with open(self.abbreviations_path, "r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row and row.get("abbreviation"):
+                    abbreviations[row.get("abbreviation", "")] = sys.intern(row.get("full_name", ""))
+        return abbreviations
+    
     def load_trainers(self):
         """Load trainers from CSV."""
-        self.trainers.clear()
+        if self.store is not None:
+            self._import_table("trainers")
+            return
         try:
-            with open(self.trainers_list_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row and row.get("name"):
-                        trainer = Trainer(
-                            name=row.get("name", ""),
-                            game=row.get("game", ""),
-                            version=row.get("version", ""),
-                            author=row.get("author", ""),
-                            url=row.get("url", ""),
-                            checksum=row.get("checksum", "")
-                        )
-                        self.trainers[trainer.name] = trainer
-            logger.info(f"Loaded {len(self.trainers)} trainers")
+            rows = self._read_trainers()
+            logger.info(f"Loaded {len(rows)} trainers")
         except Exception as e:
             logger.error(f"Failed to load trainers: {e}")
+            rows = {}
+        self._install_table("trainers", rows)
     
     def load_games(self):
         """Load games from CSV."""
-        self.games.clear()
+        if self.store is not None:
+            self._import_table("games")
+            return
         try:
-            with open(self.games_list_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row and row.get("game_name"):
-                        game = Game(
-                            name=row.get("game_name", ""),
-                            abbreviation=row.get("game_id", "")
-                        )
-                        self.games[game.name] = game
-            logger.info(f"Loaded {len(self.games)} games")
+            rows = self._read_games()
+            logger.info(f"Loaded {len(rows)} games")
         except Exception as e:
             logger.error(f"Failed to load games: {e}")
+            rows = {}
+        self._install_table("games", rows)
     
     def load_abbreviations(self):
         """Load abbreviations from CSV."""
-        self.abbreviations.clear()
+        if self.store is not None:
+            self._import_table("abbreviations")
+            return
         try:
-            with open(self.abbreviations_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row and row.get("abbreviation"):
-                        abbr = row.get("abbreviation", "")
-                        full = row.get("full_name", "")
-                        self.abbreviations[abbr] = full
-            logger.info(f"Loaded {len(self.abbreviations)} abbreviations")
+            rows = self._read_abbreviations()
+            logger.info(f"Loaded {len(rows)} abbreviations")
         except Exception as e:
             logger.error(f"Failed to load abbreviations: {e}")
+            rows = {}
+        self._install_table("abbreviations", rows)
+    
+    def _install_table(self, table: str, rows: dict):
+        """Replace a table's contents in place and rebuild its derived indexes."""
+        with self._load_lock:
+            self._install_table_locked(table, rows)
+    
+    def _install_table_locked(self, table: str, rows: dict):
+        """Body of _install_table(), run with the load lock held."""
+        if table == "trainers":
+            self._trainers.clear()
+            self._trainers.update(rows)
+            self._rebuild_trainer_indexes()
+        elif table == "games":
+            self._games.clear()
+            self._games.update(rows)
+            self._rebuild_game_indexes()
+        else:
+            self._abbreviations.clear()
+            self._abbreviations.update(rows)
+            self._rebuild_abbreviation_indexes()
+    
+    def _read_parallel(self, tables: Iterable[str]) -> Iterator[Tuple[str, Optional[dict], float]]:
+        """Parse CSVs on a worker pool, yielding (table, rows, seconds) as each finishes.
+        
+        ``rows`` is None when a table failed to parse. Results are consumed on
+        the calling thread, so tables and indexes are only mutated there.
+        """
+        readers = self._table_readers()
+        
+        def timed_read(table: str) -> Tuple[dict, float]:
+            start = time.perf_counter()
+            rows = readers[table]()
+            return rows, time.perf_counter() - start
+        
+        tables = list(tables)
+        if not tables:
+            return
+        with ThreadPoolExecutor(max_workers=len(tables), thread_name_prefix="metadata") as pool:
+            futures = {pool.submit(timed_read, table): table for table in tables}
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    rows, seconds = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to load {table}: {e}")
+                    yield table, None, 0.0
+                    continue
+                yield table, rows, seconds
+    
+    def _import_table(self, table: str):
+        """Re-import one CSV into the SQLite store."""
+        try:
+            fingerprint = self._fingerprint(self._source_paths()[table])
+            rows = self._table_readers()[table]()
+            with self._load_lock:
+                changes = self._apply_table(table, rows, fingerprint)
+            logger.info(f"Imported {table}: {len(changes.added)} added, {len(changes.updated)} updated")
+        except Exception as e:
+            logger.error(f"Failed to import {table}: {e}")
+    
+    def add_change_listener(self, callback: Callable[[ChangeSet], None]):
+        """Register a callback invoked with each non-empty ChangeSet from reload()."""
+        self._change_listeners.append(callback)
+    
+    def reload(self) -> List[ChangeSet]:
+        """Re-read changed CSVs and apply only row-level differences.
+        
+        Tables whose fingerprint matches the last load are skipped without
+        parsing. Existing Trainer and Game objects are updated in place so
+        references held elsewhere stay valid.
+        """
+        self._wait_for(*TABLES)
+        with self._load_lock:
+            return self._reload()
+    
+    def _reload(self) -> List[ChangeSet]:
+        """Body of reload(), run with the load lock held."""
+        sources = self._fingerprint_sources()
+        
+        stale = []
+        for table in TABLES:
+            if self.store is not None:
+                known = self.store.get_fingerprint(table)
+            else:
+                known = self._fingerprints.get(table)
+            if sources[table] is not None and sources[table] == known:
+                self._ready[table].set()
+            else:
+                stale.append(table)
+        
+        changes: List[ChangeSet] = []
+        for table, rows, seconds in self._read_parallel(stale):
+            if rows is None:
+                self._ready[table].set()
+                continue
+            start = time.perf_counter()
+            try:
+                changeset = self._apply_table(table, rows, sources[table])
+            except Exception as e:
+                logger.error(f"Failed to reload {table}: {e}")
+                continue
+            finally:
+                self._ready[table].set()
+            self.load_timings[table] = seconds + time.perf_counter() - start
+            if changeset:
+                logger.info(
+                    f"Reloaded {table}: {len(changeset.added)} added, "
+                    f"{len(changeset.updated)} updated, {len(changeset.removed)} removed"
+                )
+                changes.append(changeset)
+        
+        changes.sort(key=lambda changeset: TABLES.index(changeset.table))
+        if changes and self.use_snapshot and self.store is None:
+            self._save_snapshot(self._fingerprints)
+        
+        for changeset in changes:
+            for callback in self._change_listeners:
+                try:
+                    callback(changeset)
+                except Exception as e:
+                    logger.error(f"Metadata change listener failed: {e}")
+        return changes
+    
+    def _table_readers(self) -> Dict[str, Callable[[], dict]]:
+        """Map table names to their CSV parsers."""
+        return {
+            "trainers": self._read_trainers,
+            "games": self._read_games,
+            "abbreviations": self._read_abbreviations,
+        }
+    
+    def _apply_table(self, table: str, rows: dict, fingerprint: Optional[Tuple[int, int, str]]) -> ChangeSet:
+        """Apply a freshly read table to the active backend and record its fingerprint."""
+        if self.store is not None:
+            changeset = self.store.sync_table(table, _store_rows(table, rows), fingerprint)
+            if table == "games" and changeset:
+                self._fuzzy_stale = True
+            return changeset
+        
+        apply = {
+            "trainers": self._apply_trainer_rows,
+            "games": self._apply_game_rows,
+            "abbreviations": self._apply_abbreviation_rows,
+        }[table]
+        changeset = apply(rows)
+        self._fingerprints[table] = fingerprint
+        return changeset
+    
+    def _apply_trainer_rows(self, rows: Dict[str, Trainer]) -> ChangeSet:
+        """Diff a freshly read trainers table against the current one."""
+        changes = ChangeSet("trainers")
+        for name in [name for name in self._trainers if name not in rows]:
+            self._unindex_trainer(self._trainers.pop(name))
+            changes.removed.append(name)
+        
+        for name, trainer in rows.items():
+            current = self._trainers.get(name)
+            if current is None:
+                self._trainers[name] = trainer
+                self._index_trainer(trainer)
+                changes.added.append(name)
+            elif _trainer_row(current) != _trainer_row(trainer):
+                self._unindex_trainer(current)
+                current.game = trainer.game
+                current.version = trainer.version
+                current.author = trainer.author
+                current.url = trainer.url
+                current.checksum = trainer.checksum
+                self._index_trainer(current)
+                changes.updated.append(name)
+        return changes
+    
+    def _apply_game_rows(self, rows: Dict[str, Game]) -> ChangeSet:
+        """Diff a freshly read games table against the current one."""
+        changes = ChangeSet("games")
+        for name in [name for name in self._games if name not in rows]:
+            self._unindex_game(self._games.pop(name))
+            changes.removed.append(name)
+        
+        for name, game in rows.items():
+            current = self._games.get(name)
+            if current is None:
+                self._games[name] = game
+                self._index_game(game)
+                changes.added.append(name)
+            elif current.abbreviation != game.abbreviation:
+                self._unindex_game(current)
+                current.abbreviation = game.abbreviation
+                self._index_game(current)
+                changes.updated.append(name)
+        return changes
+    
+    def _apply_abbreviation_rows(self, rows: Dict[str, str]) -> ChangeSet:
+        """Diff a freshly read abbreviations table against the current one."""
+        changes = ChangeSet("abbreviations")
+        for abbr in [abbr for abbr in self._abbreviations if abbr not in rows]:
+            self._unindex_abbreviation(abbr, self._abbreviations.pop(abbr))
+            changes.removed.append(abbr)
+        
+        for abbr, full_name in rows.items():
+            current = self._abbreviations.get(abbr)
+            if current is None:
+                changes.added.append(abbr)
+            elif current != full_name:
+                self._unindex_abbreviation(abbr, current)
+                changes.updated.append(abbr)
+            else:
+                continue
+            self._abbreviations[abbr] = full_name
+            self._index_abbreviation(abbr, full_name)
+        return changes
+    
+    def _rebuild_trainer_indexes(self):
+        """Rebuild indexes derived from the trainers table.
+        
+        Buckets for known games are the games' own ``trainers`` lists, so
+        ``Game.trainers`` and the game index always hold the same objects.
+        """
+        index: Dict[str, List[Trainer]] = {}
+        for key, game in self._games_by_key.items():
+            game.trainers.clear()
+            index[key] = game.trainers
+        for trainer in self._trainers.values():
+            index.setdefault(normalize_key(trainer.game), []).append(trainer)
+        self._trainers_by_game = index
+        self.prefix_index.set_entries("trainer", ((name, name) for name in self._trainers))
+    
+    def _rebuild_game_indexes(self):
+        """Rebuild indexes derived from the games table and join in trainers."""
+        self._games_by_key = {}
+        self._games_by_id = {}
+        for game in self._games.values():
+            self._link_game(game)
+        self.prefix_index.set_entries("game", ((name, name) for name in self._games))
+        self._fuzzy_stale = True
+    
+    def _rebuild_abbreviation_indexes(self):
+        """Rebuild indexes derived from the abbreviations table."""
+        self._abbreviations_by_key = {
+            normalize_key(abbr): full_name for abbr, full_name in self._abbreviations.items()
+        }
+        self.prefix_index.set_entries("abbreviation", self._abbreviations.items())
+    
+    def _link_game(self, game: Game):
+        """Register a game in the key maps and attach its trainers list."""
+        key = normalize_key(game.name)
+        self._games_by_key[key] = game
+        if game.abbreviation:
+            self._games_by_id.setdefault(game.abbreviation.strip(), game)
+        game.trainers = self._trainers_by_game.setdefault(key, [])
+    
+    def _unlink_game(self, game: Game):
+        """Remove a game from the key maps, dropping its bucket if empty."""
+        key = normalize_key(game.name)
+        if self._games_by_key.get(key) is game:
+            del self._games_by_key[key]
+        game_id = game.abbreviation.strip()
+        if self._games_by_id.get(game_id) is game:
+            del self._games_by_id[game_id]
+        if not self._trainers_by_game.get(key, True):
+            del self._trainers_by_game[key]
+    
+    def _index_trainer(self, trainer: Trainer):
+        """Add one trainer to the derived indexes."""
+        self._trainers_by_game.setdefault(normalize_key(trainer.game), []).append(trainer)
+        self.prefix_index.add("trainer", trainer.name, trainer.name)
+    
+    def _unindex_trainer(self, trainer: Trainer):
+        """Remove one trainer from the derived indexes."""
+        key = normalize_key(trainer.game)
+        bucket = self._trainers_by_game.get(key, [])
+        bucket[:] = [t for t in bucket if t is not trainer]
+        if not bucket and key not in self._games_by_key:
+            self._trainers_by_game.pop(key, None)
+        self.prefix_index.remove("trainer", trainer.name, trainer.name)
+    
+    def _index_game(self, game: Game):
+        """Add one game to the derived indexes."""
+        self._link_game(game)
+        self.prefix_index.add("game", game.name, game.name)
+        if not self._fuzzy_stale:
+            self.fuzzy_index.add(game.name, game.name)
+    
+    def _unindex_game(self, game: Game):
+        """Remove one game from the derived indexes."""
+        self._unlink_game(game)
+        self.prefix_index.remove("game", game.name, game.name)
+        if not self._fuzzy_stale:
+            self.fuzzy_index.remove(game.name)
+    
+    def _index_abbreviation(self, abbr: str, full_name: str):
+        """Add one abbreviation to the derived indexes."""
+        self._abbreviations_by_key[normalize_key(abbr)] = full_name
+        self.prefix_index.add("abbreviation", abbr, full_name)
+    
+    def _unindex_abbreviation(self, abbr: str, full_name: str):
+        """Remove one abbreviation from the derived indexes."""
+        self._abbreviations_by_key.pop(normalize_key(abbr), None)
+        self.prefix_index.remove("abbreviation", abbr, full_name)
     
     def get_trainers_for_game(self, game_name: str) -> List[Trainer]:
         """Get all trainers for a specific game."""
-        return [t for t in self.trainers.values() if t.game.lower() == game_name.lower()]
+        self._wait_for("trainers")
+        if self.store is not None:
+            return self.store.get_trainers_for_game(game_name)
+        return list(self._trainers_by_game.get(normalize_key(game_name), ()))
+    
+    def get_trainer(self, name: str) -> Optional[Trainer]:
+        """Look up a trainer by exact name."""
+        return self.trainers.get(name)
+    
+    def get_game(self, name: str) -> Optional[Game]:
+        """Look up a game by exact name."""
+        return self.games.get(name)
+    
+    def resolve_abbreviation(self, abbreviation: str) -> Optional[str]:
+        """Return the full game name for an exact abbreviation."""
+        return self.abbreviations.get(abbreviation)
+    
+    def resolve_game(self, query: str) -> Optional[Game]:
+        """Resolve a game name, abbreviation or game id to a Game.
+        
+        Lookups use maps precomputed at load time, and the returned game's
+        ``trainers`` list is already filled in. Names take precedence over
+        abbreviations, which take precedence over game ids.
+        """
+        self._wait_for(*TABLES)
+        if self.store is not None:
+            return self.store.resolve_game(query)
+        
+        key = normalize_key(query)
+        game = self._games_by_key.get(key)
+        if game is None and key in self._abbreviations_by_key:
+            game = self._games_by_key.get(normalize_key(self._abbreviations_by_key[key]))
+        if game is None:
+            game = self._games_by_id.get(query.strip())
+        return game
+    
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Completion]:
+        """Return completions for a partial game, trainer or abbreviation."""
+        self._wait_for(*TABLES)
+        if self.store is not None:
+            return self.store.complete(prefix, limit)
+        return self.prefix_index.complete(prefix, limit)
+    
+    def search_games(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """Return games ranked by typo-tolerant similarity to ``query``.
+        
+        The trigram index is synced from the games table on the first call
+        after a full load, keeping it off the startup path. Later
+        incremental reloads update it entry by entry.
+        """
+        self._wait_for("games")
+        if self._fuzzy_stale:
+            with self._load_lock:
+                names = self.store.keys("games") if self.store is not None else self._games
+                changed, removed = self.fuzzy_index.sync({name: name for name in names})
+                self._fuzzy_stale = False
+            logger.debug(f"Fuzzy index synced: {changed} changed, {removed} removed")
+        hits = self.fuzzy_index.search(query, limit)
+        logger.debug(
+            f"Fuzzy search {query!r}: {len(hits)} hits in "
+            f"{self.fuzzy_index.last_search_seconds * 1000:.2f} ms"
+        )
+        return hits
     
     def validate_csv_schema(self, csv_path: Path) -> Tuple[bool, str]:
         """Validate CSV schema and content."""
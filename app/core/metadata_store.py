@@ -0,0 +1,347 @@
+"""SQLite-backed metadata store for large catalogs."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.metadata import ChangeSet, Game, Trainer
+from app.core.search import Completion, normalize_key
+
+logger = logging.getLogger(__name__)
+
+# Bump when SCHEMA changes; older databases are dropped and re-imported.
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trainers (
+    name TEXT PRIMARY KEY,
+    name_key TEXT NOT NULL,
+    game TEXT NOT NULL,
+    game_key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    author TEXT NOT NULL,
+    url TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    row_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trainers_name_key ON trainers(name_key);
+CREATE INDEX IF NOT EXISTS idx_trainers_game_key ON trainers(game_key);
+CREATE INDEX IF NOT EXISTS idx_trainers_author ON trainers(author COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS games (
+    name TEXT PRIMARY KEY,
+    name_key TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    row_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_games_name_key ON games(name_key);
+CREATE INDEX IF NOT EXISTS idx_games_game_id ON games(game_id);
+
+CREATE TABLE IF NOT EXISTS abbreviations (
+    abbreviation TEXT PRIMARY KEY,
+    abbreviation_key TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    full_name_key TEXT NOT NULL,
+    row_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_abbreviations_key ON abbreviations(abbreviation_key);
+
+CREATE TABLE IF NOT EXISTS sources (
+    table_name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+"""
+
+# table -> (key column, upsert statement)
+_TABLES = {
+    "trainers": (
+        "name",
+        "INSERT OR REPLACE INTO trainers "
+        "(name, name_key, game, game_key, version, author, url, checksum, row_hash) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    ),
+    "games": (
+        "name",
+        "INSERT OR REPLACE INTO games (name, name_key, game_id, row_hash) VALUES (?, ?, ?, ?)",
+    ),
+    "abbreviations": (
+        "abbreviation",
+        "INSERT OR REPLACE INTO abbreviations "
+        "(abbreviation, abbreviation_key, full_name, full_name_key, row_hash) VALUES (?, ?, ?, ?, ?)",
+    ),
+}
+
+def _row_hash(values: Tuple[str, ...]) -> str:
+    """Hash the data columns of a row for change detection."""
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=8).hexdigest()
+
+def _row_params(table: str, key: str, values: Tuple[str, ...], row_hash: str) -> tuple:
+    """Expand a (key, values) row into the upsert parameters for a table."""
+    if table == "trainers":
+        game, version, author, url, checksum = values
+        return (key, normalize_key(key), game, normalize_key(game), version, author, url, checksum, row_hash)
+    if table == "abbreviations":
+        return (key, normalize_key(key), values[0], normalize_key(values[0]), row_hash)
+    return (key, normalize_key(key), values[0], row_hash)
+
+class SQLiteMetadataStore:
+    """Metadata tables in a local SQLite database with indexed lookups."""
+    
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with self._conn:
+                for table in (*_TABLES, "sources"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(SCHEMA)
+        logger.info(f"Opened metadata store: {db_path}")
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def get_fingerprint(self, table: str) -> Optional[Tuple[int, int, str]]:
+        """Return the (size, mtime_ns, sha256) of the CSV last imported into a table."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, sha256 FROM sources WHERE table_name = ?", (table,)
+            ).fetchone()
+        return tuple(row) if row else None
+    
+    def sync_table(
+        self,
+        table: str,
+        rows: Dict[str, Tuple[str, ...]],
+        fingerprint: Optional[Tuple[int, int, str]] = None,
+    ) -> ChangeSet:
+        """Apply the difference between ``rows`` and the stored table.
+        
+        Rows are compared by key and a hash of their data columns, so only
+        inserted, changed and deleted rows are written.
+        """
+        key_column, upsert = _TABLES[table]
+        changes = ChangeSet(table)
+        
+        with self._lock, self._conn:
+            existing = dict(self._conn.execute(f"SELECT {key_column}, row_hash FROM {table}"))
+            
+            writes = []
+            for key, values in rows.items():
+                row_hash = _row_hash(values)
+                previous = existing.pop(key, None)
+                if previous is None:
+                    changes.added.append(key)
+                elif previous != row_hash:
+                    changes.updated.append(key)
+                else:
+                    continue
+                writes.append(_row_params(table, key, values, row_hash))
+            changes.removed.extend(existing)
+            
+            self._conn.executemany(upsert, writes)
+            self._conn.executemany(
+                f"DELETE FROM {table} WHERE {key_column} = ?",
+                ((key,) for key in changes.removed),
+            )
+            if fingerprint is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (table_name, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                    (table, *fingerprint),
+                )
+        return changes
+    
+    def count(self, table: str) -> int:
+        """Return the number of rows in a table."""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    
+    def keys(self, table: str) -> List[str]:
+        """Return all row keys of a table in insertion order."""
+        key_column = _TABLES[table][0]
+        with self._lock:
+            return [row[0] for row in self._conn.execute(f"SELECT {key_column} FROM {table} ORDER BY rowid")]
+    
+    def contains(self, table: str, key: str) -> bool:
+        """Return whether a table has a row with the given key."""
+        key_column = _TABLES[table][0]
+        with self._lock:
+            row = self._conn.execute(f"SELECT 1 FROM {table} WHERE {key_column} = ?", (key,)).fetchone()
+        return row is not None
+    
+    def items(self, table: str) -> List[tuple]:
+        """Return all (key, record) pairs of a table in one query."""
+        with self._lock:
+            if table == "trainers":
+                rows = self._conn.execute(
+                    "SELECT name, game, version, author, url, checksum FROM trainers ORDER BY rowid"
+                ).fetchall()
+                return [(row[0], Trainer(*row)) for row in rows]
+            if table == "games":
+                by_game: Dict[str, List[Trainer]] = {}
+                for row in self._conn.execute(
+                    "SELECT game_key, name, game, version, author, url, checksum FROM trainers ORDER BY rowid"
+                ):
+                    by_game.setdefault(row[0], []).append(Trainer(*row[1:]))
+                rows = self._conn.execute("SELECT name, name_key, game_id FROM games ORDER BY rowid").fetchall()
+                return [
+                    (name, Game(name=name, abbreviation=game_id, trainers=by_game.get(key, [])))
+                    for name, key, game_id in rows
+                ]
+            return self._conn.execute(
+                "SELECT abbreviation, full_name FROM abbreviations ORDER BY rowid"
+            ).fetchall()
+    
+    def get_trainer(self, name: str) -> Optional[Trainer]:
+        """Look up a trainer by exact name."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, game, version, author, url, checksum FROM trainers WHERE name = ?", (name,)
+            ).fetchone()
+        return Trainer(*row) if row else None
+    
+    def get_trainers_for_game(self, game_name: str) -> List[Trainer]:
+        """Return trainers whose normalized game name matches."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, game, version, author, url, checksum FROM trainers "
+                "WHERE game_key = ? ORDER BY rowid",
+                (normalize_key(game_name),),
+            ).fetchall()
+        return [Trainer(*row) for row in rows]
+    
+    def get_trainers_by_author(self, author: str) -> List[Trainer]:
+        """Return trainers by an author, case-insensitively."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, game, version, author, url, checksum FROM trainers "
+                "WHERE author = ? COLLATE NOCASE ORDER BY rowid",
+                (author,),
+            ).fetchall()
+        return [Trainer(*row) for row in rows]
+    
+    def get_game(self, name: str) -> Optional[Game]:
+        """Look up a game by exact name, with its trainers filled in."""
+        with self._lock:
+            row = self._conn.execute("SELECT name, game_id FROM games WHERE name = ?", (name,)).fetchone()
+        return self._joined_game(row)
+    
+    def resolve_game(self, query: str) -> Optional[Game]:
+        """Resolve a game name, abbreviation or game id to a Game with its trainers."""
+        key = normalize_key(query)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, game_id FROM games WHERE name_key = ? LIMIT 1", (key,)
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT g.name, g.game_id FROM abbreviations a "
+                    "JOIN games g ON g.name_key = a.full_name_key "
+                    "WHERE a.abbreviation_key = ? LIMIT 1",
+                    (key,),
+                ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT name, game_id FROM games WHERE game_id = ? LIMIT 1", (query.strip(),)
+                ).fetchone()
+        return self._joined_game(row)
+    
+    def _joined_game(self, row: Optional[tuple]) -> Optional[Game]:
+        """Build a Game from a (name, game_id) row and attach its trainers."""
+        if row is None:
+            return None
+        return Game(name=row[0], abbreviation=row[1], trainers=self.get_trainers_for_game(row[0]))
+    
+    def resolve_abbreviation(self, abbreviation: str) -> Optional[str]:
+        """Return the full name for an exact abbreviation."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT full_name FROM abbreviations WHERE abbreviation = ?", (abbreviation,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def complete(self, prefix: str, limit: int = 10) -> List[Completion]:
+        """Return completions using range scans over the normalized key indexes."""
+        prefix = normalize_key(prefix)
+        if not prefix or limit <= 0:
+            return []
+        
+        upper = prefix + "\U0010ffff"
+        queries = (
+            ("abbreviation", "SELECT abbreviation_key, abbreviation, full_name FROM abbreviations "
+                             "WHERE abbreviation_key >= ? AND abbreviation_key < ? "
+                             "ORDER BY abbreviation_key LIMIT ?"),
+            ("game", "SELECT name_key, name, name FROM games "
+                     "WHERE name_key >= ? AND name_key < ? ORDER BY name_key LIMIT ?"),
+            ("trainer", "SELECT name_key, name, name FROM trainers "
+                        "WHERE name_key >= ? AND name_key < ? ORDER BY name_key LIMIT ?"),
+        )
+        
+        candidates = []
+        with self._lock:
+            for kind, sql in queries:
+                for key, matched, text in self._conn.execute(sql, (prefix, upper, limit)):
+                    candidates.append((key, kind, matched, text))
+        candidates.sort()
+        
+        results: List[Completion] = []
+        seen = set()
+        for _key, kind, matched, text in candidates:
+            if text in seen:
+                continue
+            seen.add(text)
+            results.append(Completion(text=text, kind=kind, matched=matched))
+            if len(results) >= limit:
+                break
+        return results
+
+class SQLiteTableView(Mapping):
+    """Read-only mapping over one store table.
+    
+    Lets ``MetadataManager.trainers``/``games``/``abbreviations`` keep their
+    dict-style read API without loading the table into memory.
+    """
+    
+    def __init__(self, store: SQLiteMetadataStore, table: str):
+        self._store = store
+        self._table = table
+    
+    def __getitem__(self, key: str):
+        if self._table == "trainers":
+            value = self._store.get_trainer(key)
+        elif self._table == "games":
+            value = self._store.get_game(key)
+        else:
+            value = self._store.resolve_abbreviation(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._store.contains(self._table, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.keys(self._table))
+    
+    def __len__(self) -> int:
+        return self._store.count(self._table)
+    
+    def items(self):
+        # Mapping's default issues one SELECT per key; fetch the table at once.
+        return self._store.items(self._table)
+    
+    def values(self):
+        return [value for _key, value in self._store.items(self._table)]
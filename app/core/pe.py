@@ -0,0 +1,247 @@
+"""Header-only PE (Portable Executable) parser backed by mmap."""
+
+import mmap
+import struct
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MACHINE_TYPES = {
+    0x014C: "i386",
+    0x8664: "amd64",
+    0x01C0: "arm",
+    0x01C4: "armnt",
+    0xAA64: "arm64",
+    0x0200: "ia64",
+}
+
+PE32_MAGIC = 0x10B
+PE32_PLUS_MAGIC = 0x20B
+RESOURCE_DIRECTORY = 2
+RT_VERSION = 16
+FIXED_FILE_INFO_SIGNATURE = 0xFEEF04BD
+
+# Guards against malformed resource trees looping forever.
+MAX_RESOURCE_ENTRIES = 4096
+# Resource directories visited per lookup; real images need a handful.
+MAX_RESOURCE_NODES = 64
+
+class PEFormatError(Exception):
+    """Raised when a file is not a well-formed PE image."""
+
+@dataclass
+class PESection:
+    """A section table entry."""
+    name: str
+    virtual_address: int
+    virtual_size: int
+    raw_offset: int
+    raw_size: int
+
+@dataclass
+class PEInfo:
+    """Header metadata of a PE image."""
+    machine: str
+    timestamp: int
+    is_64bit: bool
+    sections: List[PESection] = field(default_factory=list)
+    version_strings: Dict[str, str] = field(default_factory=dict)
+    fixed_file_version: str = ""
+    
+    @property
+    def product_name(self) -> str:
+        return self.version_strings.get("ProductName", "").strip()
+    
+    @property
+    def file_version(self) -> str:
+        return self.version_strings.get("FileVersion", "").strip() or self.fixed_file_version
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "PEInfo":
+        data = dict(data)
+        data["sections"] = [PESection(**section) for section in data.get("sections", [])]
+        return cls(**data)
+
+def _align4(offset: int) -> int:
+    return (offset + 3) & ~3
+
+class _PEReader:
+    """Reads PE structures in place from a mapped image."""
+    
+    def __init__(self, data: mmap.mmap):
+        self.data = data
+        self.size = len(data)
+        self.sections: List[PESection] = []
+    
+    def unpack(self, fmt: str, offset: int) -> tuple:
+        if offset < 0 or offset + struct.calcsize(fmt) > self.size:
+            raise PEFormatError(f"Truncated structure at {offset:#x}")
+        return struct.unpack_from(fmt, self.data, offset)
+    
+    def rva_to_offset(self, rva: int) -> Optional[int]:
+        for section in self.sections:
+            span = max(section.virtual_size, section.raw_size)
+            if section.virtual_address <= rva < section.virtual_address + span:
+                offset = section.raw_offset + rva - section.virtual_address
+                return offset if offset < self.size else None
+        return None
+    
+    def parse(self) -> PEInfo:
+        if self.data[:2] != b"MZ":
+            raise PEFormatError("Missing MZ header")
+        (pe_offset,) = self.unpack("<I", 0x3C)
+        if self.data[pe_offset:pe_offset + 4] != b"PE\0\0":
+            raise PEFormatError("Missing PE signature")
+        
+        machine, section_count, timestamp, _, _, optional_size, _ = self.unpack("<HHIIIHH", pe_offset + 4)
+        optional_offset = pe_offset + 24
+        (magic,) = self.unpack("<H", optional_offset)
+        if magic == PE32_MAGIC:
+            directories_offset, is_64bit = optional_offset + 96, False
+        elif magic == PE32_PLUS_MAGIC:
+            directories_offset, is_64bit = optional_offset + 112, True
+        else:
+            raise PEFormatError(f"Unknown optional header magic {magic:#x}")
+        (directory_count,) = self.unpack("<I", directories_offset - 4)
+        
+        section_offset = optional_offset + optional_size
+        for i in range(section_count):
+            name, virtual_size, virtual_address, raw_size, raw_offset = self.unpack(
+                "<8sIIII", section_offset + i * 40
+            )
+            self.sections.append(PESection(
+                name=name.rstrip(b"\0").decode("ascii", "replace"),
+                virtual_address=virtual_address,
+                virtual_size=virtual_size,
+                raw_offset=raw_offset,
+                raw_size=raw_size,
+            ))
+        
+        info = PEInfo(
+            machine=MACHINE_TYPES.get(machine, f"{machine:#06x}"),
+            timestamp=timestamp,
+            is_64bit=is_64bit,
+            sections=self.sections,
+        )
+        if directory_count > RESOURCE_DIRECTORY:
+            resource_rva, resource_size = self.unpack("<II", directories_offset + RESOURCE_DIRECTORY * 8)
+            if resource_rva and resource_size:
+                self._parse_version_resource(info, resource_rva)
+        return info
+    
+    def _directory_entries(self, offset: int) -> List[tuple]:
+        """Return (id, target, is_directory) for a resource directory's entries."""
+        named, ids = self.unpack("<HH", offset + 12)
+        count = min(named + ids, MAX_RESOURCE_ENTRIES)
+        entries = []
+        for i in range(count):
+            name, target = self.unpack("<II", offset + 16 + i * 8)
+            entries.append((name, target & 0x7FFFFFFF, bool(target & 0x80000000)))
+        return entries
+    
+    def _first_leaf(self, base: int, offset: int, depth: int = 0, visited: Optional[set] = None) -> Optional[int]:
+        """Follow the first entry of each level down to a data entry offset.
+        
+        Each directory is entered at most once and at most
+        ``MAX_RESOURCE_NODES`` are entered in total, so crafted images whose
+        directories point back at themselves cannot stall the walk.
+        """
+        if visited is None:
+            visited = set()
+        if depth > 3 or offset in visited or len(visited) >= MAX_RESOURCE_NODES:
+            return None
+        visited.add(offset)
+        for _name, target, is_directory in self._directory_entries(offset):
+            if is_directory:
+                if len(visited) >= MAX_RESOURCE_NODES:
+                    return None
+                leaf = self._first_leaf(base, base + target, depth + 1, visited)
+                if leaf is not None:
+                    return leaf
+            else:
+                return base + target
+        return None
+    
+    def _parse_version_resource(self, info: PEInfo, resource_rva: int):
+        base = self.rva_to_offset(resource_rva)
+        if base is None:
+            return
+        for name, target, is_directory in self._directory_entries(base):
+            if name == RT_VERSION and is_directory:
+                leaf = self._first_leaf(base, base + target, 1)
+                if leaf is None:
+                    return
+                data_rva, data_size, _, _ = self.unpack("<IIII", leaf)
+                start = self.rva_to_offset(data_rva)
+                if start is not None:
+                    self._parse_version_info(info, start, min(start + data_size, self.size))
+                return
+    
+    def _read_block(self, offset: int, limit: int) -> Optional[tuple]:
+        """Read a VERSIONINFO block header.
+        
+        Returns (key, value_offset, value_length, value_type, children_offset, end).
+        """
+        if offset + 6 > limit:
+            return None
+        length, value_length, value_type = self.unpack("<HHH", offset)
+        end = min(offset + length, limit)
+        if length < 6:
+            return None
+        
+        key_start = offset + 6
+        key_end = key_start
+        while key_end + 1 < end and self.data[key_end:key_end + 2] != b"\0\0":
+            key_end += 2
+        key = self.data[key_start:key_end].decode("utf-16-le", "replace")
+        value_offset = _align4(key_end + 2)
+        value_bytes = value_length * 2 if value_type == 1 else value_length
+        children = _align4(value_offset + value_bytes)
+        return key, value_offset, value_bytes, value_type, children, end
+    
+    def _children(self, offset: int, end: int):
+        while offset < end:
+            block = self._read_block(offset, end)
+            if block is None:
+                return
+            yield block
+            offset = _align4(block[5])
+    
+    def _parse_version_info(self, info: PEInfo, offset: int, limit: int):
+        root = self._read_block(offset, limit)
+        if root is None or root[0] != "VS_VERSION_INFO":
+            return
+        _key, value_offset, value_bytes, _type, children, end = root
+        if value_bytes >= 52:
+            signature, _, ms, ls = self.unpack("<IIII", value_offset)
+            if signature == FIXED_FILE_INFO_SIGNATURE:
+                info.fixed_file_version = f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"
+        
+        for key, _, _, _, table_children, table_end in self._children(children, end):
+            if key != "StringFileInfo":
+                continue
+            for _table, _, _, _, string_children, string_end in self._children(table_children, table_end):
+                for name, value_start, value_size, _, _, block_end in self._children(string_children, string_end):
+                    raw = self.data[value_start:min(value_start + value_size, block_end)]
+                    value = raw.decode("utf-16-le", "replace").split("\0", 1)[0]
+                    info.version_strings.setdefault(name, value)
+
+def parse_pe(file_path: Path) -> PEInfo:
+    """Parse PE headers, sections and version strings from a file.
+    
+    The file is memory-mapped and only the pages holding headers and the
+    version resource are touched; the rest of the image is never read.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            raise PEFormatError("Empty file") from e
+        with data:
+            try:
+                return _PEReader(data).parse()
+            except struct.error as e:
+                raise PEFormatError(str(e)) from e
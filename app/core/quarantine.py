@@ -0,0 +1,174 @@
+"""Content-addressed quarantine store."""
+
+import errno
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.hashing import JsonCache, hash_file
+from app.core.trainer_manager import publish_file
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QuarantineEntry:
+    """A quarantined blob and the names it arrived under."""
+    sha256: str
+    size: int
+    path: Path
+    names: List[Tuple[str, float]] = field(default_factory=list)
+    
+    @property
+    def name(self) -> str:
+        """The most recent original file name."""
+        return self.names[-1][0] if self.names else self.sha256
+
+class QuarantineStore:
+    """Stores quarantined files once per SHA256 under ``blobs/ab/abcdef...``.
+    
+    ``index.json`` records the original names and arrival times of each
+    blob, so identical downloads share one blob and same-named files never
+    collide. Lookups by digest or name are dictionary hits, and promotion
+    renames or hardlinks the blob instead of copying it.
+    """
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.blobs_path = root / "blobs"
+        self.blobs_path.mkdir(parents=True, exist_ok=True)
+        self._index = JsonCache(root / "index.json")
+        self._by_name: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for sha256, record in self._index.items():
+            for name, _added in record["names"]:
+                self._by_name[name] = sha256
+    
+    def blob_path(self, sha256: str) -> Path:
+        sha256 = sha256.lower()
+        return self.blobs_path / sha256[:2] / sha256
+    
+    def _entry(self, sha256: str, record: dict) -> QuarantineEntry:
+        return QuarantineEntry(
+            sha256=sha256,
+            size=record["size"],
+            path=self.blob_path(sha256),
+            names=[tuple(item) for item in record["names"]],
+        )
+    
+    def add(self, file_path: Path, sha256: Optional[str] = None, name: Optional[str] = None) -> QuarantineEntry:
+        """Move a file into the store, deduplicating identical content.
+        
+        ``name`` overrides the recorded original name, for files staged
+        under a temporary name.
+        """
+        sha256 = (sha256 or hash_file(file_path)).lower()
+        name = name or file_path.name
+        size = file_path.stat().st_size
+        blob = self.blob_path(sha256)
+        with self._lock:
+            if blob.exists():
+                file_path.unlink()
+                logger.info(f"Quarantine already holds {name} as {sha256[:12]}")
+            else:
+                blob.parent.mkdir(exist_ok=True)
+                _move(file_path, blob)
+                logger.info(f"Quarantined {name} as {sha256[:12]}")
+            
+            record = self._index.get(sha256) or {"size": size, "names": []}
+            record["names"] = [item for item in record["names"] if item[0] != name]
+            record["names"].append([name, time.time()])
+            self._index.put(sha256, record)
+            self._by_name[name] = sha256
+        self._index.save()
+        return self._entry(sha256, record)
+    
+    def get(self, sha256: str) -> Optional[QuarantineEntry]:
+        """Look up a blob by digest."""
+        sha256 = sha256.lower()
+        record = self._index.get(sha256)
+        return self._entry(sha256, record) if record else None
+    
+    def find_by_name(self, name: str) -> Optional[QuarantineEntry]:
+        """Look up the blob most recently quarantined under ``name``."""
+        sha256 = self._by_name.get(name)
+        return self.get(sha256) if sha256 else None
+    
+    def entries(self) -> List[QuarantineEntry]:
+        """Return every quarantined blob, most recent arrival last."""
+        entries = [self._entry(sha256, record) for sha256, record in self._index.items()]
+        return sorted(entries, key=lambda entry: entry.names[-1][1] if entry.names else 0)
+    
+    def promote(self, sha256: str, dest_dir: Path, name: Optional[str] = None, keep: bool = False) -> Path:
+        """Release a blob into ``dest_dir`` under its original (or given) name.
+        
+        The blob is hardlinked into place and, unless ``keep`` is set,
+        unlinked from the store. Across filesystems it is copied to a
+        temporary name beside ``dest`` first. An existing ``dest`` is never
+        overwritten.
+        """
+        entry = self.get(sha256)
+        if entry is None:
+            raise KeyError(f"Not in quarantine: {sha256}")
+        dest = dest_dir / (name or entry.name)
+        if dest.exists():
+            raise FileExistsError(f"Destination already exists: {dest.name}")
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        
+        with self._lock:
+            _place(entry.path, dest)
+            if not keep:
+                entry.path.unlink()
+                self._forget(entry)
+        self._index.save()
+        logger.info(f"Promoted {entry.sha256[:12]} to {dest}")
+        return dest
+    
+    def remove(self, sha256: str) -> bool:
+        """Delete a blob and its index record."""
+        entry = self.get(sha256)
+        if entry is None:
+            return False
+        with self._lock:
+            entry.path.unlink(missing_ok=True)
+            self._forget(entry)
+        self._index.save()
+        return True
+    
+    def _forget(self, entry: QuarantineEntry):
+        self._index.remove(entry.sha256)
+        for name, _added in entry.names:
+            if self._by_name.get(name) == entry.sha256:
+                del self._by_name[name]
+
+def _move(source: Path, dest: Path):
+    """Rename ``source`` to ``dest``, copying only across filesystems."""
+    try:
+        os.replace(source, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.copy2(source, dest)
+        source.unlink()
+
+def _place(source: Path, dest: Path):
+    """Create ``dest`` with the contents of ``source``, never overwriting it."""
+    try:
+        os.link(source, dest)
+        return
+    except FileExistsError:
+        raise FileExistsError(f"Destination already exists: {dest.name}") from None
+    except OSError:
+        pass
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        shutil.copy2(source, tmp)
+        publish_file(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
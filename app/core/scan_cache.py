@@ -0,0 +1,54 @@
+"""Persistent cache of scan verdicts keyed by content and signature version."""
+
+import time
+from typing import Optional, Tuple
+
+from app.core.hashing import JsonCache
+
+class ScanCache(JsonCache):
+    """Scan verdicts keyed by SHA256 and scanner type.
+    
+    Each entry records the signature database version it was produced
+    with; a lookup under a different version misses and drops the entry,
+    so a signature update invalidates every stale verdict for that scanner.
+    """
+    
+    label = "cached scan verdicts"
+    
+    @staticmethod
+    def _key(sha256: str, scanner_type: str) -> str:
+        return f"{scanner_type}:{sha256.lower()}"
+    
+    def lookup(self, sha256: str, scanner_type: str, signature_version: str) -> Optional[Tuple[str, str]]:
+        """Return the cached (result, detail) if the signature version matches."""
+        key = self._key(sha256, scanner_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature_version:
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                del self._entries[key]
+                self._dirty = True
+            self.misses += 1
+            return None
+    
+    def store(self, sha256: str, scanner_type: str, signature_version: str, result: str, detail: str):
+        """Record a verdict for content scanned under a signature version."""
+        with self._lock:
+            self._entries[self._key(sha256, scanner_type)] = [signature_version, result, detail, time.time()]
+            self._dirty = True
+    
+    def prune(self, scanner_type: str, signature_version: str) -> int:
+        """Drop every entry of a scanner made under another signature version."""
+        prefix = f"{scanner_type}:"
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if key.startswith(prefix) and entry[0] != signature_version
+            ]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._dirty = True
+        return len(stale)
@@ -0,0 +1,221 @@
+"""Concurrent scan queue on top of SecurityManager."""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.security import ScanResult, SecurityManager
+
+logger = logging.getLogger(__name__)
+
+# Number of recent scan latencies kept for percentile metrics.
+LATENCY_WINDOW = 1000
+
+@dataclass(eq=False)
+class ScanJob:
+    """A request to scan one file, resolved when its scan finishes."""
+    job_id: int
+    path: Path
+    sha256: str
+    submitted_at: float = field(default_factory=time.monotonic)
+    state: str = "pending"
+    result: Optional[Tuple[ScanResult, str]] = None
+    deduplicated: bool = False
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> Optional[Tuple[ScanResult, str]]:
+        """Block until the job finishes and return its result."""
+        self._done.wait(timeout)
+        return self.result
+
+@dataclass(eq=False)
+class _ScanTask:
+    """One scan of a content hash shared by every job that requested it."""
+    sha256: str
+    path: Path
+    jobs: List[ScanJob] = field(default_factory=list)
+    submitted_at: float = field(default_factory=time.monotonic)
+
+class ScanQueue:
+    """Runs scans on N worker threads, deduplicating by SHA256.
+    
+    ``submit`` returns at once; a hashing thread computes each file's
+    SHA256 in submission order and hands it to the scan workers. A file
+    whose content is already queued or being scanned attaches its job to
+    the existing scan instead of scanning again. ``on_progress`` is called
+    as ``(completed, submitted)`` and ``on_complete`` with each finished or
+    cancelled job.
+    
+    With the "clamd" scanner every worker shares the one clamd session,
+    so scans run one at a time whatever the worker count; use
+    ``SecurityManager.scan_files`` to pipeline a known batch instead.
+    """
+    
+    def __init__(
+        self,
+        security_manager: SecurityManager,
+        workers: int = 4,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        on_complete: Optional[Callable[[ScanJob], None]] = None,
+    ):
+        self.security_manager = security_manager
+        self.on_progress = on_progress
+        self.on_complete = on_complete
+        self._hash_queue: "queue.Queue[Optional[ScanJob]]" = queue.Queue()
+        self._queue: "queue.Queue[Optional[_ScanTask]]" = queue.Queue()
+        self._inflight: Dict[str, _ScanTask] = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._submitted = 0
+        self._completed = 0
+        self._scans = 0
+        self._running = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._started_at = time.monotonic()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"scan-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._workers:
+            thread.start()
+        self._hasher = threading.Thread(target=self._hash_worker, name="scan-hash", daemon=True)
+        self._hasher.start()
+    
+    def submit(self, file_path: Path) -> ScanJob:
+        """Queue a file for scanning and return its job without hashing it."""
+        with self._lock:
+            job = ScanJob(job_id=self._next_id, path=Path(file_path), sha256="")
+            self._next_id += 1
+            self._submitted += 1
+        self._hash_queue.put(job)
+        return job
+    
+    def _hash_worker(self):
+        """Hash submitted files in order and queue or deduplicate their scans."""
+        while True:
+            job = self._hash_queue.get()
+            if job is None:
+                for _ in self._workers:
+                    self._queue.put(None)
+                return
+            if job.done:
+                continue
+            path = job.path
+            sha256 = self.security_manager.compute_sha256(path) if path.exists() else ""
+            with self._lock:
+                if job.done:
+                    continue
+                job.sha256 = sha256
+                task = self._inflight.get(sha256) if sha256 else None
+                if task is not None:
+                    job.deduplicated = True
+                    task.jobs.append(job)
+                    logger.debug(f"Deduplicated scan of {path.name} onto {task.path.name}")
+                    continue
+                task = _ScanTask(sha256=sha256, path=path, jobs=[job], submitted_at=job.submitted_at)
+                if sha256:
+                    self._inflight[sha256] = task
+            self._queue.put(task)
+    
+    def cancel(self, job: ScanJob) -> bool:
+        """Cancel a job that has not finished yet.
+        
+        The underlying scan is skipped if no other job still needs it; a scan
+        already in progress runs to completion for any remaining jobs.
+        """
+        with self._lock:
+            if job.done:
+                return False
+            task = self._inflight.get(job.sha256) if job.sha256 else None
+            if task is not None and job in task.jobs:
+                task.jobs.remove(job)
+            job.state = "cancelled"
+            job._done.set()
+            self._completed += 1
+        self._notify(job)
+        return True
+    
+    def _notify(self, job: ScanJob):
+        """Invoke callbacks for a finished job, never letting them kill a worker."""
+        try:
+            if self.on_complete:
+                self.on_complete(job)
+            if self.on_progress:
+                self.on_progress(self._completed, self._submitted)
+        except Exception as e:
+            logger.error(f"Scan callback failed: {e}")
+    
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            with self._lock:
+                task.jobs = [job for job in task.jobs if not job.done]
+                if not task.jobs:
+                    self._inflight.pop(task.sha256, None)
+                    continue
+                self._running += 1
+                for job in task.jobs:
+                    job.state = "running"
+            
+            try:
+                result = self.security_manager.scan_file(task.path)
+            except Exception as e:
+                logger.error(f"Scan of {task.path.name} failed: {e}")
+                result = (ScanResult.ERROR, str(e))
+            
+            with self._lock:
+                self._running -= 1
+                self._scans += 1
+                self._latencies.append(time.monotonic() - task.submitted_at)
+                if self._inflight.get(task.sha256) is task:
+                    del self._inflight[task.sha256]
+                finished = [job for job in task.jobs if not job.done]
+                for job in finished:
+                    job.result = result
+                    job.state = "done"
+                    job._done.set()
+                self._completed += len(finished)
+            for job in finished:
+                self._notify(job)
+    
+    def metrics(self) -> Dict[str, float]:
+        """Return queue depth, throughput and scan latency percentiles."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            elapsed = time.monotonic() - self._started_at
+            
+            def percentile(p: float) -> float:
+                if not latencies:
+                    return 0.0
+                return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+            
+            return {
+                "depth": self._hash_queue.qsize() + self._queue.qsize(),
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "scans": self._scans,
+                "throughput": self._scans / elapsed if elapsed > 0 else 0.0,
+                "latency_p50": percentile(0.50),
+                "latency_p95": percentile(0.95),
+                "latency_p99": percentile(0.99),
+            }
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the workers after the queued scans drain."""
+        self._hash_queue.put(None)
+        if wait:
+            self._hasher.join()
+            for thread in self._workers:
+                thread.join()
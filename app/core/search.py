@@ -0,0 +1,244 @@
+"""In-memory search indexes for games, trainers and abbreviations."""
+
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+_ROMAN_NUMERALS = {
+    "ii": "2", "iii": "3", "iv": "4", "v": "5", "vi": "6", "vii": "7",
+    "viii": "8", "ix": "9", "x": "10", "xi": "11", "xii": "12", "xiii": "13",
+}
+
+def normalize_key(name: str) -> str:
+    """Normalize a game or trainer name for case-insensitive lookups."""
+    return name.strip().casefold()
+
+@dataclass(frozen=True)
+class Completion:
+    """A single autocomplete suggestion."""
+    text: str
+    kind: str
+    matched: str
+
+class PrefixIndex:
+    """Sorted-array prefix index searched with bisect.
+    
+    Entries are grouped by kind ("game", "trainer", "abbreviation") so a
+    reload of one table only re-sorts that table's keys.
+    """
+    
+    def __init__(self):
+        self._keys: Dict[str, List[str]] = {}
+        self._entries: Dict[str, List[Tuple[str, str]]] = {}
+    
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._keys.values())
+    
+    def set_entries(self, kind: str, entries: Iterable[Tuple[str, str]]):
+        """Replace all entries of a kind with (matched, text) pairs."""
+        rows = sorted((normalize_key(matched), matched, text) for matched, text in entries)
+        self._keys[kind] = [row[0] for row in rows]
+        self._entries[kind] = [(row[1], row[2]) for row in rows]
+    
+    def add(self, kind: str, matched: str, text: str):
+        """Insert a single entry, keeping the kind's arrays sorted."""
+        key = normalize_key(matched)
+        keys = self._keys.setdefault(kind, [])
+        entries = self._entries.setdefault(kind, [])
+        lo = bisect_left(keys, key)
+        hi = bisect_right(keys, key, lo)
+        pos = bisect_left(entries, (matched, text), lo, hi)
+        keys.insert(pos, key)
+        entries.insert(pos, (matched, text))
+    
+    def remove(self, kind: str, matched: str, text: str) -> bool:
+        """Remove a single entry, returning whether it was present."""
+        key = normalize_key(matched)
+        keys = self._keys.get(kind, [])
+        entries = self._entries.get(kind, [])
+        lo = bisect_left(keys, key)
+        hi = bisect_right(keys, key, lo)
+        pos = bisect_left(entries, (matched, text), lo, hi)
+        if pos < hi and entries[pos] == (matched, text):
+            del keys[pos]
+            del entries[pos]
+            return True
+        return False
+    
+    def _iter_kind(self, kind: str, prefix: str) -> Iterator[Tuple[str, str, str, str]]:
+        """Yield (key, kind, matched, text) for entries of a kind starting with prefix."""
+        keys = self._keys[kind]
+        entries = self._entries[kind]
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                return
+            matched, text = entries[i]
+            yield key, kind, matched, text
+    
+    def complete(self, prefix: str, limit: int = 10) -> List[Completion]:
+        """Return up to ``limit`` completions for a prefix.
+        
+        Exact key matches sort first, followed by longer keys in
+        lexicographic order. Suggestions resolving to the same text are
+        reported once.
+        """
+        prefix = normalize_key(prefix)
+        if not prefix or limit <= 0:
+            return []
+        
+        merged = heapq.merge(*(self._iter_kind(kind, prefix) for kind in self._keys))
+        results: List[Completion] = []
+        seen = set()
+        for _key, kind, matched, text in merged:
+            if text in seen:
+                continue
+            seen.add(text)
+            results.append(Completion(text=text, kind=kind, matched=matched))
+            if len(results) >= limit:
+                break
+        return results
+
+def normalize_title(text: str) -> str:
+    """Normalize a title for fuzzy matching.
+    
+    Strips accents and punctuation, spells out "&" and maps Roman numerals
+    to digits so "Final Fantasy VII: Remake" and "final fantasy 7 remake"
+    normalize identically.
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    text = _NON_ALNUM.sub(" ", text.casefold().replace("&", " and "))
+    return " ".join(_ROMAN_NUMERALS.get(word, word) for word in text.split())
+
+def trigrams(text: str) -> Set[str]:
+    """Return the padded character trigrams of a normalized title."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A ranked fuzzy search result."""
+    key: str
+    text: str
+    score: float
+
+class TrigramIndex:
+    """Inverted trigram index with Dice-coefficient ranking.
+    
+    Postings are sets of integer document ids. A query counts shared
+    trigrams for every candidate in one batched ``Counter.update`` per
+    query trigram, then ranks candidates with ``heapq.nlargest``.
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._texts: List[Optional[str]] = []
+        self._sizes: List[int] = []
+        self._grams: List[Tuple[str, ...]] = []
+        self._free: List[int] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self.last_search_seconds = 0.0
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+    
+    def add(self, key: str, text: str):
+        """Index ``text`` under ``key``, replacing any previous entry."""
+        if key in self._ids:
+            if self._texts[self._ids[key]] == text:
+                return
+            self.remove(key)
+        
+        grams = tuple(trigrams(normalize_title(text)))
+        if self._free:
+            doc_id = self._free.pop()
+            self._keys[doc_id] = key
+            self._texts[doc_id] = text
+            self._sizes[doc_id] = len(grams)
+            self._grams[doc_id] = grams
+        else:
+            doc_id = len(self._keys)
+            self._keys.append(key)
+            self._texts.append(text)
+            self._sizes.append(len(grams))
+            self._grams.append(grams)
+        
+        self._ids[key] = doc_id
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(doc_id)
+    
+    def remove(self, key: str):
+        """Remove the entry for ``key`` if present."""
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return
+        
+        for gram in self._grams[doc_id]:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+        
+        self._keys[doc_id] = None
+        self._texts[doc_id] = None
+        self._sizes[doc_id] = 0
+        self._grams[doc_id] = ()
+        self._free.append(doc_id)
+    
+    def sync(self, entries: Mapping[str, str]) -> Tuple[int, int]:
+        """Bring the index in line with ``entries`` touching only changed keys.
+        
+        Returns the number of (added or updated, removed) entries.
+        """
+        removed = [key for key in self._ids if key not in entries]
+        for key in removed:
+            self.remove(key)
+        
+        changed = 0
+        for key, text in entries.items():
+            doc_id = self._ids.get(key)
+            if doc_id is None or self._texts[doc_id] != text:
+                self.add(key, text)
+                changed += 1
+        return changed, len(removed)
+    
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> List[SearchHit]:
+        """Return up to ``limit`` entries ranked by trigram similarity."""
+        start = time.perf_counter()
+        try:
+            normalized = normalize_title(query)
+            if not normalized or limit <= 0:
+                return []
+            
+            query_grams = trigrams(normalized)
+            counts: Counter = Counter()
+            for gram in query_grams:
+                posting = self._postings.get(gram)
+                if posting:
+                    counts.update(posting)
+            
+            query_size = len(query_grams)
+            sizes = self._sizes
+            scored = (
+                (2.0 * shared / (query_size + sizes[doc_id]), doc_id)
+                for doc_id, shared in counts.items()
+            )
+            best = heapq.nlargest(limit, (item for item in scored if item[0] >= min_score))
+            return [
+                SearchHit(key=self._keys[doc_id], text=self._texts[doc_id], score=round(score, 4))
+                for score, doc_id in best
+            ]
+        finally:
+            self.last_search_seconds = time.perf_counter() - start
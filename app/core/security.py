@@ -1,14 +1,29 @@
 """Security and scanning functionality for Game Trainer Manager."""
 
-import hashlib
 import logging
+import os
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.clamd import DEFAULT_SOCKET, ClamdClient, ClamdError, parse_reply
+from app.core.hashing import HashCache, HashCancelled, JsonCache, hash_file, hash_file_digests
+from app.core.pe import PEFormatError, PEInfo, parse_pe
+from app.core.quarantine import QuarantineStore
+from app.core.scan_cache import ScanCache
 
 logger = logging.getLogger(__name__)
 
+# How long a looked-up signature database version is trusted before the
+# scanner is asked again.
+SIGNATURE_VERSION_TTL = 300
+
+DEFENDER_SIGNATURE_KEY = r"SOFTWARE\Microsoft\Windows Defender\Signature Updates"
+
 class ScanResult(Enum):
     """Enumeration of scan result states."""
     CLEAN = "clean"
@@ -19,25 +34,135 @@ class ScanResult(Enum):
 class SecurityManager:
     """Handles security operations: checksums, scanning, quarantine."""
     
-    def __init__(self, quarantine_path: Path, scanner_type: str = "windows_defender"):
+    def __init__(
+        self,
+        quarantine_path: Path,
+        scanner_type: str = "windows_defender",
+        hash_cache_path: Optional[Path] = None,
+        clamd_socket: Optional[Path] = None,
+        scan_timeout: float = 60,
+    ):
         self.quarantine_path = quarantine_path
         self.quarantine_path.mkdir(parents=True, exist_ok=True)
         self.scanner_type = scanner_type
+        self.scan_timeout = scan_timeout
+        self.hash_cache = HashCache(hash_cache_path or quarantine_path / ".hash_cache.json")
+        self.clamd = ClamdClient(clamd_socket or DEFAULT_SOCKET, timeout=scan_timeout)
+        self.scan_cache = ScanCache(quarantine_path / ".scan_cache.json")
+        self.pe_cache = JsonCache(quarantine_path / ".pe_cache.json")
+        self.quarantine = QuarantineStore(quarantine_path)
+        self._signature_version: Optional[Tuple[str, float]] = None
     
-    def compute_sha256(self, file_path: Path) -> str:
-        """Compute SHA256 checksum of a file."""
+    def compute_sha256(self, file_path: Path, use_cache: bool = True) -> str:
+        """Compute SHA256 checksum of a file.
+        
+        Digests are cached by path, size, mtime_ns and inode, so an
+        unchanged file is not read again. The cache is written at batch
+        boundaries and by ``save_caches``, not after every file.
+        """
         try:
-            sha256_hash = hashlib.sha256()
-            with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            checksum = sha256_hash.hexdigest()
+            before = os.stat(file_path)
+            if use_cache:
+                cached = self.hash_cache.lookup(file_path, before)
+                if cached is not None:
+                    logger.debug(f"SHA256 cache hit for {file_path.name}")
+                    return cached
+            
+            checksum = hash_file(file_path)
+            
+            if use_cache:
+                self.hash_cache.store(file_path, before, os.stat(file_path), checksum)
             logger.info(f"Computed SHA256 for {file_path.name}: {checksum}")
             return checksum
         except Exception as e:
             logger.error(f"Failed to compute SHA256: {e}")
             return ""
     
+    def compute_digests(self, file_path: Path, algorithms: Iterable[str] = ("sha256",)) -> Dict[str, str]:
+        """Compute several digests (md5, sha1, sha256, blake2, ...) in one read.
+        
+        A SHA256 computed along the way also refreshes the digest cache.
+        """
+        try:
+            before = os.stat(file_path)
+            digests = hash_file_digests(file_path, algorithms)
+            if "sha256" in digests:
+                self.hash_cache.store(file_path, before, os.stat(file_path), digests["sha256"])
+            return digests
+        except Exception as e:
+            logger.error(f"Failed to compute digests: {e}")
+            return {}
+    
+    def _hash_one(self, file_path: Path, cancel_event: Optional[threading.Event]) -> str:
+        """Hash a single file for ``hash_files``, consulting the cache."""
+        before = os.stat(file_path)
+        cached = self.hash_cache.lookup(file_path, before)
+        if cached is not None:
+            return cached
+        checksum = hash_file(file_path, "sha256", cancel_event)
+        self.hash_cache.store(file_path, before, os.stat(file_path), checksum)
+        return checksum
+    
+    def hash_files(
+        self,
+        file_paths: Iterable[Path],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, Path], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Dict[Path, str]:
+        """Compute SHA256 checksums for many files concurrently.
+        
+        Files are read in 1 MiB blocks on a thread pool. ``progress_callback``
+        is called as ``(done, total, path)`` after each file. Setting
+        ``cancel_event`` stops the job early; files finished so far are still
+        returned. Files that cannot be read map to an empty string, matching
+        ``compute_sha256``.
+        """
+        paths = list(dict.fromkeys(Path(p) for p in file_paths))
+        total = len(paths)
+        results: Dict[Path, str] = {}
+        if not paths:
+            return results
+        
+        workers = max_workers or min(8, (os.cpu_count() or 1) + 2, total)
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as executor:
+            futures = {executor.submit(self._hash_one, path, cancel_event): path for path in paths}
+            try:
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        results[path] = future.result()
+                    except HashCancelled:
+                        continue
+                    except Exception as e:
+                        logger.error(f"Failed to compute SHA256 for {path.name}: {e}")
+                        results[path] = ""
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, total, path)
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+            finally:
+                for future in futures:
+                    future.cancel()
+        
+        self.hash_cache.save()
+        if cancel_event is not None and cancel_event.is_set():
+            logger.info(f"Bulk hashing cancelled after {done}/{total} files")
+        else:
+            logger.info(f"Hashed {total} files with {workers} workers")
+        return results
+    
+    def save_caches(self):
+        """Write the digest, scan verdict and PE info caches if they changed."""
+        for cache in (self.hash_cache, self.scan_cache, self.pe_cache):
+            cache.save()
+    
+    def hash_cache_stats(self) -> Dict[str, int]:
+        """Return SHA256 cache hit/miss counters for monitoring."""
+        return self.hash_cache.stats()
+    
     def verify_checksum(self, file_path: Path, expected_checksum: str) -> bool:
         """Verify file checksum against expected value."""
         if not expected_checksum:
@@ -54,18 +179,132 @@ class SecurityManager:
         
         return is_valid
     
-    def scan_file(self, file_path: Path) -> Tuple[ScanResult, str]:
+    def scan_file(self, file_path: Path, use_cache: bool = True) -> Tuple[ScanResult, str]:
         """Scan file with configured scanner."""
         if not file_path.exists():
             return ScanResult.ERROR, "File not found"
+        return self.scan_files([file_path], use_cache)[file_path]
+    
+    def scan_files(
+        self, file_paths: Iterable[Path], use_cache: bool = True
+    ) -> Dict[Path, Tuple[ScanResult, str]]:
+        """Scan several files, pipelining them over one clamd session when possible.
+        
+        Verdicts are cached by SHA256, scanner type and signature version, so
+        unchanged content is not rescanned until the signatures change.
+        """
+        paths = list(file_paths)
+        results = {path: (ScanResult.ERROR, "File not found") for path in paths if not path.exists()}
+        pending = [path for path in paths if path not in results]
         
+        version = self.signature_version() if use_cache and pending else ""
+        digests: Dict[Path, str] = {}
+        if version:
+            uncached = []
+            for path in pending:
+                digest = self.compute_sha256(path)
+                cached = self.scan_cache.lookup(digest, self.scanner_type, version) if digest else None
+                if cached is not None:
+                    logger.info(f"Scan cache hit for {path.name}")
+                    results[path] = (ScanResult(cached[0]), cached[1])
+                else:
+                    digests[path] = digest
+                    uncached.append(path)
+            pending = uncached
+        
+        fresh = self._scan_uncached(pending)
+        results.update(fresh)
+        
+        if version:
+            for path, (result, detail) in fresh.items():
+                if digests.get(path) and result in (ScanResult.CLEAN, ScanResult.SUSPICIOUS):
+                    self.scan_cache.store(digests[path], self.scanner_type, version, result.value, detail)
+            self.scan_cache.save()
+            self.hash_cache.save()
+        return results
+    
+    def _scan_uncached(self, paths: List[Path]) -> Dict[Path, Tuple[ScanResult, str]]:
+        """Dispatch existing files to the configured scanner."""
+        if not paths:
+            return {}
         if self.scanner_type == "windows_defender":
-            return self._scan_windows_defender(file_path)
+            return {path: self._scan_windows_defender(path) for path in paths}
         elif self.scanner_type == "clamav":
-            return self._scan_clamav(file_path)
+            return {path: self._scan_clamav(path) for path in paths}
+        elif self.scanner_type == "clamd":
+            return self._scan_clamd(paths)
         else:
             logger.warning(f"Unknown scanner type: {self.scanner_type}")
-            return ScanResult.NOT_SCANNED, "Scanner not configured"
+            return {path: (ScanResult.NOT_SCANNED, "Scanner not configured") for path in paths}
+    
+    def _scan_clamd(self, paths: List[Path]) -> Dict[Path, Tuple[ScanResult, str]]:
+        """Scan using the clamd session, falling back to clamscan."""
+        try:
+            replies = self.clamd.scan_files(paths)
+        except ClamdError as e:
+            logger.info(f"clamd unavailable, falling back to clamscan: {e}")
+            return {path: self._scan_clamav(path) for path in paths}
+        
+        results = {}
+        for path, reply in replies.items():
+            status, detail = parse_reply(reply)
+            if status == "OK":
+                logger.info(f"clamd scan clean: {path.name}")
+                results[path] = (ScanResult.CLEAN, "No threats detected")
+            elif status == "FOUND":
+                logger.warning(f"clamd found issues: {path.name}: {detail}")
+                results[path] = (ScanResult.SUSPICIOUS, detail)
+            else:
+                logger.error(f"clamd error for {path.name}: {detail}")
+                results[path] = (ScanResult.ERROR, detail)
+        return results
+    
+    def signature_version(self) -> str:
+        """Return the scanner's signature database version, or "" if unknown.
+        
+        The value is cached for a few minutes; when it changes, cached
+        verdicts made under the old version are pruned.
+        """
+        now = time.monotonic()
+        if self._signature_version is not None and now - self._signature_version[1] < SIGNATURE_VERSION_TTL:
+            return self._signature_version[0]
+        
+        version = ""
+        try:
+            if self.scanner_type == "clamd":
+                try:
+                    version = _clamav_signature_version(self.clamd.version())
+                except ClamdError:
+                    version = self._clamscan_signature_version()
+            elif self.scanner_type == "clamav":
+                version = self._clamscan_signature_version()
+            elif self.scanner_type == "windows_defender":
+                version = _defender_signature_version()
+        except Exception as e:
+            logger.warning(f"Could not determine signature version: {e}")
+        
+        previous = self._signature_version[0] if self._signature_version else None
+        self._signature_version = (version, now)
+        if version and version != previous:
+            pruned = self.scan_cache.prune(self.scanner_type, version)
+            if pruned:
+                logger.info(f"Signatures now {version}; dropped {pruned} stale scan verdicts")
+                self.scan_cache.save()
+        return version
+    
+    def _clamscan_signature_version(self) -> str:
+        """Ask clamscan for the loaded signature database version."""
+        try:
+            result = subprocess.run(
+                ["clamscan", "--version"], capture_output=True, timeout=self.scan_timeout, text=True
+            )
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            return ""
+        return _clamav_signature_version(result.stdout.strip()) if result.returncode == 0 else ""
+    
+    def scan_cache_stats(self) -> Dict[str, int]:
+        """Return scan verdict cache hit/miss counters for monitoring."""
+        return self.scan_cache.stats()
     
     def _scan_windows_defender(self, file_path: Path) -> Tuple[ScanResult, str]:
         """Scan using Windows Defender (MpCmdRun.exe)."""
@@ -78,7 +317,7 @@ class SecurityManager:
             result = subprocess.run(
                 [str(defender_path), "-Scan", "-ScanType", "3", "-File", str(file_path)],
                 capture_output=True,
-                timeout=60,
+                timeout=self.scan_timeout,
                 text=True
             )
             
@@ -102,7 +341,7 @@ class SecurityManager:
             result = subprocess.run(
                 ["clamscan", "--quiet", str(file_path)],
                 capture_output=True,
-                timeout=60,
+                timeout=self.scan_timeout,
                 text=True
             )
             
@@ -127,19 +366,32 @@ class SecurityManager:
             return ScanResult.ERROR, str(e)
     
     def move_to_quarantine(self, file_path: Path) -> Tuple[bool, Path]:
-        """Move file to quarantine folder."""
+        """Move file into the content-addressed quarantine store.
+        
+        Returns the blob path; identical content is stored only once.
+        """
         try:
             if not file_path.exists():
                 return False, Path()
             
-            dest = self.quarantine_path / file_path.name
-            file_path.rename(dest)
+            checksum = self.compute_sha256(file_path)
+            entry = self.quarantine.add(file_path, checksum or None)
+            self.hash_cache.invalidate(file_path)
+            self.hash_cache.save()
             logger.info(f"Moved to quarantine: {file_path.name}")
-            return True, dest
+            return True, entry.path
         except Exception as e:
             logger.error(f"Failed to move to quarantine: {e}")
             return False, Path()
     
+    def release_from_quarantine(self, sha256: str, dest_dir: Path, keep: bool = False) -> Tuple[bool, Path]:
+        """Promote a quarantined blob into ``dest_dir`` under its original name."""
+        try:
+            return True, self.quarantine.promote(sha256, dest_dir, keep=keep)
+        except Exception as e:
+            logger.error(f"Failed to release from quarantine: {e}")
+            return False, Path()
+    
     def is_pe_file(self, file_path: Path) -> bool:
         """Check if file is a PE (Portable Executable) file."""
         try:
@@ -149,3 +401,69 @@ class SecurityManager:
         except Exception as e:
             logger.error(f"Failed to check PE header: {e}")
             return False
+    
+    def get_pe_info(self, file_path: Path) -> Optional[PEInfo]:
+        """Return PE header metadata, or None if the file is not a valid PE.
+        
+        Results are cached by SHA256, so renamed or copied files are not
+        parsed again.
+        """
+        return self.get_pe_infos([file_path])[Path(file_path)]
+    
+    def get_pe_infos(
+        self, file_paths: Iterable[Path], max_workers: Optional[int] = None
+    ) -> Dict[Path, Optional[PEInfo]]:
+        """Return PE header metadata for many files at once.
+        
+        Files are hashed with ``hash_files``, each distinct uncached content
+        is parsed once on a thread pool, and every cache is saved once.
+        """
+        paths = list(dict.fromkeys(Path(p) for p in file_paths))
+        digests = self.hash_files(paths, max_workers)
+        results: Dict[Path, Optional[PEInfo]] = {}
+        to_parse: Dict[str, Path] = {}
+        for path in paths:
+            checksum = digests.get(path, "")
+            cached = self.pe_cache.get(checksum) if checksum else {}
+            if cached is None:
+                to_parse.setdefault(checksum, path)
+            else:
+                results[path] = PEInfo.from_dict(cached) if cached else None
+        
+        def parse(path: Path) -> Optional[PEInfo]:
+            try:
+                return parse_pe(path)
+            except (OSError, PEFormatError) as e:
+                logger.info(f"Not a parseable PE file: {path.name}: {e}")
+                return None
+        
+        if to_parse:
+            workers = max_workers or min(8, (os.cpu_count() or 1) + 2, len(to_parse))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pe") as executor:
+                parsed = dict(zip(to_parse, executor.map(parse, to_parse.values())))
+            for checksum, info in parsed.items():
+                self.pe_cache.put(checksum, info.to_dict() if info else {})
+            self.pe_cache.save()
+            for path in paths:
+                if path not in results:
+                    results[path] = parsed[digests[path]]
+        return results
+
+def _clamav_signature_version(version: str) -> str:
+    """Extract "engine/daily" from "ClamAV 1.0.0/27000/Thu Jan  1 ..."."""
+    parts = version.split("/")
+    if len(parts) < 2 or not version.startswith("ClamAV"):
+        return ""
+    return f"{parts[0].split()[-1]}/{parts[1]}"
+
+def _defender_signature_version() -> str:
+    """Read the Defender antivirus signature version from the registry."""
+    try:
+        import winreg
+    except ImportError:
+        return ""
+    try:
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, DEFENDER_SIGNATURE_KEY) as key:
+            return str(winreg.QueryValueEx(key, "AVSignatureVersion")[0])
+    except OSError:
+        return ""
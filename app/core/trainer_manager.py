@@ -1,18 +1,173 @@
 """Core trainer file management logic."""
 
 import logging
+import os
 import shutil
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.hashing import hash_file
+from app.core.library_index import DuplicateGroup, LibraryIndex, ReconcileResult
+from app.core.matcher import FilenameMatcher
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
+class TrainerEntry:
+    """A trainer file found by ``scan_library``, with its stat data."""
+    name: str
+    relpath: str
+    size: int
+    mtime_ns: int
+    ino: int = 0
+    
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+@dataclass
+class ImportResult:
+    """Outcome of importing one file with ``add_trainers``."""
+    source: Path
+    success: bool
+    message: str
+    dest: Optional[Path] = None
+    method: str = ""
+    duplicate_of: str = ""
+
+# Linux FICLONE ioctl: share extents copy-on-write (btrfs, XFS, bcachefs).
+FICLONE = 0x40049409
+
+def _clone_file(source: Path, dest: Path, allow_hardlink: bool = False) -> str:
+    """Create ``dest`` with the contents of ``source`` as cheaply as possible.
+    
+    Tries a hardlink (only when allowed), a reflink clone, then an in-kernel
+    ``copy_file_range`` copy, and finally ``shutil.copyfile``. Returns the
+    method used.
+    """
+    if allow_hardlink:
+        try:
+            os.link(source, dest)
+            return "hardlink"
+        except OSError:
+            pass
+    
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        if sys.platform.startswith("linux"):
+            try:
+                import fcntl
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return "reflink"
+            except OSError:
+                pass
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+            except OSError:
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+        return "copy"
+
+def publish_file(tmp: Path, dest: Path):
+    """Move a staged file to ``dest`` without ever overwriting an existing file.
+    
+    Hardlinking fails if ``dest`` exists, unlike ``os.replace``. Filesystems
+    without hardlinks fall back to ``os.rename``, which refuses to overwrite
+    on Windows. Raises ``FileExistsError`` if ``dest`` was taken.
+    """
+    try:
+        os.link(tmp, dest)
+    except FileExistsError:
+        raise FileExistsError(f"Trainer already exists: {dest.name}") from None
+    except OSError:
+        if dest.exists():
+            raise FileExistsError(f"Trainer already exists: {dest.name}") from None
+        os.rename(tmp, dest)
+        return
+    tmp.unlink()
+
+def _try_hash(path: Path) -> str:
+    """SHA256 of a file, or "" if it cannot be read."""
+    try:
+        return hash_file(path)
+    except OSError as e:
+        logger.warning(f"Cannot hash {path.name}: {e}")
+        return ""
+
 class TrainerFileManager:
     """Manages local trainer files."""
     
     def __init__(self, trainers_path: Path):
         self.trainers_path = trainers_path
         self.trainers_path.mkdir(parents=True, exist_ok=True)
+        self.library_index = LibraryIndex(trainers_path / ".library_index.json")
+    
+    def load_library(self, trainers: Iterable = ()) -> ReconcileResult:
+        """Reconcile the library index with the trainers folder and save it.
+        
+        Only a directory scan is done; hashes are computed later when needed.
+        ``trainers`` (``Trainer`` records) are linked by local path or checksum.
+        """
+        result = self.library_index.reconcile(self.scan_library())
+        self.library_index.link_metadata(trainers)
+        self.library_index.save()
+        logger.info(
+            f"Library index: {len(self.library_index)} files, {len(result.added)} added, "
+            f"{len(result.removed)} removed, {len(result.renamed)} renamed, {len(result.changed)} changed"
+        )
+        return result
+    
+    def match_library(self, matcher: FilenameMatcher, min_score: float = 0.6) -> int:
+        """Link index records without a trainer to the best file name match.
+        
+        All unmatched files are matched in one batch. Returns the number of
+        files linked.
+        """
+        unmatched = [relpath for relpath, record in self.library_index.items() if not record.get("trainer")]
+        names = {relpath: relpath.rpartition("/")[2] for relpath in unmatched}
+        matches = matcher.match_many(set(names.values()), limit=1, min_score=min_score)
+        linked = 0
+        for relpath, name in names.items():
+            best = matches[name]
+            if best and best[0].trainer:
+                self.library_index.annotate(
+                    relpath, trainer=best[0].trainer, game=best[0].game, match_score=best[0].score
+                )
+                linked += 1
+        self.library_index.save()
+        logger.info(f"Matched {linked} of {len(unmatched)} unmatched trainer files")
+        return linked
+    
+    def scan_trainers(self, security_manager, relpaths: Optional[Iterable[str]] = None) -> Dict[str, tuple]:
+        """Scan library files and record each verdict in the library index.
+        
+        ``relpaths`` defaults to every indexed file. Returns the
+        ``(ScanResult, detail)`` of each scanned path.
+        """
+        relpaths = list(self.library_index.relpaths() if relpaths is None else relpaths)
+        paths = {self.trainers_path / relpath: relpath for relpath in relpaths}
+        results = security_manager.scan_files(paths)
+        for path, (result, detail) in results.items():
+            self.library_index.annotate(paths[path], verdict=result.value)
+        self.library_index.save()
+        logger.info(f"Scanned {len(results)} trainer files")
+        return {paths[path]: result for path, result in results.items()}
     
     def list_trainers(self) -> List[Path]:
         """List all .exe trainer files."""
@@ -24,6 +179,51 @@ class TrainerFileManager:
             logger.error(f"Failed to list trainers: {e}")
             return []
     
+    def scan_library(
+        self,
+        max_depth: Optional[int] = None,
+        extensions: Iterable[str] = (".exe",),
+        skip_dirs: Iterable[str] = ("quarantine",),
+    ) -> List[TrainerEntry]:
+        """Recursively list trainer files with ``os.scandir``.
+        
+        ``max_depth`` limits how many subfolder levels are entered (0 means
+        the top folder only, None means unlimited). Hidden folders and
+        ``skip_dirs`` are not entered. Entries carry the size and mtime from
+        the directory scan, so callers need no further ``stat`` calls, and
+        are sorted by relative path.
+        """
+        suffixes = tuple(ext.lower() for ext in extensions)
+        skip = {name.casefold() for name in skip_dirs}
+        entries: List[TrainerEntry] = []
+        stack = [(str(self.trainers_path), "", 0)]
+        while stack:
+            directory, prefix, depth = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if max_depth is not None and depth >= max_depth:
+                                continue
+                            if entry.name.startswith(".") or entry.name.casefold() in skip:
+                                continue
+                            stack.append((entry.path, f"{prefix}{entry.name}/", depth + 1))
+                        elif entry.name.lower().endswith(suffixes) and entry.is_file():
+                            stat = entry.stat()
+                            entries.append(TrainerEntry(
+                                name=entry.name,
+                                relpath=prefix + entry.name,
+                                size=stat.st_size,
+                                mtime_ns=stat.st_mtime_ns,
+                                ino=stat.st_ino,
+                            ))
+            except OSError as e:
+                logger.warning(f"Cannot scan {directory}: {e}")
+        
+        entries.sort(key=lambda entry: entry.relpath)
+        logger.info(f"Scanned {len(entries)} trainer files")
+        return entries
+    
     def add_trainer(self, source_path: Path) -> Tuple[bool, str]:
         """Add a trainer file to the trainers folder."""
         try:
@@ -46,6 +246,152 @@ class TrainerFileManager:
             logger.error(f"Failed to add trainer: {e}")
             return False, str(e)
     
+    def add_trainers(
+        self,
+        source_paths: Iterable[Path],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, ImportResult], None]] = None,
+        allow_hardlink: bool = False,
+        duplicates: str = "skip",
+    ) -> List[ImportResult]:
+        """Import many trainer files concurrently.
+        
+        Each file is validated, cloned to a hidden temporary name in the
+        trainers folder and linked into place, so a failed or interrupted
+        import never leaves a partial ``.exe`` behind and never overwrites a
+        file that appeared meanwhile. ``progress_callback`` is called as
+        ``(done, total, result)`` on the calling thread. Results are
+        returned in input order.
+        
+        Content already in the library (or earlier in the batch) is found
+        through the library index after hashing each source once.
+        ``duplicates`` decides what happens to it: "skip" (default), "link"
+        to hardlink the existing copy under the new name, or "allow".
+        """
+        sources = [Path(p) for p in source_paths]
+        total = len(sources)
+        results: List[Optional[ImportResult]] = [None] * total
+        if not sources:
+            return []
+        workers = max_workers or min(8, total)
+        done = 0
+        
+        def finish(index: int, result: ImportResult):
+            nonlocal done
+            results[index] = result
+            done += 1
+            if progress_callback:
+                progress_callback(done, total, result)
+        
+        pending = []
+        reserved = set()
+        for i, source in enumerate(sources):
+            error = self._validate_import(source, reserved)
+            if error:
+                finish(i, ImportResult(source, False, error))
+            else:
+                reserved.add(source.name.casefold())
+                pending.append(i)
+        
+        digests: Dict[int, str] = {}
+        links: Dict[int, str] = {}
+        if duplicates != "allow" and pending:
+            # Only library files sharing a size with an incoming file can be
+            # duplicates, so only those are hashed.
+            sizes = {}
+            for i in pending:
+                try:
+                    sizes[i] = sources[i].stat().st_size
+                except OSError as e:
+                    finish(i, ImportResult(sources[i], False, str(e)))
+            pending = list(sizes)
+            self.library_index.reconcile(self.scan_library())
+            self.library_index.hash_sizes(self.trainers_path, set(sizes.values()))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import-hash") as executor:
+                digests = dict(zip(pending, executor.map(lambda i: _try_hash(sources[i]), pending)))
+            
+            first_in_batch: Dict[str, str] = {}
+            unique = []
+            for i in pending:
+                sha256 = digests[i]
+                existing = self.library_index.paths_for_hash(sha256) if sha256 else []
+                original = existing[0] if existing else first_in_batch.get(sha256)
+                if original is None:
+                    if sha256:
+                        first_in_batch[sha256] = sources[i].name
+                    unique.append(i)
+                elif duplicates == "link":
+                    links[i] = original
+                else:
+                    finish(i, ImportResult(sources[i], False, f"Duplicate of {original}", duplicate_of=original))
+            pending = unique
+        
+        def import_one(index: int) -> ImportResult:
+            source = sources[index]
+            dest = self.trainers_path / source.name
+            tmp = self.trainers_path / f".{source.name}.{uuid.uuid4().hex}.tmp"
+            try:
+                method = _clone_file(source, tmp, allow_hardlink)
+                if method != "hardlink":
+                    shutil.copystat(source, tmp)
+                publish_file(tmp, dest)
+            except Exception as e:
+                tmp.unlink(missing_ok=True)
+                return ImportResult(source, False, str(e))
+            return ImportResult(source, True, f"Trainer added: {source.name}", dest, method)
+        
+        def link_one(index: int) -> ImportResult:
+            source = sources[index]
+            dest = self.trainers_path / source.name
+            try:
+                os.link(self.trainers_path / links[index], dest)
+            except OSError as e:
+                return ImportResult(source, False, str(e), duplicate_of=links[index])
+            return ImportResult(
+                source, True, f"Trainer linked to {links[index]}: {source.name}", dest, "hardlink",
+                duplicate_of=links[index],
+            )
+        
+        # Links run after copies so a duplicate within the batch has a target.
+        for job, indexes in ((import_one, pending), (link_one, list(links))):
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as executor:
+                futures = {executor.submit(job, i): i for i in indexes}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    result = future.result()
+                    if result.success and digests.get(index):
+                        stat = result.dest.stat()
+                        self.library_index.update(
+                            result.dest.relative_to(self.trainers_path).as_posix(),
+                            stat.st_size, stat.st_mtime_ns, digests[index], ino=stat.st_ino,
+                        )
+                    finish(index, result)
+        self.library_index.save()
+        
+        imported = sum(1 for result in results if result.success)
+        logger.info(f"Imported {imported}/{total} trainers")
+        return results
+    
+    def _validate_import(self, source: Path, reserved: set) -> str:
+        """Return why a file cannot be imported, or "" if it can."""
+        if not source.is_file():
+            return "Source file not found"
+        if source.suffix.lower() != ".exe":
+            return "Only .exe files are supported"
+        if (self.trainers_path / source.name).exists() or source.name.casefold() in reserved:
+            return f"Trainer already exists: {source.name}"
+        return ""
+    
+    def find_duplicates(self) -> List[DuplicateGroup]:
+        """Report groups of library files with identical content.
+        
+        Only files sharing a size with another file are hashed, and hashes
+        are reused from the library index while files are unchanged.
+        """
+        groups = self.library_index.find_duplicates(self.trainers_path, self.scan_library())
+        logger.info(f"Found {len(groups)} duplicate groups")
+        return groups
+    
     def remove_trainer(self, trainer_name: str) -> Tuple[bool, str]:
         """Remove a trainer file."""
         try:
@@ -2,12 +2,13 @@
 
 import logging
 import time
-import hashlib
 from pathlib import Path
 from typing import Tuple
 from urllib.request import urlopen
 from urllib.error import URLError
 
+from app.core.hashing import hash_file
+
 logger = logging.getLogger(__name__)
 
 class MetadataUpdater:
@@ -168,8 +169,4 @@ class MetadataUpdater:
     
     def _compute_checksum(self, file_path: Path) -> str:
         """Compute SHA256 checksum of file."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        return hash_file(file_path)
@@ -0,0 +1,153 @@
+"""Library-wide checksum verification of local trainer files."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.core.metadata import MetadataManager, Trainer
+from app.core.search import normalize_key
+from app.core.security import SecurityManager
+from app.core.trainer_manager import TrainerFileManager
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class VerificationEntry:
+    """Outcome of verifying one trainer file."""
+    path: Path
+    trainer: Optional[str] = None
+    expected: str = ""
+    actual: str = ""
+    reason: str = ""
+
+@dataclass
+class VerificationReport:
+    """Structured result of a library verification run."""
+    verified: List[VerificationEntry] = field(default_factory=list)
+    mismatched: List[VerificationEntry] = field(default_factory=list)
+    unknown: List[VerificationEntry] = field(default_factory=list)
+    missing: List[VerificationEntry] = field(default_factory=list)
+    cancelled: bool = False
+    elapsed_seconds: float = 0.0
+    cache_hits: int = 0
+    
+    @property
+    def ok(self) -> bool:
+        """Whether no file failed verification or went missing."""
+        return not self.mismatched and not self.missing
+    
+    def summary(self) -> Dict[str, int]:
+        """Return the number of entries in each category."""
+        return {
+            "verified": len(self.verified),
+            "mismatched": len(self.mismatched),
+            "unknown": len(self.unknown),
+            "missing": len(self.missing),
+        }
+
+class LibraryVerifier:
+    """Verifies every local trainer file against ``Trainer.checksum``.
+    
+    Files are matched to metadata by ``Trainer.local_path`` first, then by
+    comparing the file stem with the trainer name. All matched files are
+    hashed in one ``SecurityManager.hash_files`` pass, so unchanged files are
+    answered from the digest cache on repeat runs.
+    """
+    
+    def __init__(
+        self,
+        file_manager: TrainerFileManager,
+        metadata_manager: MetadataManager,
+        security_manager: SecurityManager,
+    ):
+        self.file_manager = file_manager
+        self.metadata_manager = metadata_manager
+        self.security_manager = security_manager
+    
+    def _match_trainers(self, files: List[Path]) -> Dict[Path, Optional[Trainer]]:
+        """Map each local file to its metadata entry, if any."""
+        by_file: Dict[str, Trainer] = {}
+        by_name: Dict[str, Trainer] = {}
+        for trainer in self.metadata_manager.trainers.values():
+            if trainer.local_path:
+                by_file[normalize_key(Path(trainer.local_path).name)] = trainer
+            by_name.setdefault(normalize_key(trainer.name), trainer)
+        
+        return {
+            path: by_file.get(normalize_key(path.name)) or by_name.get(normalize_key(path.stem))
+            for path in files
+        }
+    
+    def _missing_entries(self, files: List[Path]) -> List[VerificationEntry]:
+        """Return metadata entries whose recorded local file is absent."""
+        present = {normalize_key(path.name) for path in files}
+        missing = []
+        for trainer in self.metadata_manager.trainers.values():
+            if not trainer.local_path:
+                continue
+            name = Path(trainer.local_path).name
+            if normalize_key(name) not in present:
+                missing.append(VerificationEntry(
+                    path=self.file_manager.get_trainer_path(name),
+                    trainer=trainer.name,
+                    expected=trainer.checksum,
+                    reason="File not found",
+                ))
+        return missing
+    
+    def verify(
+        self,
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, Path], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> VerificationReport:
+        """Verify the whole library and return a report."""
+        start = time.perf_counter()
+        hits_before = self.security_manager.hash_cache.hits
+        report = VerificationReport()
+        
+        files = self.file_manager.list_trainers()
+        matches = self._match_trainers(files)
+        to_hash = []
+        for path, trainer in matches.items():
+            if trainer is None:
+                report.unknown.append(VerificationEntry(path=path, reason="No metadata entry"))
+            elif not trainer.checksum:
+                report.unknown.append(VerificationEntry(
+                    path=path, trainer=trainer.name, reason="No checksum in metadata"
+                ))
+            else:
+                to_hash.append(path)
+        
+        digests = self.security_manager.hash_files(
+            to_hash,
+            max_workers=max_workers,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+        )
+        report.cancelled = cancel_event is not None and cancel_event.is_set()
+        
+        for path in to_hash:
+            if path not in digests:
+                continue
+            trainer = matches[path]
+            entry = VerificationEntry(
+                path=path, trainer=trainer.name, expected=trainer.checksum, actual=digests[path]
+            )
+            if not entry.actual:
+                entry.reason = "Could not read file"
+                report.mismatched.append(entry)
+            elif entry.actual.lower() == entry.expected.lower():
+                report.verified.append(entry)
+            else:
+                entry.reason = "Checksum mismatch"
+                report.mismatched.append(entry)
+        
+        report.missing = self._missing_entries(files)
+        report.cache_hits = self.security_manager.hash_cache.hits - hits_before
+        report.elapsed_seconds = time.perf_counter() - start
+        logger.info(f"Library verification: {report.summary()} in {report.elapsed_seconds:.2f}s")
+        return report
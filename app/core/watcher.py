@@ -0,0 +1,346 @@
+"""Watches the trainers folder and reports incremental file changes."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+# IN_CLOSE_WRITE and IN_ATTRIB refresh the size of files still being
+# written when IN_CREATE arrived, so a later rename still pairs up.
+WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Events arriving within this window are coalesced into one rescan.
+DEBOUNCE_SECONDS = 0.05
+
+@dataclass(frozen=True)
+class WatchEvent:
+    """A file added to, removed from, renamed within or changed in the trainers folder."""
+    kind: str
+    relpath: str
+    old_relpath: str = ""
+
+class TrainerWatcher:
+    """Reports added, removed and renamed trainer files under ``root``.
+    
+    Change notification only tells the watcher which directories changed;
+    each changed directory is then listed once and diffed against the
+    previous listing. Files that vanish and reappear with the same device,
+    inode and size in one pass are reported as renames, which also covers
+    renamed folders. Files without an inode number are never paired.
+    Uses inotify on Linux and falls back to polling directory mtimes.
+    """
+    
+    def __init__(
+        self,
+        root: Path,
+        extensions: Iterable[str] = (".exe",),
+        skip_dirs: Iterable[str] = ("quarantine",),
+        poll_interval: float = 1.0,
+        callback: Optional[Callable[[List[WatchEvent]], None]] = None,
+        use_inotify: bool = True,
+    ):
+        self.root = Path(root)
+        self.suffixes = tuple(ext.lower() for ext in extensions)
+        self.skip = {name.casefold() for name in skip_dirs}
+        self.poll_interval = poll_interval
+        self.callback = callback
+        self._files: Dict[str, Tuple[int, int, int]] = {}
+        self._dirs: Dict[str, int] = {}
+        self._dir_files: Dict[str, Set[str]] = {}
+        self._dir_subdirs: Dict[str, Set[str]] = {}
+        self._events: "queue.Queue[WatchEvent]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = _Inotify.create() if use_inotify else None
+        self.backend = "inotify" if self._inotify else "polling"
+    
+    def start(self):
+        """Snapshot the folder and start watching in a background thread."""
+        self._dirs.clear()
+        self._dir_files.clear()
+        self._dir_subdirs.clear()
+        self._files.clear()
+        self._add_tree("", [])
+        target = self._run_inotify if self._inotify else self._run_polling
+        self._thread = threading.Thread(target=target, name="trainer-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.root} with {self.backend} ({len(self._files)} files)")
+    
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+        if self._inotify:
+            self._inotify.wake()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._inotify:
+            self._inotify.close()
+    
+    def files(self) -> List[str]:
+        """Return the relative paths currently known to the watcher."""
+        return sorted(self._files)
+    
+    def poll_events(self) -> List[WatchEvent]:
+        """Drain and return events reported since the last call."""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+    
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.root, rel) if rel else str(self.root)
+    
+    def _list_dir(self, rel_dir: str) -> Tuple[Dict[str, Tuple[int, int, int]], List[str], Optional[int]]:
+        """List one directory: (files with (dev, ino, size), subdirectories, mtime_ns)."""
+        files: Dict[str, Tuple[int, int, int]] = {}
+        subdirs: List[str] = []
+        path = self._abs(rel_dir)
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith(".") and entry.name.casefold() not in self.skip:
+                            subdirs.append(prefix + entry.name)
+                    elif entry.name.lower().endswith(self.suffixes) and entry.is_file():
+                        stat = entry.stat()
+                        if not stat.st_ino:
+                            # DirEntry.stat() leaves st_dev/st_ino at 0 on Windows.
+                            stat = os.stat(entry.path)
+                        files[prefix + entry.name] = (stat.st_dev, stat.st_ino, stat.st_size)
+        except OSError:
+            return {}, [], None
+        return files, subdirs, mtime
+    
+    def _add_tree(self, rel_dir: str, added: List[Tuple[str, Tuple[int, int, int]]]):
+        """Start tracking a directory and everything below it."""
+        if self._inotify:
+            self._inotify.watch(self._abs(rel_dir), rel_dir)
+        files, subdirs, mtime = self._list_dir(rel_dir)
+        if mtime is None:
+            return
+        self._dirs[rel_dir] = mtime
+        self._dir_files[rel_dir] = set(files)
+        self._dir_subdirs[rel_dir] = set()
+        for rel, identity in files.items():
+            self._files[rel] = identity
+            added.append((rel, identity))
+        for sub in subdirs:
+            self._add_tree(sub, added)
+            if sub in self._dirs:
+                self._dir_subdirs[rel_dir].add(sub)
+    
+    def _drop_tree(self, rel_dir: str, removed: List[Tuple[str, Tuple[int, int, int]]]):
+        """Stop tracking a directory and everything below it."""
+        for sub in self._dir_subdirs.pop(rel_dir, ()):
+            self._drop_tree(sub, removed)
+        for rel in self._dir_files.pop(rel_dir, ()):
+            removed.append((rel, self._files.pop(rel)))
+        self._dirs.pop(rel_dir, None)
+        if self._inotify:
+            self._inotify.unwatch(rel_dir)
+    
+    def _rescan(self, dirty: Set[str]):
+        """Diff the given directories against the last listing and emit events."""
+        added: List[Tuple[str, Tuple[int, int, int]]] = []
+        removed: List[Tuple[str, Tuple[int, int, int]]] = []
+        changed: List[WatchEvent] = []
+        for rel_dir in sorted(dirty, key=len):
+            if rel_dir not in self._dirs:
+                continue
+            files, subdirs, mtime = self._list_dir(rel_dir)
+            if mtime is None:
+                if rel_dir:
+                    self._drop_tree(rel_dir, removed)
+                    self._dir_subdirs.get(rel_dir.rpartition("/")[0], set()).discard(rel_dir)
+                continue
+            self._dirs[rel_dir] = mtime
+            
+            for rel in self._dir_files[rel_dir] - files.keys():
+                removed.append((rel, self._files.pop(rel)))
+            for rel, identity in files.items():
+                old = self._files.get(rel)
+                if old == identity:
+                    continue
+                self._files[rel] = identity
+                if old is not None and identity[1] and old[:2] == identity[:2]:
+                    # Same file, new size: it was written to.
+                    changed.append(WatchEvent("changed", rel))
+                    continue
+                if old is not None:
+                    removed.append((rel, old))
+                added.append((rel, identity))
+            self._dir_files[rel_dir] = set(files)
+            
+            known = self._dir_subdirs[rel_dir]
+            for sub in known - set(subdirs):
+                self._drop_tree(sub, removed)
+                known.discard(sub)
+            for sub in set(subdirs) - known:
+                self._add_tree(sub, added)
+                if sub in self._dirs:
+                    known.add(sub)
+        
+        # A file that disappeared and reappeared with the same inode moved.
+        removed_by_identity = {identity: rel for rel, identity in removed if identity[1]}
+        moved: Dict[str, str] = {}
+        appeared = []
+        for rel, identity in added:
+            old = removed_by_identity.pop(identity, None) if identity[1] else None
+            if old is None:
+                appeared.append(WatchEvent("added", rel))
+            elif old != rel:
+                moved[old] = rel
+            else:
+                moved[old] = old
+        
+        events = [WatchEvent("removed", rel) for rel, _ in removed if rel not in moved]
+        events.extend(WatchEvent("renamed", new, old) for old, new in moved.items() if old != new)
+        events.extend(appeared)
+        events.extend(changed)
+        self._publish(events)
+    
+    def _publish(self, events: List[WatchEvent]):
+        if not events:
+            return
+        for event in events:
+            self._events.put(event)
+        logger.debug(f"Watcher events: {events}")
+        if self.callback:
+            try:
+                self.callback(events)
+            except Exception as e:
+                logger.error(f"Watcher callback failed: {e}")
+    
+    def _run_polling(self):
+        while not self._stop.wait(self.poll_interval):
+            dirty = set()
+            for rel_dir, mtime in list(self._dirs.items()):
+                try:
+                    if os.stat(self._abs(rel_dir)).st_mtime_ns != mtime:
+                        dirty.add(rel_dir)
+                except OSError:
+                    dirty.add(rel_dir.rpartition("/")[0] if rel_dir else rel_dir)
+            if dirty:
+                self._rescan(dirty)
+    
+    def _run_inotify(self):
+        while not self._stop.is_set():
+            dirty = self._inotify.read(timeout=None)
+            while not self._stop.is_set():
+                more = self._inotify.read(timeout=DEBOUNCE_SECONDS)
+                if not more:
+                    break
+                dirty |= more
+            if self._stop.is_set():
+                return
+            if None in dirty:
+                logger.warning("inotify queue overflowed; rescanning all folders")
+                dirty = set(self._dirs)
+            if dirty:
+                self._rescan(dirty)
+
+class _Inotify:
+    """Thin ctypes wrapper around Linux inotify."""
+    
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self.fd = fd
+        self._wake_r, self._wake_w = os.pipe()
+        self._by_wd: Dict[int, str] = {}
+        self._by_dir: Dict[str, int] = {}
+    
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable, polling instead: {e}")
+            return None
+        if fd < 0:
+            logger.info("inotify_init1 failed, polling instead")
+            return None
+        return cls(libc, fd)
+    
+    def watch(self, path: str, rel_dir: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            logger.warning(f"Cannot watch {path}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._by_wd[wd] = rel_dir
+        self._by_dir[rel_dir] = wd
+    
+    def unwatch(self, rel_dir: str):
+        wd = self._by_dir.pop(rel_dir, None)
+        if wd is not None and self._by_wd.pop(wd, None) is not None:
+            self._libc.inotify_rm_watch(self.fd, wd)
+    
+    def read(self, timeout: Optional[float]) -> Set[Optional[str]]:
+        """Wait for events and return the changed directories (None on overflow)."""
+        ready, _, _ = select.select([self.fd, self._wake_r], [], [], timeout)
+        if self._wake_r in ready or not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        
+        dirty: Set[Optional[str]] = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                dirty.add(None)
+                continue
+            rel_dir = self._by_wd.get(wd)
+            if rel_dir is None:
+                continue
+            if mask & IN_IGNORED:
+                self._by_wd.pop(wd, None)
+                if self._by_dir.get(rel_dir) == wd:
+                    del self._by_dir[rel_dir]
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                dirty.add(rel_dir.rpartition("/")[0] if rel_dir else rel_dir)
+            else:
+                dirty.add(rel_dir)
+        return dirty
+    
+    def wake(self):
+        os.write(self._wake_w, b"\0")
+    
+    def close(self):
+        for fd in (self.fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
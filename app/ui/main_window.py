@@ -1,6 +1,7 @@
 """Main application window for Game Trainer Manager."""
 
 import logging
+import threading
 import webbrowser
 from pathlib import Path
 import sys
@@ -8,15 +9,19 @@ import sys
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
     QListWidget, QListWidgetItem, QLineEdit, QPushButton, QLabel,
-    QMessageBox, QFileDialog, QDialog, QComboBox, QCheckBox, QSpinBox
+    QMessageBox, QFileDialog, QDialog, QComboBox, QCheckBox, QSpinBox,
+    QProgressDialog
 )
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer
 from pathlib import Path
 
+from app.core.archive_ingest import ARCHIVE_SUFFIXES, ArchiveIngestor
 from app.core.config import Config
+from app.core.matcher import FilenameMatcher
 from app.core.metadata import MetadataManager
 from app.core.trainer_manager import TrainerFileManager
-from app.core.security import SecurityManager
+from app.core.security import ScanResult, SecurityManager
+from app.core.watcher import TrainerWatcher
 from app.ui.translations import Translator
 
 logger = logging.getLogger(__name__)
@@ -29,17 +34,34 @@ class MainWindow(QMainWindow):
         self.config = config
         self.translator = Translator(config.language)
         
-        self.metadata_manager = MetadataManager(Path("app/resources"))
+        self.metadata_manager = MetadataManager(
+            Path("app/resources"),
+            backend=config.metadata_backend,
+            lazy=True
+        )
         self.trainer_manager = TrainerFileManager(config.trainers_path)
         self.security_manager = SecurityManager(
             config.quarantine_path,
-            config.get("scanner_type", "windows_defender")
+            config.get("scanner_type", "windows_defender"),
+            clamd_socket=Path(config.get("clamd_socket", "/var/run/clamav/clamd.ctl")),
         )
         
+        self.trainer_items = {}
+        self.tooltips_stale = False
+        
+        # The library index fills the list; later changes arrive from the
+        # watcher's thread and are applied on the GUI thread by a timer.
+        self.watcher = TrainerWatcher(config.trainers_path)
+        self.watcher.start()
+        
         self.setWindowTitle(self.translator("title"))
         self.setSize(1000, 600)
         self.setup_ui()
         self.load_trainers()
+        
+        self.watch_timer = QTimer(self)
+        self.watch_timer.timeout.connect(self.apply_watch_events)
+        self.watch_timer.start(250)
     
     def setSize(self, width: int, height: int):
         """Set window size."""
@@ -62,6 +84,7 @@ class MainWindow(QMainWindow):
         
         # Trainers list
         self.trainers_list = QListWidget()
+        self.trainers_list.setSortingEnabled(True)
         self.trainers_list.itemDoubleClicked.connect(self.on_run_trainer)
         main_layout.addWidget(self.trainers_list)
         
@@ -110,41 +133,187 @@ class MainWindow(QMainWindow):
         edit_menu = menubar.addMenu("Edit")
         edit_menu.addAction("Settings", self.on_settings)
         
+        tools_menu = menubar.addMenu("Tools")
+        tools_menu.addAction("Scan Trainers", self.on_scan_trainers)
+        
         help_menu = menubar.addMenu("Help")
         help_menu.addAction("About", self.on_about)
     
     def load_trainers(self):
-        """Load all trainer files from trainers folder."""
+        """Load all trainer files from the library index."""
         self.trainers_list.clear()
-        trainers = self.trainer_manager.list_trainers()
+        self.trainer_items.clear()
+        self.trainer_manager.load_library()
+        trainers = self.trainer_manager.library_index.relpaths()
         
-        for trainer_path in trainers:
-            item = QListWidgetItem(trainer_path.name)
-            item.setData(Qt.UserRole, trainer_path)
-            self.trainers_list.addItem(item)
+        for relpath in trainers:
+            self.add_trainer_item(relpath)
         
         logger.info(f"Loaded {len(trainers)} trainers")
+        threading.Thread(target=self.match_trainers, name="trainer-matcher", daemon=True).start()
+    
+    def match_trainers(self):
+        """Link library files to metadata once it has loaded (background thread)."""
+        try:
+            self.trainer_manager.library_index.link_metadata(self.metadata_manager.trainers.values())
+            self.trainer_manager.match_library(FilenameMatcher.from_metadata(self.metadata_manager))
+        except Exception as e:
+            logger.error(f"Failed to match trainers: {e}")
+        self.tooltips_stale = True
+    
+    def update_tooltip(self, relpath: str):
+        """Show the matched game and last scan verdict of a trainer."""
+        item = self.trainer_items.get(relpath)
+        if item is None:
+            return
+        record = self.trainer_manager.library_index.record(relpath) or {}
+        lines = []
+        if record.get("game"):
+            lines.append(record["game"])
+        if record.get("verdict"):
+            lines.append(f"Scan: {record['verdict']}")
+        item.setToolTip("\n".join(lines))
+    
+    def add_trainer_item(self, relpath: str):
+        """Add a list item for a trainer path relative to the trainers folder."""
+        if relpath in self.trainer_items:
+            return
+        item = QListWidgetItem(relpath)
+        item.setData(Qt.UserRole, self.trainer_manager.get_trainer_path(relpath))
+        self.trainers_list.addItem(item)
+        self.trainer_items[relpath] = item
+        self.update_tooltip(relpath)
+    
+    def remove_trainer_item(self, relpath: str):
+        """Remove the list item for a trainer path, if shown."""
+        item = self.trainer_items.pop(relpath, None)
+        if item is not None:
+            self.trainers_list.takeItem(self.trainers_list.row(item))
+    
+    def apply_watch_events(self):
+        """Apply add/remove/rename events from the folder watcher to the list."""
+        if self.tooltips_stale:
+            self.tooltips_stale = False
+            for relpath in list(self.trainer_items):
+                self.update_tooltip(relpath)
+        events = self.watcher.poll_events()
+        if not events:
+            return
+        self.trainer_manager.library_index.apply_events(self.config.trainers_path, events)
+        self.trainer_manager.library_index.save()
+        for event in events:
+            if event.kind == "added":
+                self.add_trainer_item(event.relpath)
+            elif event.kind == "removed":
+                self.remove_trainer_item(event.relpath)
+            elif event.kind == "renamed":
+                item = self.trainer_items.pop(event.old_relpath, None)
+                if item is None:
+                    self.add_trainer_item(event.relpath)
+                    continue
+                item.setText(event.relpath)
+                item.setData(Qt.UserRole, self.trainer_manager.get_trainer_path(event.relpath))
+                self.trainer_items[event.relpath] = item
+                self.update_tooltip(event.relpath)
     
     def on_add_trainer(self):
-        """Handle adding a new trainer file."""
+        """Handle adding one or more trainer files."""
         file_dialog = QFileDialog()
-        file_dialog.setFileMode(QFileDialog.ExistingFile)
-        file_dialog.setNameFilter("Executable Files (*.exe);;All Files (*)")
+        file_dialog.setFileMode(QFileDialog.ExistingFiles)
+        file_dialog.setNameFilter("Trainers (*.exe *.zip *.7z);;Executable Files (*.exe);;All Files (*)")
         file_dialog.setDefaultSuffix("exe")
         
-        if file_dialog.exec():
-            selected_files = file_dialog.selectedFiles()
-            if selected_files:
-                source_path = Path(selected_files[0])
-                success, message = self.trainer_manager.add_trainer(source_path)
-                
-                if success:
-                    logger.info(f"Trainer added: {source_path.name}")
-                    QMessageBox.information(self, "Success", message)
-                    self.load_trainers()
-                else:
-                    logger.error(f"Failed to add trainer: {message}")
-                    QMessageBox.warning(self, "Error", message)
+        if not file_dialog.exec():
+            return
+        sources = [Path(f) for f in file_dialog.selectedFiles()]
+        if not sources:
+            return
+        
+        # Import on a background thread; the timer mirrors its progress into
+        # the dialog because widgets may only be touched on the GUI thread.
+        progress = QProgressDialog("Adding trainers...", None, 0, len(sources), self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        state = {"done": 0, "results": None}
+        archives = [s for s in sources if s.suffix.lower() in ARCHIVE_SUFFIXES]
+        files = [s for s in sources if s.suffix.lower() not in ARCHIVE_SUFFIXES]
+        
+        def run_import():
+            results = self.trainer_manager.add_trainers(
+                files,
+                progress_callback=lambda done, total, result: state.update(done=done),
+            )
+            ingestor = ArchiveIngestor(self.trainer_manager, self.security_manager.quarantine)
+            results += ingestor.ingest_many(
+                archives,
+                destination="trainers",
+                progress_callback=lambda done, total, path: state.update(done=len(files) + done),
+            )
+            state["results"] = results
+        
+        worker = threading.Thread(target=run_import, name="trainer-import", daemon=True)
+        timer = QTimer(self)
+        
+        def poll():
+            progress.setValue(state["done"])
+            if worker.is_alive():
+                return
+            timer.stop()
+            progress.close()
+            self.show_import_results(state["results"] or [])
+        
+        timer.timeout.connect(poll)
+        worker.start()
+        timer.start(100)
+    
+    def on_scan_trainers(self):
+        """Scan every trainer in the background and record the verdicts."""
+        state = {"results": None}
+        
+        def run_scan():
+            state["results"] = self.trainer_manager.scan_trainers(self.security_manager)
+        
+        worker = threading.Thread(target=run_scan, name="trainer-scan", daemon=True)
+        timer = QTimer(self)
+        
+        def poll():
+            if worker.is_alive():
+                return
+            timer.stop()
+            results = state["results"] or {}
+            for relpath in results:
+                self.update_tooltip(relpath)
+            suspicious = sorted(r for r, (result, _) in results.items() if result is ScanResult.SUSPICIOUS)
+            message = f"Scanned {len(results)} trainers."
+            if suspicious:
+                QMessageBox.warning(self, "Scan finished", f"{message}\n\nSuspicious:\n" + "\n".join(suspicious[:20]))
+            else:
+                QMessageBox.information(self, "Scan finished", message)
+        
+        timer.timeout.connect(poll)
+        worker.start()
+        timer.start(250)
+    
+    def show_import_results(self, results):
+        """Summarize a batch import, listing any failures."""
+        failed = [r for r in results if not r.success]
+        added = len(results) - len(failed)
+        for result in failed:
+            logger.error(f"Failed to add trainer {result.source.name}: {result.message}")
+        
+        if len(results) == 1:
+            if failed:
+                QMessageBox.warning(self, "Error", failed[0].message)
+            else:
+                QMessageBox.information(self, "Success", results[0].message)
+            return
+        
+        message = f"Added {added} of {len(results)} trainers."
+        if failed:
+            details = "\n".join(f"{r.source.name}: {r.message}" for r in failed[:20])
+            QMessageBox.warning(self, "Import finished", f"{message}\n\n{details}")
+        else:
+            QMessageBox.information(self, "Success", message)
     
     def on_open_folder(self):
         """Open trainers folder."""
@@ -217,7 +386,6 @@ class MainWindow(QMainWindow):
             success, message = self.trainer_manager.remove_trainer(trainer_name)
             if success:
                 QMessageBox.information(self, "Success", message)
-                self.load_trainers()
             else:
                 QMessageBox.warning(self, "Error", message)
     
@@ -230,6 +398,15 @@ class MainWindow(QMainWindow):
             logger.info("Settings updated")
     
     
+    def closeEvent(self, event):
+        """Release metadata, scanner and watcher resources when the window closes."""
+        self.metadata_manager.close()
+        self.security_manager.clamd.close()
+        self.security_manager.save_caches()
+        self.watch_timer.stop()
+        self.watcher.stop()
+        super().closeEvent(event)
+    
     def on_about(self):
         """Show about dialog."""
         QMessageBox.information(
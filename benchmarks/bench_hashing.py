@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Benchmark bulk SHA256 hashing against the original per-file 4 KiB read loop."""
+
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.security import SecurityManager
+
+def make_library(root: Path, files: int, size: int):
+    paths = []
+    block = os.urandom(1024 * 1024)
+    for i in range(files):
+        path = root / f"trainer_{i:04d}.exe"
+        with open(path, "wb") as f:
+            remaining = size
+            while remaining > 0:
+                f.write(block[: min(remaining, len(block))])
+                remaining -= len(block)
+            f.write(i.to_bytes(4, "little"))
+        paths.append(path)
+    return paths
+
+def sha256_4k(file_path: Path) -> str:
+    """The original compute_sha256: one file at a time in 4096-byte reads."""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for byte_block in iter(lambda: f.read(4096), b""):
+            sha256_hash.update(byte_block)
+    return sha256_hash.hexdigest()
+
+def bench_hashing(files: int = 300, size: int = 4 * 1024 * 1024):
+    with TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "trainers").mkdir()
+        paths = make_library(root / "trainers", files, size)
+        
+        start = time.perf_counter()
+        loop = {path: sha256_4k(path) for path in paths}
+        loop_seconds = time.perf_counter() - start
+        
+        # A fresh cache so the bulk pass reads every file too.
+        manager = SecurityManager(root / "quarantine", hash_cache_path=root / "bulk_cache.json")
+        start = time.perf_counter()
+        bulk = manager.hash_files(paths)
+        bulk_seconds = time.perf_counter() - start
+        
+        assert bulk == loop
+        total_mb = files * size / (1024 * 1024)
+        print(f"files: {files} x {size // 1024} KiB ({total_mb:.0f} MiB)")
+        print(f"per-file 4 KiB loop: {loop_seconds:.2f} s ({total_mb / loop_seconds:.0f} MiB/s)")
+        print(f"hash_files: {bulk_seconds:.2f} s ({total_mb / bulk_seconds:.0f} MiB/s)")
+        print(f"speedup: {loop_seconds / bulk_seconds:.1f}x")
+
+if __name__ == "__main__":
+    bench_hashing()
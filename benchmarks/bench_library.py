@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Benchmark the os.scandir library scanner against the glob-based listing."""
+
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.trainer_manager import TrainerFileManager
+
+def make_library(root: Path, games: int, per_game: int):
+    for g in range(games):
+        folder = root / f"Game {g:04d}"
+        folder.mkdir()
+        for t in range(per_game):
+            (folder / f"trainer_{t:03d}.exe").write_bytes(b"MZ")
+        (folder / "readme.txt").write_bytes(b"")
+
+def glob_listing(root: Path):
+    """The list_trainers approach extended to subfolders: glob, sort, stat."""
+    listing = []
+    for p in sorted(root.rglob("*.exe")):
+        stat = p.stat()
+        listing.append((p.name, p.relative_to(root).as_posix(), stat.st_size, stat.st_mtime_ns))
+    return listing
+
+def bench_library(games: int = 500, per_game: int = 40, rounds: int = 3):
+    with TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        make_library(root, games, per_game)
+        manager = TrainerFileManager(root)
+        
+        glob_times, scan_times = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            expected = glob_listing(root)
+            glob_times.append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            entries = manager.scan_library()
+            scan_times.append(time.perf_counter() - start)
+        
+        assert [(e.name, e.relpath, e.size, e.mtime_ns) for e in entries] == expected
+        print(f"files: {len(entries)} in {games} folders")
+        print(f"rglob + sort + stat: {min(glob_times) * 1000:.1f} ms")
+        print(f"scan_library: {min(scan_times) * 1000:.1f} ms")
+        print(f"speedup: {min(glob_times) / min(scan_times):.1f}x")
+
+if __name__ == "__main__":
+    bench_library()
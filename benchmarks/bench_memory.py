@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Measure bytes per Trainer record for the dict-backed and compact layouts."""
+
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.metadata import Trainer
+
+@dataclass
+class DictTrainer:
+    """Previous Trainer layout: per-instance __dict__, no interning."""
+    name: str
+    game: str
+    version: str
+    author: str
+    url: str
+    checksum: str = ""
+    local_path: str = ""
+
+def make_rows(count: int):
+    rng = random.Random(3)
+    games = [f"Game Title {i}" for i in range(count // 8)]
+    authors = ["FLiNG", "WeMod", "MrAntiFun", "CheatHappens", "Abolfazl.k"]
+    versions = [f"{major}.{minor}" for major in range(1, 6) for minor in range(10)]
+    for i in range(count):
+        # Rebuild strings per row the way csv.DictReader hands them out.
+        yield (
+            f"Trainer {i}",
+            "".join(rng.choice(games)),
+            "".join(rng.choice(versions)),
+            "".join(rng.choice(authors)),
+            f"https://example.com/trainers/{i}",
+            "",
+        )
+
+def measure(build, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = build(make_rows(count))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del records
+    return total / count
+
+def build_dict(rows):
+    return [DictTrainer(*row) for row in rows]
+
+def build_compact(rows):
+    return [
+        Trainer(name, sys.intern(game), sys.intern(version), sys.intern(author), url, checksum)
+        for name, game, version, author, url, checksum in rows
+    ]
+
+def main(count: int = 100_000):
+    dict_bytes = measure(build_dict, count)
+    compact_bytes = measure(build_compact, count)
+    print(f"records: {count}")
+    print(f"dict-backed: {dict_bytes:.0f} bytes/record")
+    print(f"slots + interning: {compact_bytes:.0f} bytes/record")
+    print(f"saved: {100 * (1 - compact_bytes / dict_bytes):.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Benchmark autocomplete and fuzzy search latency on a synthetic catalog."""
+
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.search import PrefixIndex, TrigramIndex
+
+def random_name(rng: random.Random) -> str:
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(1, 4))]
+    return " ".join(w.capitalize() for w in words)
+
+def bench_prefix(entries: int = 100_000, queries: int = 10_000):
+    rng = random.Random(42)
+    names = [random_name(rng) for _ in range(entries)]
+    
+    index = PrefixIndex()
+    start = time.perf_counter()
+    index.set_entries("game", ((n, n) for n in names[: entries // 2]))
+    index.set_entries("trainer", ((n, n) for n in names[entries // 2:]))
+    index.set_entries("abbreviation", (("".join(w[0] for w in n.split()), n) for n in names[::10]))
+    build = time.perf_counter() - start
+    
+    prefixes = [rng.choice(names)[: rng.randint(1, 6)] for _ in range(queries)]
+    start = time.perf_counter()
+    for prefix in prefixes:
+        index.complete(prefix, limit=10)
+    elapsed = time.perf_counter() - start
+    
+    print(f"prefix entries: {len(index)}")
+    print(f"prefix build: {build * 1000:.1f} ms")
+    print(f"complete: {elapsed / queries * 1e6:.1f} us/query over {queries} queries")
+
+def bench_fuzzy(titles: int = 200_000, queries: int = 200):
+    rng = random.Random(7)
+    names = [random_name(rng) for _ in range(titles)]
+    
+    index = TrigramIndex()
+    start = time.perf_counter()
+    index.sync({str(i): n for i, n in enumerate(names)})
+    build = time.perf_counter() - start
+    
+    latencies = []
+    for _ in range(queries):
+        name = list(rng.choice(names))
+        pos = rng.randrange(len(name))
+        name[pos] = rng.choice(string.ascii_lowercase)
+        index.search("".join(name))
+        latencies.append(index.last_search_seconds)
+    latencies.sort()
+    
+    print(f"fuzzy titles: {len(index)}")
+    print(f"fuzzy build: {build:.2f} s")
+    print(f"fuzzy p50: {latencies[len(latencies) // 2] * 1000:.2f} ms")
+    print(f"fuzzy p95: {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    bench_prefix()
+    bench_fuzzy()
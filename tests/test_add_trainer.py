@@ -109,3 +109,136 @@ class TestAddTrainerFeature:
         
         assert success
         assert (temp_trainers / "trainer_v1.0_final.exe").exists()
+    
+    def test_add_trainers_batch(self, temp_trainers, temp_source):
+        """Test importing many files at once with per-file results."""
+        sources = []
+        for i in range(20):
+            source_file = temp_source / f"trainer_{i}.exe"
+            source_file.write_bytes(b"MZ" + bytes([i]) * 5000)
+            sources.append(source_file)
+        (temp_source / "notes.txt").write_text("not a trainer")
+        sources += [temp_source / "notes.txt", temp_source / "missing.exe", sources[0]]
+        progress = []
+        
+        manager = TrainerFileManager(temp_trainers)
+        results = manager.add_trainers(sources, max_workers=4,
+                                       progress_callback=lambda done, total, r: progress.append((done, total)))
+        
+        assert [r.source for r in results] == sources
+        assert all(r.success for r in results[:20])
+        assert [r.success for r in results[20:]] == [False, False, False]
+        assert "already exists" in results[22].message
+        assert progress[-1] == (23, 23)
+        for source in sources[:20]:
+            assert (temp_trainers / source.name).read_bytes() == source.read_bytes()
+        assert len(manager.list_trainers()) == 20
+        assert not list(temp_trainers.glob(".*.tmp"))
+    
+    def test_add_trainers_hardlink(self, temp_trainers, temp_source):
+        """Test hardlinking when allowed and on the same filesystem."""
+        source_file = temp_trainers.parent / f"{temp_trainers.name}_src.exe"
+        source_file.write_bytes(b"MZ link")
+        try:
+            manager = TrainerFileManager(temp_trainers)
+            (result,) = manager.add_trainers([source_file], allow_hardlink=True)
+            assert result.success
+            assert result.method == "hardlink"
+            assert result.dest.stat().st_ino == source_file.stat().st_ino
+        finally:
+            source_file.unlink()
+    
+    def test_add_trainers_failed_copy_leaves_nothing(self, temp_trainers, temp_source, monkeypatch):
+        """Test a failed copy does not leave partial files behind."""
+        source_file = temp_source / "broken.exe"
+        source_file.write_bytes(b"MZ")
+        
+        def failing_clone(source, dest, allow_hardlink=False):
+            dest.write_bytes(b"partial")
+            raise OSError("disk full")
+        
+        monkeypatch.setattr("app.core.trainer_manager._clone_file", failing_clone)
+        (result,) = TrainerFileManager(temp_trainers).add_trainers([source_file])
+        
+        assert not result.success
+        assert "disk full" in result.message
+        assert list(temp_trainers.iterdir()) == []
+    
+    def test_add_trainers_never_overwrites(self, temp_trainers, temp_source, monkeypatch):
+        """Test a file created at the destination during the copy is kept."""
+        from app.core import trainer_manager
+        source_file = temp_source / "race.exe"
+        source_file.write_bytes(b"MZ import")
+        clone = trainer_manager._clone_file
+        
+        def racing_clone(source, dest, allow_hardlink=False):
+            (temp_trainers / "race.exe").write_bytes(b"MZ other")
+            return clone(source, dest, allow_hardlink)
+        
+        monkeypatch.setattr("app.core.trainer_manager._clone_file", racing_clone)
+        (result,) = TrainerFileManager(temp_trainers).add_trainers([source_file], duplicates="allow")
+        
+        assert not result.success
+        assert "already exists" in result.message
+        assert (temp_trainers / "race.exe").read_bytes() == b"MZ other"
+        assert [p.name for p in temp_trainers.iterdir() if p.suffix == ".tmp"] == []
+    
+    def test_add_trainers_source_vanishes_after_validation(self, temp_trainers, temp_source, monkeypatch):
+        """Test a source removed mid-batch fails alone instead of aborting the batch."""
+        (temp_source / "gone.exe").write_bytes(b"MZ gone")
+        (temp_source / "kept.exe").write_bytes(b"MZ kept")
+        validate = TrainerFileManager._validate_import
+        
+        def validate_then_remove(self, source, reserved):
+            error = validate(self, source, reserved)
+            if source.name == "gone.exe":
+                source.unlink()
+            return error
+        
+        monkeypatch.setattr(TrainerFileManager, "_validate_import", validate_then_remove)
+        results = TrainerFileManager(temp_trainers).add_trainers([temp_source / "gone.exe", temp_source / "kept.exe"])
+        
+        assert [r.success for r in results] == [False, True]
+        assert (temp_trainers / "kept.exe").exists()
+    
+    def test_add_trainers_skips_content_duplicates(self, temp_trainers, temp_source):
+        """Test identical content under another name is detected on import."""
+        manager = TrainerFileManager(temp_trainers)
+        (temp_trainers / "existing.exe").write_bytes(b"MZ same")
+        for name, data in [("renamed.exe", b"MZ same"), ("new.exe", b"MZ new"), ("new_copy.exe", b"MZ new")]:
+            (temp_source / name).write_bytes(data)
+        
+        results = manager.add_trainers(sorted(temp_source.iterdir()))
+        
+        by_name = {r.source.name: r for r in results}
+        assert by_name["new.exe"].success
+        assert by_name["new_copy.exe"].duplicate_of == "new.exe"
+        assert by_name["renamed.exe"].duplicate_of == "existing.exe"
+        assert not by_name["renamed.exe"].success
+        assert sorted(p.name for p in temp_trainers.glob("*.exe")) == ["existing.exe", "new.exe"]
+        assert TrainerFileManager(temp_trainers).library_index.paths_for_hash(
+            __import__("hashlib").sha256(b"MZ new").hexdigest()) == ["new.exe"]
+    
+    def test_add_trainers_hashes_only_same_size_library_files(self, temp_trainers, temp_source):
+        """Test the duplicate check leaves library files of other sizes unhashed."""
+        (temp_trainers / "same_size.exe").write_bytes(b"MZ abc")
+        (temp_trainers / "other_size.exe").write_bytes(b"MZ longer")
+        (temp_source / "new.exe").write_bytes(b"MZ xyz")
+        manager = TrainerFileManager(temp_trainers)
+        
+        assert manager.add_trainers([temp_source / "new.exe"])[0].success
+        index = manager.library_index
+        assert index.record("same_size.exe")["sha256"]
+        assert index.record("other_size.exe")["sha256"] == ""
+    
+    def test_add_trainers_links_duplicates(self, temp_trainers, temp_source):
+        """Test duplicate content can be hardlinked instead of skipped."""
+        manager = TrainerFileManager(temp_trainers)
+        (temp_source / "a.exe").write_bytes(b"MZ dup")
+        (temp_source / "b.exe").write_bytes(b"MZ dup")
+        
+        results = manager.add_trainers([temp_source / "a.exe", temp_source / "b.exe"], duplicates="link")
+        
+        assert all(r.success for r in results)
+        assert results[1].method == "hardlink"
+        assert (temp_trainers / "a.exe").stat().st_ino == (temp_trainers / "b.exe").stat().st_ino
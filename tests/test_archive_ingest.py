@@ -0,0 +1,140 @@
+"""Tests for archive ingestion."""
+
+import hashlib
+import shutil
+import subprocess
+import zipfile
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import app.core.archive_ingest as archive_ingest
+from app.core.archive_ingest import ArchiveIngestor
+from app.core.quarantine import QuarantineStore
+from app.core.trainer_manager import TrainerFileManager
+
+
+def make_zip(path: Path, members: dict) -> Path:
+    """Write a zip archive with the given member names and contents."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return path
+
+
+class TestArchiveIngestor:
+    """Test ArchiveIngestor class."""
+    
+    @pytest.fixture
+    def dirs(self):
+        """Create trainers, quarantine and downloads directories."""
+        with TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            for name in ("trainers", "quarantine", "downloads"):
+                (root / name).mkdir()
+            yield root
+    
+    @pytest.fixture
+    def ingestor(self, dirs):
+        """Create an ingestor over the temporary folders."""
+        return ArchiveIngestor(TrainerFileManager(dirs / "trainers"), QuarantineStore(dirs / "quarantine"))
+    
+    def test_ingest_zip_into_trainers(self, dirs, ingestor):
+        """Test executables are extracted and hashed while other members are skipped."""
+        data = b"MZ" + b"\x90" * 300_000
+        archive = make_zip(dirs / "downloads" / "er.zip", {
+            "Elden Ring/Trainer.exe": data,
+            "Elden Ring/readme.txt": b"read me",
+        })
+        
+        results = ingestor.ingest_many([archive], destination="trainers")
+        
+        assert len(results) == 1
+        assert results[0].success
+        assert results[0].sha256 == hashlib.sha256(data).hexdigest()
+        assert (dirs / "trainers" / "Trainer.exe").read_bytes() == data
+        assert sorted(p.name for p in (dirs / "trainers").iterdir() if not p.name.startswith(".")) == ["Trainer.exe"]
+        assert ingestor.trainer_manager.library_index.paths_for_hash(results[0].sha256) == ["Trainer.exe"]
+    
+    def test_ingest_zip_into_quarantine(self, dirs, ingestor):
+        """Test members land in the quarantine store under their original name."""
+        archive = make_zip(dirs / "downloads" / "pack.zip", {"a.exe": b"MZ a", "sub/b.exe": b"MZ b"})
+        
+        results = ingestor.ingest(archive)
+        
+        assert [r.success for r in results] == [True, True]
+        entry = ingestor.quarantine.find_by_name("b.exe")
+        assert entry.path.read_bytes() == b"MZ b"
+        assert not list((dirs / "quarantine").glob(".*.tmp"))
+    
+    def test_ingest_skips_duplicates_and_existing(self, dirs, ingestor):
+        """Test content already in the library and taken names are not written."""
+        (dirs / "trainers" / "old.exe").write_bytes(b"MZ same")
+        (dirs / "trainers" / "taken.exe").write_bytes(b"MZ taken")
+        archive = make_zip(dirs / "downloads" / "dup.zip", {"renamed.exe": b"MZ same", "taken.exe": b"MZ other"})
+        
+        results = ingestor.ingest_many([archive], destination="trainers")
+        
+        assert results[0].duplicate_of == "old.exe"
+        assert not results[1].success
+        assert "already exists" in results[1].message
+        assert not (dirs / "trainers" / "renamed.exe").exists()
+        assert (dirs / "trainers" / "taken.exe").read_bytes() == b"MZ taken"
+    
+    def test_single_ingest_reconciles_index(self, dirs, ingestor):
+        """Test a direct ingest finds library duplicates and saves the index."""
+        (dirs / "trainers" / "old.exe").write_bytes(b"MZ same")
+        archive = make_zip(dirs / "downloads" / "dup.zip", {"renamed.exe": b"MZ same", "new.exe": b"MZ new"})
+        
+        results = ingestor.ingest(archive, destination="trainers")
+        
+        assert results[0].duplicate_of == "old.exe"
+        assert results[1].success
+        index = TrainerFileManager(dirs / "trainers").library_index
+        assert index.paths_for_hash(hashlib.sha256(b"MZ new").hexdigest()) == ["new.exe"]
+    
+    def test_ingest_directory_batch(self, dirs, ingestor):
+        """Test every archive in a folder is ingested and bad archives are reported."""
+        downloads = dirs / "downloads"
+        make_zip(downloads / "one.zip", {"one.exe": b"MZ 1"})
+        make_zip(downloads / "two.zip", {"two.exe": b"MZ 2", "notes.txt": b"x"})
+        make_zip(downloads / "docs.zip", {"manual.pdf": b"%PDF"})
+        (downloads / "broken.zip").write_bytes(b"not a zip")
+        (downloads / "ignored.txt").write_text("x")
+        progress = []
+        
+        results = ingestor.ingest_directory(
+            downloads, destination="trainers", progress_callback=lambda done, total, path: progress.append(done)
+        )
+        
+        by_archive = {r.source.name: r for r in results}
+        assert sorted(by_archive) == ["broken.zip", "docs.zip", "one.zip", "two.zip"]
+        assert by_archive["one.zip"].success and by_archive["two.zip"].success
+        assert by_archive["docs.zip"].message == "No executables in archive"
+        assert not by_archive["broken.zip"].success
+        assert sorted(progress) == [1, 2, 3, 4]
+    
+    def test_oversized_member_is_abandoned(self, dirs, ingestor, monkeypatch):
+        """Test a member larger than the limit is not kept."""
+        monkeypatch.setattr(archive_ingest, "MAX_MEMBER_SIZE", 1024)
+        archive = make_zip(dirs / "downloads" / "bomb.zip", {"bomb.exe": b"\0" * 4096})
+        
+        results = ingestor.ingest(archive, destination="trainers")
+        
+        assert not results[0].success
+        assert list((dirs / "trainers").iterdir()) == []
+    
+    @pytest.mark.skipif(not any(map(shutil.which, ("7z", "7zz", "7za"))), reason="7z command not installed")
+    def test_ingest_7z(self, dirs, ingestor):
+        """Test 7z archives are streamed through the 7z command."""
+        src = dirs / "src"
+        (src / "dir").mkdir(parents=True)
+        (src / "dir" / "t.exe").write_bytes(b"MZ 7z")
+        (src / "notes.txt").write_text("x")
+        archive = dirs / "downloads" / "t.7z"
+        subprocess.run([ingestor._seven_zip, "a", str(archive), "."], cwd=src, check=True, capture_output=True)
+        
+        results = ingestor.ingest(archive, destination="trainers")
+        
+        assert [r.member.replace("\\", "/") for r in results] == ["dir/t.exe"]
+        assert (dirs / "trainers" / "t.exe").read_bytes() == b"MZ 7z"
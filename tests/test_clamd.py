@@ -0,0 +1,175 @@
+"""Tests for the clamd client against a local fake daemon."""
+
+import socket
+import struct
+import threading
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.core.clamd import ClamdClient, ClamdError, parse_reply
+from app.core.security import SecurityManager, ScanResult
+
+
+class FakeClamd:
+    """Minimal clamd speaking IDSESSION, INSTREAM, PING and VERSION."""
+    
+    def __init__(self, socket_path: Path):
+        self.connections = 0
+        self.scans = 0
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(str(socket_path))
+        self.server.listen()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+    
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+    
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+    
+    def _read_command(self, conn):
+        command = b""
+        while not command.endswith(b"\0"):
+            command += self._recv_exact(conn, 1)
+        return command[1:-1].decode()
+    
+    def _handle(self, conn):
+        request_id = 0
+        session = False
+        try:
+            while True:
+                command = self._read_command(conn)
+                if command == "IDSESSION":
+                    session = True
+                    continue
+                if command == "END":
+                    return
+                request_id += 1
+                prefix = f"{request_id}: " if session else ""
+                if command == "PING":
+                    reply = "PONG"
+                elif command == "VERSION":
+                    reply = "ClamAV 1.0.0/27000/Thu Jan  1 00:00:00 2026"
+                elif command == "INSTREAM":
+                    data = b""
+                    while True:
+                        (size,) = struct.unpack("!L", self._recv_exact(conn, 4))
+                        if not size:
+                            break
+                        data += self._recv_exact(conn, size)
+                    self.scans += 1
+                    reply = "stream: Eicar-Test-Signature FOUND" if b"EICAR" in data else "stream: OK"
+                else:
+                    reply = "UNKNOWN COMMAND"
+                conn.sendall(f"{prefix}{reply}\0".encode())
+                if not session:
+                    return
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            conn.close()
+    
+    def close(self):
+        self.server.close()
+
+
+class TestClamdClient:
+    """Test ClamdClient and the clamd scanner type."""
+    
+    @pytest.fixture
+    def tmp(self):
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+    
+    @pytest.fixture
+    def daemon(self, tmp):
+        fake = FakeClamd(tmp / "clamd.sock")
+        yield fake
+        fake.close()
+    
+    def test_ping_and_version(self, tmp, daemon):
+        client = ClamdClient(tmp / "clamd.sock", timeout=5)
+        assert client.ping()
+        assert client.version().startswith("ClamAV 1.0.0/27000")
+    
+    def test_pipelined_scans_reuse_connection(self, tmp, daemon):
+        files = []
+        for i in range(20):
+            path = tmp / f"trainer{i}.exe"
+            path.write_bytes(b"MZ" + (b"EICAR" if i == 3 else b"clean") * 1000)
+            files.append(path)
+        client = ClamdClient(tmp / "clamd.sock", timeout=5)
+        
+        replies = client.scan_files(files)
+        replies.update(client.scan_files(files[:2]))
+        client.close()
+        
+        assert daemon.connections == 1
+        assert daemon.scans == 22
+        assert parse_reply(replies[files[3]]) == ("FOUND", "Eicar-Test-Signature")
+        assert all(parse_reply(replies[f]) == ("OK", "") for f in files if f != files[3])
+    
+    def test_security_manager_clamd_scanner(self, tmp, daemon):
+        clean = tmp / "clean.exe"
+        clean.write_bytes(b"MZ clean")
+        bad = tmp / "bad.exe"
+        bad.write_bytes(b"MZ EICAR")
+        manager = SecurityManager(tmp / "quarantine", "clamd", clamd_socket=tmp / "clamd.sock")
+        
+        assert manager.scan_file(clean) == (ScanResult.CLEAN, "No threats detected")
+        assert manager.scan_file(bad) == (ScanResult.SUSPICIOUS, "Eicar-Test-Signature")
+        assert manager.scan_file(bad) == (ScanResult.SUSPICIOUS, "Eicar-Test-Signature")
+        # One VERSION query for the scan cache plus one reused scan session.
+        assert daemon.connections == 2
+        assert daemon.scans == 2
+        assert manager.signature_version() == "1.0.0/27000"
+    
+    def test_fallback_to_clamscan(self, tmp, monkeypatch):
+        target = tmp / "trainer.exe"
+        target.write_bytes(b"MZ")
+        manager = SecurityManager(tmp / "quarantine", "clamd", clamd_socket=tmp / "missing.sock")
+        monkeypatch.setattr(manager, "_scan_clamav", lambda path: (ScanResult.CLEAN, "clamscan"))
+        
+        assert manager.scan_file(target) == (ScanResult.CLEAN, "clamscan")
+    
+    def test_fallback_without_unix_sockets(self, tmp, monkeypatch):
+        target = tmp / "trainer.exe"
+        target.write_bytes(b"MZ")
+        manager = SecurityManager(tmp / "quarantine", "clamd", clamd_socket=tmp / "clamd.sock")
+        monkeypatch.delattr("app.core.clamd.socket.AF_UNIX")
+        monkeypatch.setattr(manager, "_scan_clamav", lambda path: (ScanResult.CLEAN, "clamscan"))
+        
+        assert manager.scan_file(target) == (ScanResult.CLEAN, "clamscan")
+    
+    def test_malformed_reply_raises_clamd_error(self, tmp, monkeypatch):
+        target = tmp / "trainer.exe"
+        target.write_bytes(b"MZ")
+        ours, theirs = socket.socketpair()
+        theirs.sendall(b"garbage\0garbage\0")
+        client = ClamdClient(tmp / "clamd.sock", timeout=5)
+        monkeypatch.setattr(client, "_open", lambda session: ours)
+        monkeypatch.setattr(client, "_send_stream", lambda sock, path: None)
+        
+        with pytest.raises(ClamdError):
+            client.scan_files([target])
+        theirs.close()
+    
+    def test_parse_reply(self):
+        assert parse_reply("1: stream: OK") == ("OK", "")
+        assert parse_reply("stream: Win.Test FOUND") == ("FOUND", "Win.Test")
+        assert parse_reply("stream: Size limit exceeded ERROR") == ("ERROR", "Size limit exceeded")
@@ -77,3 +77,10 @@ class TestConfig:
         
         config2 = Config(str(config_file))
         assert config2.get("test_key") == "test_value"
+    
+    def test_metadata_backend_default(self, temp_config):
+        """Test metadata backend defaults to memory."""
+        config = Config(str(temp_config / "config.json"))
+        assert config.metadata_backend == "memory"
+        config.set("metadata_backend", "sqlite")
+        assert config.metadata_backend == "sqlite"
@@ -0,0 +1,67 @@
+"""Tests for the file name matcher."""
+
+import pytest
+
+from app.core.matcher import FilenameMatcher
+from app.core.metadata import Trainer
+
+
+class TestFilenameMatcher:
+    """Test FilenameMatcher class."""
+    
+    @pytest.fixture
+    def matcher(self):
+        """Create a matcher over a few trainers, games and abbreviations."""
+        trainers = [
+            Trainer("Elden Ring +25", "Elden Ring", "v1.10", "FLiNG", ""),
+            Trainer("Elden Ring +20", "Elden Ring", "1.09", "FLiNG", ""),
+            Trainer("Erdtree +20", "Elden Ring Shadow of the Erdtree", "1.12", "FLiNG", ""),
+            Trainer("Cyberpunk +30", "Cyberpunk 2077", "2.1", "WeMod", ""),
+        ]
+        return FilenameMatcher(trainers, ["Dark Souls III", "Elden Ring"], {"DS3": "Dark Souls III"})
+    
+    def test_parse_strips_version_options_and_author(self, matcher):
+        """Test file names are reduced to their title tokens."""
+        parsed = matcher.parse("Elden.Ring.v1.10.Plus.25.Trainer-FLiNG.exe")
+        assert parsed.tokens == ("elden", "ring")
+        assert parsed.version == "1.10"
+        assert parsed.author == "fling"
+    
+    def test_match_ranks_version_and_author(self, matcher):
+        """Test the trainer whose version agrees ranks first with full confidence."""
+        matches = matcher.match("Elden.Ring.v1.10.Plus.25.Trainer-FLiNG.exe")
+        assert [m.trainer for m in matches[:2]] == ["Elden Ring +25", "Elden Ring +20"]
+        assert matches[0].score == 1.0
+        assert matches[0].score > matches[1].score
+    
+    def test_match_author_with_spaces(self):
+        """Test multi-word authors get the author bonus."""
+        matcher = FilenameMatcher([Trainer("Hades +12", "Hades", "1.0", "Cheat Happens", "")])
+        assert matcher.match("Hades.Trainer-CheatHappens.exe")[0].score == 0.9
+    
+    def test_match_prefers_full_title(self, matcher):
+        """Test a longer title beats a shorter one it contains."""
+        matches = matcher.match("Elden Ring Shadow of the Erdtree Trainer.exe")
+        assert matches[0].game == "Elden Ring Shadow of the Erdtree"
+        assert matches[1].game == "Elden Ring"
+        assert matches[1].score < 0.5
+    
+    def test_match_abbreviation_and_game_only(self, matcher):
+        """Test abbreviations expand and games without trainers still match."""
+        matches = matcher.match("DS3.Trainer.exe")
+        assert matches[0].game == "Dark Souls III"
+        assert matches[0].trainer == ""
+    
+    def test_match_many_scores_repeated_names_once(self, matcher, monkeypatch):
+        """Test a batch scores each distinct parsed name once."""
+        calls = []
+        rank = matcher._rank
+        monkeypatch.setattr(matcher, "_rank", lambda *args: calls.append(args[0]) or rank(*args))
+        names = ["Cyberpunk.2077.v2.1.exe", "Cyberpunk 2077 v2.1.exe", "unknown.exe"]
+        
+        results = matcher.match_many(names)
+        
+        assert len(calls) == 2
+        assert results[names[0]] == results[names[1]]
+        assert results[names[0]][0].trainer == "Cyberpunk +30"
+        assert results["unknown.exe"] == []
@@ -1,5 +1,6 @@
 """Tests for metadata management."""
 
+import threading
 import pytest
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -74,3 +75,199 @@ class TestMetadataManager:
         assert game.name == "Test Game"
         assert game.abbreviation == "TG"
         assert game.trainers == []
+    
+    def test_snapshot_cache_hit(self, temp_resources):
+        """Test that a second load is served from the snapshot."""
+        first = MetadataManager(temp_resources)
+        assert not first.snapshot_hit
+        assert first.snapshot_path.exists()
+        
+        second = MetadataManager(temp_resources)
+        assert second.snapshot_hit
+        assert second.trainers.keys() == first.trainers.keys()
+        assert second.games.keys() == first.games.keys()
+        assert second.abbreviations == first.abbreviations
+    
+    def test_snapshot_rebuilt_on_csv_change(self, temp_resources):
+        """Test that editing a source CSV invalidates the snapshot."""
+        MetadataManager(temp_resources)
+        
+        with open(temp_resources / "abbreviation.csv", "a", encoding="utf-8") as f:
+            f.write("NG,New Game\n")
+        
+        manager = MetadataManager(temp_resources)
+        assert not manager.snapshot_hit
+        assert manager.abbreviations["NG"] == "New Game"
+        
+        assert MetadataManager(temp_resources).snapshot_hit
+    
+    def test_get_trainers_for_game_index(self, temp_resources):
+        """Test that the game index is case-insensitive and follows reloads."""
+        manager = MetadataManager(temp_resources)
+        trainers = manager.get_trainers_for_game("  example GAME ")
+        assert [t.name for t in trainers] == ["Example Trainer"]
+        
+        with open(manager.trainers_list_path, "a", encoding="utf-8") as f:
+            f.write("Second Trainer,Example Game,2.0,Author,https://example.com,\n")
+        manager.load_trainers()
+        
+        names = {t.name for t in manager.get_trainers_for_game("Example Game")}
+        assert names == {"Example Trainer", "Second Trainer"}
+        assert manager.get_trainers_for_game("Unknown Game") == []
+    
+    def test_autocomplete(self, temp_resources):
+        """Test autocomplete across games, trainers and abbreviations."""
+        manager = MetadataManager(temp_resources)
+        assert manager.autocomplete("EG")[0].text == "Example Game"
+        
+        texts = [c.text for c in manager.autocomplete("example")]
+        assert texts == ["Example Game", "Example Trainer"]
+    
+    def test_search_games(self, temp_resources):
+        """Test fuzzy game search follows game reloads."""
+        manager = MetadataManager(temp_resources)
+        assert manager.search_games("exmaple game")[0].text == "Example Game"
+        
+        with open(manager.games_list_path, "a", encoding="utf-8") as f:
+            f.write("6,Elden Ring,PC\n")
+        manager.load_games()
+        assert manager.search_games("eldenring")[0].text == "Elden Ring"
+    
+    def test_reload_applies_row_diff(self, temp_resources):
+        """Test incremental reload reports and applies only changed rows."""
+        manager = MetadataManager(temp_resources)
+        original = manager.trainers["Example Trainer"]
+        
+        with open(manager.trainers_list_path, "w", encoding="utf-8") as f:
+            f.write("name,game,version,author,url,checksum\n")
+            f.write("Example Trainer,Other Game,2.0,Author,https://example.com,\n")
+            f.write("New Trainer,Example Game,1.0,Author,https://example.com,\n")
+        
+        received = []
+        manager.add_change_listener(received.append)
+        changes = manager.reload()
+        
+        assert len(changes) == 1
+        assert changes[0].table == "trainers"
+        assert changes[0].added == ["New Trainer"]
+        assert changes[0].updated == ["Example Trainer"]
+        assert changes[0].removed == []
+        assert received == changes
+        
+        assert manager.trainers["Example Trainer"] is original
+        assert original.version == "2.0"
+        assert manager.get_trainers_for_game("Other Game") == [original]
+        assert [t.name for t in manager.get_trainers_for_game("Example Game")] == ["New Trainer"]
+        assert manager.autocomplete("new")[0].text == "New Trainer"
+    
+    def test_reload_removes_rows(self, temp_resources):
+        """Test rows deleted from a CSV are removed from tables and indexes."""
+        manager = MetadataManager(temp_resources)
+        
+        with open(manager.games_list_path, "w", encoding="utf-8") as f:
+            f.write("game_id,game_name,platform\n")
+        with open(manager.abbreviations_path, "w", encoding="utf-8") as f:
+            f.write("abbreviation,full_name\nEG,Renamed Game\n")
+        
+        changes = {c.table: c for c in manager.reload()}
+        assert changes["games"].removed == ["Example Game"]
+        assert changes["abbreviations"].updated == ["EG"]
+        assert manager.games == {}
+        assert manager.search_games("example game") == []
+        assert manager.autocomplete("EG")[0].text == "Renamed Game"
+        
+        assert manager.reload() == []
+    
+    def test_compact_records(self, temp_resources):
+        """Test records are slotted and repeated strings are shared."""
+        with open(temp_resources / "trainers_list.csv", "w", encoding="utf-8") as f:
+            f.write("name,game,version,author,url,checksum\n")
+            f.write("Trainer A,Shared Game,1.0,Shared Author,https://example.com/a,\n")
+            f.write("Trainer B,Shared Game,1.0,Shared Author,https://example.com/b,\n")
+        
+        manager = MetadataManager(temp_resources, use_snapshot=False)
+        first, second = manager.trainers["Trainer A"], manager.trainers["Trainer B"]
+        assert not hasattr(first, "__dict__")
+        assert first.game is second.game
+        assert first.author is second.author
+    
+    def test_lazy_load_blocks_on_first_access(self, temp_resources, monkeypatch):
+        """Test a lazy manager returns at once and blocks on table access."""
+        gate = threading.Event()
+        original = MetadataManager._read_trainers
+        
+        def slow_read(self):
+            gate.wait(5)
+            return original(self)
+        
+        monkeypatch.setattr(MetadataManager, "_read_trainers", slow_read)
+        manager = MetadataManager(temp_resources, use_snapshot=False, lazy=True)
+        assert not manager._ready["trainers"].is_set()
+        
+        threading.Timer(0.1, gate.set).start()
+        assert "Example Trainer" in manager.trainers
+        assert gate.is_set()
+        assert manager.wait_until_loaded(5)
+    
+    def test_load_timings(self, temp_resources):
+        """Test per-table timings are recorded on miss and hit."""
+        manager = MetadataManager(temp_resources)
+        assert set(manager.load_timings) >= {"trainers", "games", "abbreviations"}
+        
+        cached = MetadataManager(temp_resources)
+        assert cached.snapshot_hit
+        assert set(cached.load_timings) == {"snapshot", "trainers", "games", "abbreviations"}
+        assert all(seconds >= 0 for seconds in cached.load_timings.values())
+    
+    def test_failed_table_skips_snapshot(self, temp_resources, monkeypatch):
+        """Test a table that fails to parse is empty and no snapshot is written."""
+        def broken_read(self):
+            raise ValueError("bad csv")
+        
+        monkeypatch.setattr(MetadataManager, "_read_games", broken_read)
+        manager = MetadataManager(temp_resources)
+        assert manager.games == {}
+        assert len(manager.trainers) == 1
+        assert not manager.snapshot_path.exists()
+    
+    def test_fuzzy_index_built_on_first_search(self, temp_resources):
+        """Test loading leaves the trigram index empty until a search."""
+        manager = MetadataManager(temp_resources)
+        assert len(manager.fuzzy_index) == 0
+        
+        manager.search_games("example")
+        assert len(manager.fuzzy_index) == 1
+        
+        with open(manager.games_list_path, "a", encoding="utf-8") as f:
+            f.write("2,Second Game,PC\n")
+        manager.reload()
+        assert "Second Game" in manager.fuzzy_index
+    
+    def test_resolve_game_join(self, temp_resources):
+        """Test abbreviation, id and name resolve to a Game with trainers."""
+        manager = MetadataManager(temp_resources)
+        for query in ("EG", "eg", "1", "example game"):
+            game = manager.resolve_game(query)
+            assert game is manager.games["Example Game"]
+            assert [t.name for t in game.trainers] == ["Example Trainer"]
+        assert manager.resolve_game("unknown") is None
+    
+    def test_resolve_game_follows_reload(self, temp_resources):
+        """Test the joined view stays current through incremental reloads."""
+        manager = MetadataManager(temp_resources)
+        game = manager.resolve_game("EG")
+        
+        with open(manager.trainers_list_path, "a", encoding="utf-8") as f:
+            f.write("Second Trainer,example game,2.0,Author,https://example.com,\n")
+        with open(manager.abbreviations_path, "a", encoding="utf-8") as f:
+            f.write("NG,New Game\n")
+        with open(manager.games_list_path, "a", encoding="utf-8") as f:
+            f.write("7,New Game,PC\n")
+        manager.reload()
+        
+        assert [t.name for t in game.trainers] == ["Example Trainer", "Second Trainer"]
+        assert manager.resolve_game("NG").name == "New Game"
+        assert manager.resolve_game("7").trainers == []
+        
+        manager.load_trainers()
+        assert len(manager.resolve_game("Example Game").trainers) == 2
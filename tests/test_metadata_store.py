@@ -0,0 +1,127 @@
+"""Tests for the SQLite metadata backend."""
+
+import threading
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.core.metadata import MetadataManager
+from app.core.metadata_store import SQLiteMetadataStore
+
+
+class TestSQLiteMetadataStore:
+    """Test SQLiteMetadataStore class."""
+    
+    @pytest.fixture
+    def store(self):
+        """Create a store in a temporary directory."""
+        with TemporaryDirectory() as tmpdir:
+            store = SQLiteMetadataStore(Path(tmpdir) / "metadata.db")
+            yield store
+            store.close()
+    
+    def test_sync_table_incremental(self, store):
+        """Test only changed rows are reported on re-import."""
+        rows = {
+            "A": ("Game One", "1.0", "Author", "https://example.com/a", ""),
+            "B": ("Game One", "1.0", "Author", "https://example.com/b", ""),
+        }
+        changes = store.sync_table("trainers", rows, (1, 2, "abc"))
+        assert changes.added == ["A", "B"]
+        assert store.get_fingerprint("trainers") == (1, 2, "abc")
+        
+        rows["B"] = ("Game Two", "1.0", "Author", "https://example.com/b", "")
+        rows["C"] = ("Game Two", "2.0", "Other", "https://example.com/c", "")
+        del rows["A"]
+        changes = store.sync_table("trainers", rows)
+        assert changes.added == ["C"]
+        assert changes.updated == ["B"]
+        assert changes.removed == ["A"]
+        assert store.count("trainers") == 2
+    
+    def test_indexed_lookups(self, store):
+        """Test lookups by game, author, name and abbreviation."""
+        store.sync_table("trainers", {"A": ("Elden Ring", "1.0", "FLiNG", "https://example.com", "")})
+        store.sync_table("games", {"Elden Ring": ("7",)})
+        store.sync_table("abbreviations", {"ER": ("Elden Ring",)})
+        
+        assert [t.name for t in store.get_trainers_for_game("elden ring")] == ["A"]
+        assert [t.name for t in store.get_trainers_by_author("fling")] == ["A"]
+        assert store.get_trainer("A").game == "Elden Ring"
+        assert store.get_game("Elden Ring").abbreviation == "7"
+        assert store.resolve_abbreviation("ER") == "Elden Ring"
+        assert store.complete("er")[0].text == "Elden Ring"
+        assert store.complete("eld")[0].kind == "game"
+
+
+class TestSQLiteBackend:
+    """Test MetadataManager with the SQLite backend."""
+    
+    @pytest.fixture
+    def temp_resources(self):
+        """Create temporary resources directory."""
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+    
+    def test_manager_lookups(self, temp_resources):
+        """Test the existing manager API is served from the store."""
+        manager = MetadataManager(temp_resources, backend="sqlite")
+        assert manager.database_path.exists()
+        assert len(manager.trainers) == 1
+        assert "Example Trainer" in manager.trainers
+        assert manager.get_trainer("Example Trainer").game == "Example Game"
+        assert [t.name for t in manager.get_trainers_for_game("EXAMPLE GAME")] == ["Example Trainer"]
+        assert manager.resolve_abbreviation("EG") == "Example Game"
+        assert manager.autocomplete("EG")[0].text == "Example Game"
+        assert manager.search_games("exmaple")[0].text == "Example Game"
+        manager.close()
+    
+    def test_lazy_lookups_wait_for_import(self, temp_resources, monkeypatch):
+        """Test a lazy SQLite manager blocks lookups until the import finishes."""
+        gate = threading.Event()
+        original = MetadataManager._read_trainers
+        
+        def slow_read(self):
+            gate.wait(5)
+            return original(self)
+        
+        monkeypatch.setattr(MetadataManager, "_read_trainers", slow_read)
+        manager = MetadataManager(temp_resources, backend="sqlite", lazy=True)
+        threading.Timer(0.1, gate.set).start()
+        assert [t.name for t in manager.get_trainers_for_game("Example Game")] == ["Example Trainer"]
+        assert gate.is_set()
+        manager.close()
+    
+    def test_reimport_is_incremental(self, temp_resources):
+        """Test unchanged CSVs are not re-imported and edits are diffed."""
+        MetadataManager(temp_resources, backend="sqlite").close()
+        
+        manager = MetadataManager(temp_resources, backend="sqlite")
+        assert manager.reload() == []
+        
+        with open(manager.games_list_path, "a", encoding="utf-8") as f:
+            f.write("2,Second Game,PC\n")
+        changes = manager.reload()
+        assert [(c.table, c.added) for c in changes] == [("games", ["Second Game"])]
+        assert manager.get_game("Second Game").abbreviation == "2"
+        manager.close()
+    
+    def test_bulk_items_and_values(self, temp_resources):
+        """Test items() and values() return full records from one query."""
+        manager = MetadataManager(temp_resources, backend="sqlite")
+        items = dict(manager.trainers.items())
+        assert items["Example Trainer"].game == "Example Game"
+        assert [g.name for g in manager.games.values()] == ["Example Game"]
+        assert dict(manager.abbreviations.items()) == {"EG": "Example Game"}
+        manager.close()
+    
+    def test_resolve_game_join(self, temp_resources):
+        """Test the store resolves abbreviations and ids through a join."""
+        manager = MetadataManager(temp_resources, backend="sqlite")
+        for query in ("eg", "1", "Example Game"):
+            game = manager.resolve_game(query)
+            assert game.name == "Example Game"
+            assert [t.name for t in game.trainers] == ["Example Trainer"]
+        assert [t.name for t in manager.get_game("Example Game").trainers] == ["Example Trainer"]
+        assert manager.resolve_game("nope") is None
+        manager.close()
@@ -0,0 +1,127 @@
+"""Tests for the PE header parser."""
+
+import struct
+import time
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.core.pe import PEFormatError, parse_pe
+from app.core.security import SecurityManager
+
+
+def _pad4(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+def _block(key: str, value: bytes = b"", children: bytes = b"", text: bool = False) -> bytes:
+    value_length = len(value) // 2 if text else len(value)
+    header = struct.pack("<HHH", 0, value_length, 1 if text else 0)
+    body = _pad4(header + (key + "\0").encode("utf-16-le"))
+    body = _pad4(body + value) + children
+    return struct.pack("<H", len(body)) + body[2:]
+
+def _string(key: str, value: str) -> bytes:
+    return _pad4(_block(key, (value + "\0").encode("utf-16-le"), text=True))
+
+def build_pe(product: str = "Example Trainer", version: str = "1.2.3.4", machine: int = 0x14C) -> bytes:
+    """Build a minimal PE32 image with a single .rsrc section holding VERSIONINFO."""
+    fixed = struct.pack("<IIII", 0xFEEF04BD, 0x10000, (1 << 16) | 2, (3 << 16) | 4) + b"\0" * 36
+    strings = _string("ProductName", product) + _string("FileVersion", version)
+    table = _pad4(_block("040904b0", children=strings))
+    version_info = _block("VS_VERSION_INFO", fixed, _pad4(_block("StringFileInfo", children=table)))
+    
+    rva = 0x1000
+    rsrc = b""
+    rsrc += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 16, 0x80000000 | 24)
+    rsrc += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 1, 0x80000000 | 48)
+    rsrc += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 0x409, 72)
+    rsrc += struct.pack("<IIII", rva + 88, len(version_info), 0, 0)
+    rsrc += version_info
+    return _image(rsrc, rva, machine)
+
+def _image(rsrc: bytes, rva: int = 0x1000, machine: int = 0x14C) -> bytes:
+    """Wrap a .rsrc section mapped at ``rva`` in minimal PE32 headers."""
+    dos = b"MZ" + b"\0" * 58 + struct.pack("<I", 0x40)
+    optional = bytearray(224)
+    struct.pack_into("<H", optional, 0, 0x10B)
+    struct.pack_into("<I", optional, 92, 16)
+    struct.pack_into("<II", optional, 96 + 2 * 8, rva, len(rsrc))
+    coff = struct.pack("<HHIIIHH", machine, 1, 0x5F000000, 0, 0, len(optional), 0x102)
+    section = struct.pack("<8sIIIIIIHHI", b".rsrc", len(rsrc), rva, len(rsrc), 0x200, 0, 0, 0, 0, 0x40000040)
+    headers = dos + b"PE\0\0" + coff + bytes(optional) + section
+    return headers + b"\0" * (0x200 - len(headers)) + rsrc
+
+
+class TestPEParser:
+    """Test parse_pe and SecurityManager.get_pe_info."""
+    
+    @pytest.fixture
+    def tmp(self):
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+    
+    def test_parse_headers_and_version(self, tmp):
+        path = tmp / "trainer.exe"
+        path.write_bytes(build_pe())
+        
+        info = parse_pe(path)
+        assert info.machine == "i386"
+        assert not info.is_64bit
+        assert info.timestamp == 0x5F000000
+        assert [s.name for s in info.sections] == [".rsrc"]
+        assert info.product_name == "Example Trainer"
+        assert info.file_version == "1.2.3.4"
+        assert info.fixed_file_version == "1.2.3.4"
+    
+    def test_rejects_non_pe(self, tmp):
+        path = tmp / "notes.exe"
+        path.write_bytes(b"MZ" + b"\0" * 10)
+        with pytest.raises(PEFormatError):
+            parse_pe(path)
+        (tmp / "empty.exe").write_bytes(b"")
+        with pytest.raises(PEFormatError):
+            parse_pe(tmp / "empty.exe")
+    
+    def test_get_pe_info_cached_by_hash(self, tmp, monkeypatch):
+        first = tmp / "a.exe"
+        first.write_bytes(build_pe(product="Cached"))
+        copy = tmp / "b.exe"
+        copy.write_bytes(first.read_bytes())
+        manager = SecurityManager(tmp / "quarantine")
+        
+        assert manager.get_pe_info(first).product_name == "Cached"
+        monkeypatch.setattr("app.core.security.parse_pe", lambda path: pytest.fail("parsed twice"))
+        assert manager.get_pe_info(copy).product_name == "Cached"
+        assert SecurityManager(tmp / "quarantine").get_pe_info(copy).machine == "i386"
+    
+    def test_get_pe_info_invalid(self, tmp):
+        path = tmp / "fake.exe"
+        path.write_bytes(b"not a pe")
+        assert SecurityManager(tmp / "quarantine").get_pe_info(path) is None
+    
+    def test_get_pe_infos_batch(self, tmp, monkeypatch):
+        paths = [tmp / f"{i}.exe" for i in range(4)]
+        for i, path in enumerate(paths):
+            path.write_bytes(build_pe(product=f"P{i % 2}"))
+        (tmp / "fake.exe").write_bytes(b"not a pe")
+        manager = SecurityManager(tmp / "quarantine")
+        parsed = []
+        monkeypatch.setattr("app.core.security.parse_pe", lambda path: parsed.append(path) or parse_pe(path))
+        
+        infos = manager.get_pe_infos(paths + [tmp / "fake.exe"])
+        assert [infos[path].product_name for path in paths] == ["P0", "P1", "P0", "P1"]
+        assert infos[tmp / "fake.exe"] is None
+        assert len(parsed) == 3
+    
+    def test_self_referencing_resource_directory(self, tmp):
+        entries = 4096
+        rsrc = struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1) + struct.pack("<II", 16, 0x80000000 | 24)
+        rsrc += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, entries)
+        rsrc += struct.pack("<II", 1, 0x80000000 | 24) * entries
+        path = tmp / "loop.exe"
+        path.write_bytes(_image(rsrc))
+        
+        start = time.perf_counter()
+        info = parse_pe(path)
+        assert time.perf_counter() - start < 1.0
+        assert info.product_name == ""
@@ -0,0 +1,120 @@
+"""Tests for the content-addressed quarantine store."""
+
+import hashlib
+import os
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.core.quarantine import QuarantineStore
+from app.core.security import SecurityManager
+
+
+class TestQuarantineStore:
+    """Test QuarantineStore class."""
+    
+    @pytest.fixture
+    def tmp(self):
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+    
+    def download(self, tmp, name, data):
+        folder = tmp / "downloads"
+        folder.mkdir(exist_ok=True)
+        path = folder / name
+        path.write_bytes(data)
+        return path
+    
+    def test_identical_content_stored_once(self, tmp):
+        store = QuarantineStore(tmp / "quarantine")
+        first = store.add(self.download(tmp, "a.exe", b"MZ same"))
+        second = store.add(self.download(tmp, "b.exe", b"MZ same"))
+        
+        assert first.sha256 == second.sha256 == hashlib.sha256(b"MZ same").hexdigest()
+        assert [name for name, _ in second.names] == ["a.exe", "b.exe"]
+        assert len([p for p in (tmp / "quarantine" / "blobs").rglob("*") if p.is_file()]) == 1
+        assert not (tmp / "downloads" / "b.exe").exists()
+    
+    def test_same_name_does_not_collide(self, tmp):
+        store = QuarantineStore(tmp / "quarantine")
+        old = store.add(self.download(tmp, "trainer.exe", b"MZ v1"))
+        new = store.add(self.download(tmp, "trainer.exe", b"MZ v2"))
+        
+        assert old.path.read_bytes() == b"MZ v1"
+        assert new.path.read_bytes() == b"MZ v2"
+        assert store.find_by_name("trainer.exe").sha256 == new.sha256
+    
+    def test_index_persists(self, tmp):
+        entry = QuarantineStore(tmp / "quarantine").add(self.download(tmp, "a.exe", b"MZ"))
+        reopened = QuarantineStore(tmp / "quarantine")
+        assert reopened.get(entry.sha256).name == "a.exe"
+        assert reopened.find_by_name("a.exe").path == entry.path
+        assert [e.sha256 for e in reopened.entries()] == [entry.sha256]
+    
+    def test_promote_renames_blob(self, tmp):
+        store = QuarantineStore(tmp / "quarantine")
+        entry = store.add(self.download(tmp, "a.exe", b"MZ promote"))
+        inode = entry.path.stat().st_ino
+        
+        dest = store.promote(entry.sha256, tmp / "trainers")
+        
+        assert dest == tmp / "trainers" / "a.exe"
+        assert dest.stat().st_ino == inode
+        assert not entry.path.exists()
+        assert store.get(entry.sha256) is None
+        assert store.find_by_name("a.exe") is None
+    
+    def test_promote_keep_hardlinks(self, tmp):
+        store = QuarantineStore(tmp / "quarantine")
+        entry = store.add(self.download(tmp, "a.exe", b"MZ keep"))
+        
+        dest = store.promote(entry.sha256, tmp / "trainers", keep=True)
+        
+        assert os.path.samefile(dest, entry.path)
+        assert store.get(entry.sha256) is not None
+        with pytest.raises(FileExistsError):
+            store.promote(entry.sha256, tmp / "trainers", keep=True)
+    
+    def test_promote_never_overwrites(self, tmp, monkeypatch):
+        store = QuarantineStore(tmp / "quarantine")
+        entry = store.add(self.download(tmp, "a.exe", b"MZ race"))
+        (tmp / "trainers").mkdir()
+        link = os.link
+        
+        def racing_link(source, dest):
+            Path(dest).write_bytes(b"MZ other")
+            link(source, dest)
+        
+        monkeypatch.setattr("app.core.quarantine.os.link", racing_link)
+        with pytest.raises(FileExistsError):
+            store.promote(entry.sha256, tmp / "trainers")
+        assert (tmp / "trainers" / "a.exe").read_bytes() == b"MZ other"
+        assert entry.path.exists() and store.get(entry.sha256) is not None
+    
+    def test_promote_across_filesystems_stages_copy(self, tmp, monkeypatch):
+        import errno
+        store = QuarantineStore(tmp / "quarantine")
+        entry = store.add(self.download(tmp, "a.exe", b"MZ exdev"))
+        
+        def cross_device(source, dest):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        
+        monkeypatch.setattr("app.core.quarantine.os.link", cross_device)
+        dest = store.promote(entry.sha256, tmp / "trainers")
+        
+        assert dest.read_bytes() == b"MZ exdev"
+        assert sorted(p.name for p in (tmp / "trainers").iterdir()) == ["a.exe"]
+        assert not entry.path.exists()
+    
+    def test_security_manager_quarantine(self, tmp):
+        manager = SecurityManager(tmp / "quarantine")
+        source = self.download(tmp, "a.exe", b"MZ sm")
+        
+        success, blob = manager.move_to_quarantine(source)
+        assert success
+        assert blob.name == hashlib.sha256(b"MZ sm").hexdigest()
+        
+        success, dest = manager.release_from_quarantine(blob.name, tmp / "trainers")
+        assert success
+        assert dest.read_bytes() == b"MZ sm"
+        assert manager.release_from_quarantine(blob.name, tmp / "trainers") == (False, Path())
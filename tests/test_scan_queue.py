@@ -0,0 +1,108 @@
+"""Tests for the concurrent scan queue."""
+
+import threading
+import time
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.core.scan_queue import ScanQueue
+from app.core.security import SecurityManager, ScanResult
+
+
+class TestScanQueue:
+    """Test ScanQueue class."""
+    
+    @pytest.fixture
+    def tmp(self):
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+    
+    @pytest.fixture
+    def manager(self, tmp, monkeypatch):
+        """SecurityManager whose scans block until released."""
+        manager = SecurityManager(tmp / "quarantine")
+        manager.release = threading.Event()
+        manager.scanned = []
+        
+        def fake_scan(path):
+            manager.release.wait(5)
+            manager.scanned.append(path.name)
+            return ScanResult.CLEAN, "No threats detected"
+        
+        monkeypatch.setattr(manager, "scan_file", fake_scan)
+        return manager
+    
+    def make_file(self, tmp, name, data):
+        path = tmp / name
+        path.write_bytes(data)
+        return path
+    
+    def test_scans_concurrently_and_reports(self, tmp, manager):
+        completed = []
+        progress = []
+        scan_queue = ScanQueue(manager, workers=3, on_complete=completed.append,
+                               on_progress=lambda done, total: progress.append((done, total)))
+        jobs = [scan_queue.submit(self.make_file(tmp, f"t{i}.exe", bytes([i]))) for i in range(6)]
+        
+        time.sleep(0.1)
+        assert scan_queue.metrics()["running"] == 3
+        manager.release.set()
+        
+        assert all(job.wait(5) == (ScanResult.CLEAN, "No threats detected") for job in jobs)
+        scan_queue.shutdown()
+        assert len(completed) == 6
+        assert progress[-1] == (6, 6)
+        metrics = scan_queue.metrics()
+        assert metrics["scans"] == 6
+        assert metrics["depth"] == 0
+        assert metrics["latency_p95"] >= metrics["latency_p50"] > 0
+        assert metrics["throughput"] > 0
+    
+    def test_deduplicates_same_content(self, tmp, manager):
+        scan_queue = ScanQueue(manager, workers=2)
+        first = scan_queue.submit(self.make_file(tmp, "a.exe", b"same"))
+        second = scan_queue.submit(self.make_file(tmp, "b.exe", b"same"))
+        deadline = time.monotonic() + 5
+        while not second.sha256 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.release.set()
+        
+        assert first.wait(5) == second.wait(5)
+        scan_queue.shutdown()
+        assert second.deduplicated
+        assert manager.scanned == ["a.exe"]
+    
+    def test_submit_does_not_hash_on_caller(self, tmp, manager, monkeypatch):
+        hashing = threading.Event()
+        
+        def slow_sha256(path):
+            hashing.wait(5)
+            return "digest"
+        
+        monkeypatch.setattr(manager, "compute_sha256", slow_sha256)
+        scan_queue = ScanQueue(manager, workers=1)
+        job = scan_queue.submit(self.make_file(tmp, "a.exe", b"a"))
+        assert job.state == "pending" and job.sha256 == ""
+        hashing.set()
+        manager.release.set()
+        assert job.wait(5) == (ScanResult.CLEAN, "No threats detected")
+        scan_queue.shutdown()
+        assert job.sha256 == "digest"
+    
+    def test_cancel_pending_job(self, tmp, manager):
+        completed = []
+        scan_queue = ScanQueue(manager, workers=1, on_complete=completed.append)
+        running = scan_queue.submit(self.make_file(tmp, "a.exe", b"a"))
+        pending = scan_queue.submit(self.make_file(tmp, "b.exe", b"b"))
+        
+        assert scan_queue.cancel(pending)
+        manager.release.set()
+        running.wait(5)
+        scan_queue.shutdown()
+        
+        assert pending.state == "cancelled"
+        assert pending.result is None
+        assert manager.scanned == ["a.exe"]
+        assert not scan_queue.cancel(running)
+        assert {job.state for job in completed} == {"done", "cancelled"}
@@ -0,0 +1,103 @@
+"""Tests for search indexes."""
+
+import pytest
+
+from app.core.search import PrefixIndex, TrigramIndex, normalize_title
+
+
+class TestPrefixIndex:
+    """Test PrefixIndex class."""
+    
+    @pytest.fixture
+    def index(self):
+        """Create a small prefix index."""
+        index = PrefixIndex()
+        index.set_entries("game", [("Example Game", "Example Game"), ("Exodus", "Exodus")])
+        index.set_entries("trainer", [("Example Trainer v1.0", "Example Trainer v1.0")])
+        index.set_entries("abbreviation", [("EG", "Example Game")])
+        return index
+    
+    def test_complete_prefix(self, index):
+        """Test completions are case-insensitive and sorted."""
+        texts = [c.text for c in index.complete("exa")]
+        assert texts == ["Example Game", "Example Trainer v1.0"]
+    
+    def test_complete_abbreviation(self, index):
+        """Test abbreviations resolve to the full game name."""
+        completions = index.complete("EG")
+        assert completions[0].text == "Example Game"
+        assert completions[0].kind == "abbreviation"
+        assert completions[0].matched == "EG"
+    
+    def test_complete_deduplicates(self, index):
+        """Test the same text is only suggested once."""
+        index.set_entries("abbreviation", [("Example", "Example Game")])
+        texts = [c.text for c in index.complete("example")]
+        assert texts.count("Example Game") == 1
+    
+    def test_complete_limit(self, index):
+        """Test the limit and empty prefix handling."""
+        assert len(index.complete("e", limit=2)) == 2
+        assert index.complete("") == []
+        assert index.complete("zzz") == []
+    
+    def test_set_entries_replaces_kind(self, index):
+        """Test reloading one kind leaves others intact."""
+        index.set_entries("game", [])
+        texts = [c.text for c in index.complete("ex")]
+        assert "Exodus" not in texts
+        assert "Example Trainer v1.0" in texts
+    
+    def test_add_remove(self, index):
+        """Test single-entry updates keep the index sorted."""
+        index.add("game", "Exa", "Exa")
+        assert [c.text for c in index.complete("exa")][0] == "Exa"
+        
+        assert index.remove("game", "Exa", "Exa")
+        assert not index.remove("game", "Exa", "Exa")
+        assert "Exa" not in [c.text for c in index.complete("exa")]
+
+class TestTrigramIndex:
+    """Test TrigramIndex class."""
+    
+    @pytest.fixture
+    def index(self):
+        """Create a small trigram index."""
+        index = TrigramIndex()
+        index.sync({
+            "ff7": "Final Fantasy VII: Remake",
+            "er": "Elden Ring",
+            "ds3": "Dark Souls III",
+        })
+        return index
+    
+    def test_normalize_title(self):
+        """Test punctuation, case and numeral normalization."""
+        assert normalize_title("Final Fantasy VII: Remake") == "final fantasy 7 remake"
+        assert normalize_title("Pokémon  Sword & Shield") == "pokemon sword and shield"
+    
+    def test_search_typo(self, index):
+        """Test ranked matches tolerate typos and numerals."""
+        hits = index.search("final fantsy 7 remake")
+        assert hits[0].key == "ff7"
+        assert hits[0].score > 0.6
+        assert index.search("eldn ring")[0].text == "Elden Ring"
+        assert index.last_search_seconds > 0
+    
+    def test_search_no_match(self, index):
+        """Test unrelated queries return nothing."""
+        assert index.search("zzqqxx") == []
+        assert index.search("") == []
+    
+    def test_sync_incremental(self, index):
+        """Test sync only touches changed entries."""
+        changed, removed = index.sync({
+            "ff7": "Final Fantasy VII: Remake",
+            "er": "Elden Ring: Nightreign",
+            "sk": "Sekiro",
+        })
+        assert (changed, removed) == (2, 1)
+        assert len(index) == 3
+        assert "ds3" not in index
+        assert index.search("dark souls") == []
+        assert index.search("sekiro")[0].key == "sk"
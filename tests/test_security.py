@@ -1,5 +1,8 @@
 """Tests for security functionality."""
 
+import os
+import threading
+import time
 import pytest
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -85,3 +88,146 @@ class TestSecurityManager:
         assert success
         assert dest.exists()
         assert not source_file.exists()
+    
+    def test_sha256_cache_hit(self, temp_quarantine, test_file):
+        """Test unchanged files are answered from the hash cache."""
+        old = time.time() - 60
+        os.utime(test_file, (old, old))
+        
+        manager = SecurityManager(temp_quarantine)
+        first = manager.compute_sha256(test_file)
+        assert manager.hash_cache_stats()["misses"] == 1
+        assert manager.compute_sha256(test_file) == first
+        assert manager.hash_cache_stats()["hits"] == 1
+        manager.save_caches()
+        
+        reopened = SecurityManager(temp_quarantine)
+        assert reopened.compute_sha256(test_file) == first
+        assert reopened.hash_cache_stats() == {"hits": 1, "misses": 0, "entries": 1}
+    
+    def test_json_cache_concurrent_saves(self, temp_quarantine):
+        """Test concurrent saves neither collide nor lose entries."""
+        import threading
+        from app.core.hashing import JsonCache
+        cache = JsonCache(temp_quarantine / "c.json")
+        
+        def writer(n):
+            for i in range(8):
+                cache.put(f"{n}-{i}", i)
+                cache.save()
+        
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(JsonCache(temp_quarantine / "c.json").items()) == 64
+        assert list(temp_quarantine.glob("*.tmp")) == []
+    
+    def test_sha256_cache_invalidated_on_change(self, temp_quarantine, test_file):
+        """Test a modified file is rehashed."""
+        old = time.time() - 60
+        os.utime(test_file, (old, old))
+        manager = SecurityManager(temp_quarantine)
+        first = manager.compute_sha256(test_file)
+        
+        test_file.write_text("changed content")
+        os.utime(test_file, (old + 1, old + 1))
+        assert manager.compute_sha256(test_file) != first
+        assert manager.hash_cache_stats()["misses"] == 2
+    
+    def test_sha256_recent_file_not_cached(self, temp_quarantine, test_file):
+        """Test files modified within the racy window are not cached."""
+        manager = SecurityManager(temp_quarantine)
+        manager.compute_sha256(test_file)
+        manager.compute_sha256(test_file)
+        assert manager.hash_cache_stats()["hits"] == 0
+    
+    def test_hash_files_matches_compute_sha256(self, temp_quarantine):
+        """Test bulk hashing agrees with the per-file checksum."""
+        files = []
+        for i in range(6):
+            path = temp_quarantine / f"trainer{i}.exe"
+            path.write_bytes(os.urandom(1024 * 1024 + i * 777))
+            files.append(path)
+        manager = SecurityManager(temp_quarantine)
+        progress = []
+        
+        results = manager.hash_files(files, max_workers=3, progress_callback=lambda d, t, p: progress.append((d, t)))
+        
+        assert results == {path: manager.compute_sha256(path, use_cache=False) for path in files}
+        assert [d for d, _ in progress] == list(range(1, 7))
+        assert all(t == 6 for _, t in progress)
+    
+    def test_hash_files_missing_file(self, temp_quarantine, test_file):
+        """Test unreadable files map to an empty checksum."""
+        manager = SecurityManager(temp_quarantine)
+        missing = temp_quarantine / "missing.exe"
+        results = manager.hash_files([test_file, missing])
+        assert results[missing] == ""
+        assert len(results[test_file]) == 64
+    
+    def test_hash_files_cancel(self, temp_quarantine):
+        """Test a set cancel event stops the job before hashing everything."""
+        files = []
+        for i in range(20):
+            path = temp_quarantine / f"trainer{i}.exe"
+            path.write_bytes(b"x" * 1024)
+            files.append(path)
+        manager = SecurityManager(temp_quarantine)
+        cancel = threading.Event()
+        
+        def on_progress(done, total, path):
+            cancel.set()
+        
+        results = manager.hash_files(files, max_workers=1, progress_callback=on_progress, cancel_event=cancel)
+        assert 1 <= len(results) < len(files)
+    
+    def test_scan_cache_by_signature_version(self, temp_quarantine, test_file, monkeypatch):
+        """Test verdicts are reused until the signature version changes."""
+        manager = SecurityManager(temp_quarantine, "clamav")
+        version = ["1.0.0/27000"]
+        scans = []
+        monkeypatch.setattr(manager, "_clamscan_signature_version", lambda: version[0])
+        monkeypatch.setattr(manager, "_scan_clamav", lambda path: scans.append(path) or (ScanResult.CLEAN, "No threats detected"))
+        
+        assert manager.scan_file(test_file) == (ScanResult.CLEAN, "No threats detected")
+        assert manager.scan_file(test_file) == (ScanResult.CLEAN, "No threats detected")
+        assert len(scans) == 1
+        assert SecurityManager(temp_quarantine, "clamav").scan_cache_stats()["entries"] == 1
+        
+        version[0] = "1.0.0/27001"
+        manager._signature_version = None
+        manager.scan_file(test_file)
+        assert len(scans) == 2
+    
+    def test_scan_errors_not_cached(self, temp_quarantine, test_file, monkeypatch):
+        """Test failed scans are retried rather than cached."""
+        manager = SecurityManager(temp_quarantine, "clamav")
+        monkeypatch.setattr(manager, "_clamscan_signature_version", lambda: "1.0.0/27000")
+        monkeypatch.setattr(manager, "_scan_clamav", lambda path: (ScanResult.ERROR, "Scan timeout"))
+        
+        manager.scan_file(test_file)
+        assert manager.scan_cache_stats()["entries"] == 0
+    
+    def test_compute_digests_single_pass(self, temp_quarantine, test_file, monkeypatch):
+        """Test several digests come from one read of the file."""
+        import builtins
+        import hashlib
+        opened = []
+        real_open = builtins.open
+        monkeypatch.setattr(builtins, "open", lambda path, *a, **kw: opened.append(path) or real_open(path, *a, **kw))
+        manager = SecurityManager(temp_quarantine)
+        opened.clear()
+        
+        digests = manager.compute_digests(test_file, ("md5", "sha1", "sha256", "blake2"))
+        
+        data = b"test content"
+        assert digests == {
+            "md5": hashlib.md5(data).hexdigest(),
+            "sha1": hashlib.sha1(data).hexdigest(),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "blake2": hashlib.blake2b(data).hexdigest(),
+        }
+        assert opened.count(test_file) == 1
+        assert manager.compute_sha256(test_file) == digests["sha256"]
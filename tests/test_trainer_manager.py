@@ -120,3 +120,165 @@ class TestTrainerFileManager:
         path = manager.get_trainer_path("test.exe")
         
         assert path == temp_trainers / "test.exe"
+    
+    def test_scan_library_recursive(self, temp_trainers):
+        """Test recursive scanning with depth limit and stat data."""
+        (temp_trainers / "Game A" / "old").mkdir(parents=True)
+        (temp_trainers / "quarantine").mkdir()
+        (temp_trainers / ".cache").mkdir()
+        (temp_trainers / "top.exe").write_bytes(b"MZ")
+        (temp_trainers / "Game A" / "a.EXE").write_bytes(b"MZ" * 10)
+        (temp_trainers / "Game A" / "readme.txt").write_text("notes")
+        (temp_trainers / "Game A" / "old" / "a_v1.exe").write_bytes(b"MZ")
+        (temp_trainers / "quarantine" / "q.exe").write_bytes(b"MZ")
+        (temp_trainers / ".cache" / "c.exe").write_bytes(b"MZ")
+        manager = TrainerFileManager(temp_trainers)
+        
+        entries = manager.scan_library()
+        assert [e.relpath for e in entries] == ["Game A/a.EXE", "Game A/old/a_v1.exe", "top.exe"]
+        assert entries[0].name == "a.EXE"
+        assert entries[0].size == 20
+        assert entries[0].mtime_ns == (temp_trainers / "Game A" / "a.EXE").stat().st_mtime_ns
+        
+        assert [e.relpath for e in manager.scan_library(max_depth=0)] == ["top.exe"]
+        assert len(manager.scan_library(max_depth=1)) == 2
+    
+    def test_find_duplicates_prefilters_by_size(self, temp_trainers, monkeypatch):
+        """Test only files sharing a size are hashed when finding duplicates."""
+        import app.core.library_index as library_index
+        (temp_trainers / "Game").mkdir()
+        (temp_trainers / "a.exe").write_bytes(b"MZ dup!")
+        (temp_trainers / "Game" / "b.exe").write_bytes(b"MZ dup!")
+        (temp_trainers / "c.exe").write_bytes(b"MZ dupX")
+        (temp_trainers / "d.exe").write_bytes(b"MZ uniq size")
+        hashed = []
+        real_hash = library_index.hash_file
+        monkeypatch.setattr(library_index, "hash_file", lambda path: hashed.append(path.name) or real_hash(path))
+        manager = TrainerFileManager(temp_trainers)
+        
+        groups = manager.library_index.find_duplicates(temp_trainers, manager.scan_library(), library_index.hash_file)
+        
+        assert [g.relpaths for g in groups] == [["Game/b.exe", "a.exe"]]
+        assert groups[0].wasted_bytes == 7
+        assert sorted(hashed) == ["a.exe", "b.exe", "c.exe"]
+        
+        hashed.clear()
+        assert len(TrainerFileManager(temp_trainers).find_duplicates()) == 1
+        assert hashed == []
+    
+    def test_load_library_reconciles_index(self, temp_trainers):
+        """Test the library index tracks added, renamed, changed and removed files."""
+        import os
+        (temp_trainers / "a.exe").write_bytes(b"MZ a")
+        (temp_trainers / "b.exe").write_bytes(b"MZ b")
+        (temp_trainers / "c.exe").write_bytes(b"MZ c")
+        manager = TrainerFileManager(temp_trainers)
+        
+        result = manager.load_library()
+        assert result.added == ["a.exe", "b.exe", "c.exe"]
+        manager.library_index.sync(temp_trainers, manager.scan_library())
+        manager.library_index.annotate("a.exe", verdict="clean", game="Elden Ring")
+        manager.library_index.annotate("b.exe", verdict="clean")
+        manager.library_index.save()
+        sha_a = manager.library_index.record("a.exe")["sha256"]
+        
+        (temp_trainers / "Games").mkdir()
+        os.rename(temp_trainers / "a.exe", temp_trainers / "Games" / "a.exe")
+        (temp_trainers / "b.exe").write_bytes(b"MZ b changed")
+        (temp_trainers / "c.exe").unlink()
+        
+        reloaded = TrainerFileManager(temp_trainers)
+        result = reloaded.load_library()
+        
+        assert result.renamed == [("a.exe", "Games/a.exe")]
+        assert result.changed == ["b.exe"]
+        assert result.removed == ["c.exe"]
+        assert reloaded.library_index.relpaths() == ["Games/a.exe", "b.exe"]
+        moved = reloaded.library_index.record("Games/a.exe")
+        assert (moved["sha256"], moved["verdict"], moved["game"]) == (sha_a, "clean", "Elden Ring")
+        changed = reloaded.library_index.record("b.exe")
+        assert changed["sha256"] == "" and "verdict" not in changed
+        assert not reloaded.load_library()
+    
+    def test_imported_files_stay_current_and_keep_verdicts(self, temp_trainers):
+        """Test imports record the inode and scan verdicts survive a reload."""
+        from app.core.security import ScanResult, SecurityManager
+        with TemporaryDirectory() as src_dir:
+            source = Path(src_dir) / "a.exe"
+            source.write_bytes(b"MZ a")
+            manager = TrainerFileManager(temp_trainers)
+            assert manager.add_trainers([source])[0].success
+        sha256 = manager.library_index.record("a.exe")["sha256"]
+        assert not manager.load_library()
+        
+        security = SecurityManager(temp_trainers / "quarantine", scanner_type="none")
+        assert manager.scan_trainers(security) == {"a.exe": (ScanResult.NOT_SCANNED, "Scanner not configured")}
+        record = TrainerFileManager(temp_trainers).library_index.record("a.exe")
+        assert (record["sha256"], record["verdict"]) == (sha256, "not_scanned")
+    
+    def test_library_index_links_metadata_and_applies_events(self, temp_trainers):
+        """Test trainer records are linked and watcher events update the index."""
+        from app.core.metadata import Trainer
+        from app.core.watcher import WatchEvent
+        (temp_trainers / "fling.exe").write_bytes(b"MZ fling")
+        manager = TrainerFileManager(temp_trainers)
+        manager.load_library([Trainer("Elden Ring +25", "Elden Ring", "1.10", "FLiNG", "", local_path="fling.exe")])
+        assert manager.library_index.record("fling.exe")["trainer"] == "Elden Ring +25"
+        
+        (temp_trainers / "new.exe").write_bytes(b"MZ new")
+        (temp_trainers / "fling.exe").rename(temp_trainers / "renamed.exe")
+        manager.library_index.apply_events(temp_trainers, [
+            WatchEvent("added", "new.exe"),
+            WatchEvent("renamed", "renamed.exe", "fling.exe"),
+        ])
+        
+        assert manager.library_index.relpaths() == ["new.exe", "renamed.exe"]
+        assert manager.library_index.record("renamed.exe")["game"] == "Elden Ring"
+        manager.library_index.apply_events(temp_trainers, [WatchEvent("removed", "new.exe")])
+        assert manager.library_index.relpaths() == ["renamed.exe"]
+        
+        (temp_trainers / "renamed.exe").write_bytes(b"MZ fling, patched")
+        manager.library_index.apply_events(temp_trainers, [WatchEvent("changed", "renamed.exe")])
+        record = manager.library_index.record("renamed.exe")
+        assert (record["size"], record["game"]) == (17, "Elden Ring")
+    
+    def test_library_index_rename_is_atomic(self, temp_trainers):
+        """Test readers never see a record missing while it is renamed."""
+        import sys
+        import threading
+        from app.core.library_index import LibraryIndex
+        index = LibraryIndex()
+        index.update("a.exe", 4, 1, "abc")
+        stop = threading.Event()
+        
+        def renamer():
+            names = ("a.exe", "b.exe")
+            for i in range(20000):
+                index.rename(names[i % 2], names[(i + 1) % 2])
+            stop.set()
+        
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        thread = threading.Thread(target=renamer)
+        thread.start()
+        sizes = set()
+        while not stop.is_set():
+            sizes.add(len(index.relpaths()))
+            sizes.add(len(index.paths_for_hash("abc")))
+        thread.join()
+        sys.setswitchinterval(interval)
+        assert sizes == {1}
+    
+    def test_match_library_links_unmatched_files(self, temp_trainers):
+        """Test unmatched library files are linked by file name."""
+        from app.core.matcher import FilenameMatcher
+        from app.core.metadata import Trainer
+        (temp_trainers / "Elden.Ring.v1.10.Plus.25.Trainer-FLiNG.exe").write_bytes(b"MZ er")
+        (temp_trainers / "notes.exe").write_bytes(b"MZ notes")
+        manager = TrainerFileManager(temp_trainers)
+        manager.load_library()
+        matcher = FilenameMatcher([Trainer("Elden Ring +25", "Elden Ring", "1.10", "FLiNG", "")])
+        
+        assert manager.match_library(matcher) == 1
+        record = TrainerFileManager(temp_trainers).library_index.record("Elden.Ring.v1.10.Plus.25.Trainer-FLiNG.exe")
+        assert (record["trainer"], record["game"], record["match_score"]) == ("Elden Ring +25", "Elden Ring", 1.0)
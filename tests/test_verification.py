@@ -0,0 +1,59 @@
+"""Tests for library checksum verification."""
+
+import hashlib
+import os
+import time
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.core.metadata import MetadataManager, Trainer
+from app.core.security import SecurityManager
+from app.core.trainer_manager import TrainerFileManager
+from app.core.verification import LibraryVerifier
+
+
+class TestLibraryVerifier:
+    """Test LibraryVerifier class."""
+    
+    @pytest.fixture
+    def verifier(self):
+        """Create a library with good, bad, unknown and missing trainers."""
+        with TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            files = TrainerFileManager(root / "trainers")
+            metadata = MetadataManager(root / "resources", use_snapshot=False)
+            security = SecurityManager(root / "quarantine")
+            
+            good = b"MZ good trainer"
+            old = time.time() - 60
+            for name, data in [("Good Trainer.exe", good), ("Bad Trainer.exe", b"MZ tampered"),
+                               ("Stray.exe", b"MZ stray"), ("No Sum.exe", b"MZ nosum")]:
+                path = files.trainers_path / name
+                path.write_bytes(data)
+                os.utime(path, (old, old))
+            
+            metadata._trainers.update({
+                "Good Trainer": Trainer("Good Trainer", "G", "1", "A", "", hashlib.sha256(good).hexdigest()),
+                "Bad Trainer": Trainer("Bad Trainer", "G", "1", "A", "", "0" * 64),
+                "No Sum": Trainer("No Sum", "G", "1", "A", ""),
+                "Gone": Trainer("Gone", "G", "1", "A", "", "1" * 64, local_path="gone.exe"),
+            })
+            yield LibraryVerifier(files, metadata, security)
+    
+    def test_verify_report(self, verifier):
+        """Test files are sorted into the right categories."""
+        report = verifier.verify()
+        assert [e.trainer for e in report.verified] == ["Good Trainer"]
+        assert [e.trainer for e in report.mismatched] == ["Bad Trainer"]
+        assert sorted(e.path.name for e in report.unknown) == ["No Sum.exe", "Stray.exe"]
+        assert [e.trainer for e in report.missing] == ["Gone"]
+        assert report.summary() == {"verified": 1, "mismatched": 1, "unknown": 2, "missing": 1}
+        assert not report.ok
+    
+    def test_repeat_run_uses_cache(self, verifier):
+        """Test unchanged files are not rehashed on a second run."""
+        assert verifier.verify().cache_hits == 0
+        second = verifier.verify()
+        assert second.cache_hits == 2
+        assert len(second.verified) == 1
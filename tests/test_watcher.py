@@ -0,0 +1,113 @@
+"""Tests for the trainers folder watcher."""
+
+import time
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from app.core.watcher import TrainerWatcher, WatchEvent
+
+
+def wait_for_events(watcher, count, timeout=5.0):
+    events = []
+    deadline = time.monotonic() + timeout
+    while len(events) < count and time.monotonic() < deadline:
+        events.extend(watcher.poll_events())
+        time.sleep(0.02)
+    time.sleep(0.1)
+    return events + watcher.poll_events()
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watched(request):
+    """Yield (root, watcher) for each available backend."""
+    with TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "Game A").mkdir()
+        (root / "Game A" / "a.exe").write_bytes(b"MZ a")
+        (root / "top.exe").write_bytes(b"MZ top")
+        watcher = TrainerWatcher(root, poll_interval=0.05, use_inotify=request.param == "inotify")
+        if request.param == "inotify" and watcher.backend != "inotify":
+            pytest.skip("inotify not available")
+        watcher.start()
+        yield root, watcher
+        watcher.stop()
+
+
+class TestTrainerWatcher:
+    """Test TrainerWatcher with both backends."""
+    
+    def test_initial_snapshot(self, watched):
+        root, watcher = watched
+        assert watcher.files() == ["Game A/a.exe", "top.exe"]
+        assert watcher.poll_events() == []
+    
+    def test_add_and_remove(self, watched):
+        root, watcher = watched
+        (root / "new.exe").write_bytes(b"MZ new")
+        (root / "notes.txt").write_text("ignored")
+        (root / "Game A" / "a.exe").unlink()
+        
+        events = wait_for_events(watcher, 2)
+        assert sorted(events, key=lambda e: e.kind) == [
+            WatchEvent("added", "new.exe"),
+            WatchEvent("removed", "Game A/a.exe"),
+        ]
+    
+    def test_rename_file_and_folder(self, watched):
+        root, watcher = watched
+        (root / "top.exe").rename(root / "Game A" / "moved.exe")
+        assert wait_for_events(watcher, 1) == [WatchEvent("renamed", "Game A/moved.exe", "top.exe")]
+        
+        (root / "Game A").rename(root / "Game B")
+        events = wait_for_events(watcher, 2)
+        assert sorted(events, key=lambda e: e.relpath) == [
+            WatchEvent("renamed", "Game B/a.exe", "Game A/a.exe"),
+            WatchEvent("renamed", "Game B/moved.exe", "Game A/moved.exe"),
+        ]
+        assert watcher.files() == ["Game B/a.exe", "Game B/moved.exe"]
+    
+    def test_new_folder_contents(self, watched):
+        root, watcher = watched
+        (root / "Game C" / "deep").mkdir(parents=True)
+        (root / "Game C" / "deep" / "c.exe").write_bytes(b"MZ c")
+        events = wait_for_events(watcher, 1)
+        assert events == [WatchEvent("added", "Game C/deep/c.exe")]
+        
+        (root / "Game C" / "deep" / "d.exe").write_bytes(b"MZ d")
+        assert wait_for_events(watcher, 1) == [WatchEvent("added", "Game C/deep/d.exe")]
+    
+    def test_missing_inode_is_never_a_rename(self, watched):
+        root, watcher = watched
+        list_dir = watcher._list_dir
+        
+        def without_inodes(rel_dir):
+            files, subdirs, mtime = list_dir(rel_dir)
+            return {rel: (0, 0, 4) for rel in files}, subdirs, mtime
+        
+        watcher._list_dir = without_inodes
+        watcher._files = {rel: (0, 0, 4) for rel in watcher._files}
+        (root / "Game A" / "a.exe").unlink()
+        (root / "Game A" / "b.exe").write_bytes(b"MZ b")
+        events = wait_for_events(watcher, 2)
+        assert sorted(events, key=lambda e: e.kind) == [
+            WatchEvent("added", "Game A/b.exe"),
+            WatchEvent("removed", "Game A/a.exe"),
+        ]
+    
+    def test_rename_after_chunked_write(self, watched):
+        root, watcher = watched
+        if watcher.backend != "inotify":
+            pytest.skip("only inotify reports writes to existing files")
+        with open(root / "big.exe", "wb") as f:
+            f.write(b"MZ")
+            f.flush()
+            assert wait_for_events(watcher, 1) == [WatchEvent("added", "big.exe")]
+            for _ in range(3):
+                f.write(b"\x90" * 4096)
+                f.flush()
+                time.sleep(0.05)
+        assert WatchEvent("changed", "big.exe") in wait_for_events(watcher, 1)
+        
+        (root / "big.exe").rename(root / "Game A" / "big.exe")
+        assert wait_for_events(watcher, 1) == [WatchEvent("renamed", "Game A/big.exe", "big.exe")]